@@ -1,35 +1,146 @@
 """Import/packages for pytest, selenium, requests and allure."""
 
+import json
+import threading
 import time
 from pathlib import Path
 import pytest
 import requests
 import allure
-from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import WebDriverException
 from urllib3.util.retry import Retry
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from pages.locator_cache import LOCATOR_CACHE, MODES as LOCATOR_CACHE_MODES
+from pages.wait_engine import LEDGER as WAIT_LEDGER
+from utils.artifact_store import STORE as ARTIFACT_STORE
+from utils.artifacts import ARTIFACTS
+from utils.async_client import AsyncClientWrapper
+from utils import command_budget, step_timing
+from utils.driver_factory import DEFAULT_DEVICE, DEFAULT_PROFILE, PROFILES as DRIVER_PROFILES, create_driver
+from utils.driver_pool import DriverPools
+from utils.capture import CAPTURE, DEFAULT_BUDGET_MB as CAPTURE_BUDGET_MB, LEVELS as CAPTURE_LEVELS, locators_from_error
+from utils.cassette import MODES as CASSETTE_MODES, open_cassette
+from utils.host_scheduler import CasePool, HostBudget, HostScheduler, parse_budget
+from utils.http_cache import CACHE_DIR as HTTP_CACHE_DIR, MODES as HTTP_CACHE_MODES, HttpCache, open_http_cache
+from utils.json_stream import BODY_EXCERPT_BYTES, extract_paths
+from utils.schemas import SCHEMAS
+from utils.session_state import SessionStateCache
+from utils.step_graph import RETRIES as STEP_RETRIES
+from utils.step_timing import PROFILES_FILE as STEP_PROFILES_FILE, TIMINGS as STEP_TIMINGS, StepTimer
+from utils.stub_server import StubResponse, StubServer
+from utils.transport import Transport, parse_pool_size
 
 REPORTS_DIR = Path("reports")
 ALLURE_RESULTS_DIR = REPORTS_DIR / "allure"
-DEBUG_DIR = REPORTS_DIR / "debug"
+CASSETTES_DIR = Path("tests") / "api" / "cassettes"
+STAND_IN_DIR = Path(__file__).parent / "tests" / "web" / "stand_in"
 
-for d in (REPORTS_DIR, ALLURE_RESULTS_DIR, DEBUG_DIR):
+# per-host budgets for the public APIs (override with --host-budget HOST:rps=N,concurrency=M)
+DEFAULT_HOST_BUDGETS = {
+    "pokeapi.co": HostBudget(rps=5),
+    "reqres.in": HostBudget(max_concurrent=2),
+    "agify.io": HostBudget(max_concurrent=4, rps=10),
+}
+HOST_SCHEDULER_KEY = pytest.StashKey[HostScheduler]()
+DRIVER_POOL_KEY = pytest.StashKey[DriverPools]()
+STEP_SUMMARY_KEY = pytest.StashKey[dict]()
+SESSION_STATE_KEY = pytest.StashKey[SessionStateCache]()
+HTTP_CACHE_KEY = pytest.StashKey[HttpCache]()
+TRANSPORT_KEY = pytest.StashKey[Transport]()
+
+for d in (REPORTS_DIR, ALLURE_RESULTS_DIR):
     d.mkdir(parents=True, exist_ok=True)
 
+
+def pytest_addoption(parser):
+    """CLI OPTIONS (API)"""
+    group = parser.getgroup("qa", "qa home task options")
+    group.addoption("--api-max-in-flight", action="store", type=int, default=8,
+                    help="max concurrent requests for the async_client fixture (default 8)")
+    group.addoption("--api-workers", action="store", type=int, default=4,
+                    help="threads running the parametrized API cases of a module up front (default 4, 1 = serial)")
+    group.addoption("--api-pool-size", action="store", type=int, default=10,
+                    help="keep-alive connections per host shared by the API clients (default 10, "
+                         "never below --api-max-in-flight)")
+    group.addoption("--api-pool-host", action="append", default=[], metavar="HOST:N",
+                    help="per-host pool size override, covers subdomains (repeatable)")
+    group.addoption("--api-http2", action="store_true", default=False,
+                    help="send https:// API calls over HTTP/2 (needs httpx[http2])")
+    group.addoption("--cassette", action="store", choices=CASSETTE_MODES, default="off",
+                    help="record: store live API responses; replay: serve them from disk, no network")
+    group.addoption("--cassette-dir", action="store", default=str(CASSETTES_DIR),
+                    help=f"directory of recorded API cassettes (default {CASSETTES_DIR})")
+    group.addoption("--http-cache", action="store", choices=HTTP_CACHE_MODES, default="off",
+                    help="HTTP cache for API GETs: off (default, every test hits the live endpoint), "
+                         "memory (per session) or disk (shared across sessions)")
+    group.addoption("--http-cache-mb", action="store", type=float, default=32.0,
+                    help="memory tier size cap of the HTTP cache in MB (default 32)")
+    group.addoption("--http-cache-dir", action="store", default=str(HTTP_CACHE_DIR),
+                    help=f"disk tier of the HTTP cache (default {HTTP_CACHE_DIR})")
+    group.addoption("--host-budget", action="append", default=[], metavar="HOST:rps=N,concurrency=M",
+                    help="per-host request budget for API clients (repeatable)")
+    group.addoption("--driver-pool-size", action="store", type=int, default=1,
+                    help="number of pre-launched Chrome instances shared by UI tests (default 1)")
+    group.addoption("--driver-max-uses", action="store", type=int, default=20,
+                    help="recycle a pooled Chrome after this many leases (default 20)")
+    group.addoption("--driver-profile", action="store", choices=sorted(DRIVER_PROFILES), default=DEFAULT_PROFILE,
+                    help="browser launch profile for UI tests: default (headed), headless, "
+                         "fast (headless + blocked images/fonts/trackers + reused disk cache); "
+                         "@pytest.mark.driver_profile overrides it per test")
+    group.addoption("--session-state", action="store", choices=("on", "off", "refresh"), default="on",
+                    help="restore saved cookies/storage into new browsers so consent is skipped on warm runs; "
+                         "refresh drops the saved state first (default on)")
+    group.addoption("--session-state-ttl", action="store", type=float, default=12.0,
+                    help="hours a saved browser state stays valid (default 12)")
+    group.addoption("--locator-cache", action="store", choices=LOCATOR_CACHE_MODES, default="on",
+                    help="try the multi-selector locator variant that matched in earlier runs first; off = declared "
+                         "order, reset drops the saved hit stats first (default on)")
+    group.addoption("--artifact-max-mb", action="store", type=float, default=None,
+                    help="evict the oldest stored artifacts at session end until blobs fit in this many MB")
+    group.addoption("--artifact-max-age-days", action="store", type=float, default=None,
+                    help="evict stored artifacts older than this many days at session end")
+    group.addoption("--attach-body-max-kb", action="store", type=float, default=BODY_EXCERPT_BYTES / 1024,
+                    help="API response body attached on failure is truncated to this many KB (default 64)")
+    group.addoption("--capture-level", action="store", choices=CAPTURE_LEVELS, default="standard",
+                    help="failure artifacts: minimal = truncated body + exception, standard = scaled JPEG + DOM "
+                         "trimmed around the failing locator, full = PNG + whole page source (default standard)")
+    group.addoption("--capture-budget-mb", action="store", type=float, default=CAPTURE_BUDGET_MB,
+                    help="failure artifact bytes per session; capture steps down a level as it fills "
+                         "and drops what no longer fits (0 = unlimited, default 100)")
+    group.addoption("--command-budget", action="store", choices=("fail", "warn", "off"), default="fail",
+                    help="what to do when a test exceeds its @pytest.mark.command_budget (default fail)")
+
+
 class ClientWrapper:
     """CLIENT WRAPPER (API)"""
-    def __init__(self, session: requests.Session, timeout: int = 10):
+    def __init__(self, session: requests.Session, timeout: int = 10, cassette=None, scheduler=None, http_cache=None):
         self.session = session
         self.timeout = timeout
+        self.cassette = cassette
+        self.scheduler = scheduler
+        self.http_cache = http_cache
         self.last_response = None
+        self.last_extract = None  # ExtractStats of the latest extract()
+        self._local = threading.local()
+
+    @property
+    def thread_response(self):
+        """latest response on the calling thread (pooled API cases run on worker threads)"""
+        return getattr(self._local, "response", None)
 
     def _request(self, method, url, **kwargs):
-        """request method"""
+        """request method (host budgets, HTTP cache + cassette record/replay when configured)"""
         kwargs.setdefault("timeout", self.timeout)
         fn = getattr(self.session, method)
-        r = fn(url, **kwargs)
-        self.last_response = r
+        if self.scheduler is not None:
+            fn = self.scheduler.wrap(fn)
+        if self.http_cache is not None:
+            # inside the cassette: recordings keep full bodies, cache hits skip the host budget
+            fn = self.http_cache.wrap(method, fn)
+        if self.cassette is not None:
+            r = self.cassette.fetch(method, url, fn, **kwargs)
+        else:
+            r = fn(url, **kwargs)
+        self.last_response = self._local.response = r
         return r
 
     def get(self, url, **kwargs):
@@ -48,57 +159,259 @@ class ClientWrapper:
         """DELETE METHOD"""
         return self._request("delete", url, **kwargs)
 
+    def extract(self, *paths, response=None) -> dict:
+        """KEY PATHS OF A JSON BODY read incrementally (get(..., stream=True)); stops reading once all are found"""
+        found, self.last_extract = extract_paths(response if response is not None else self.last_response, paths)
+        return found
 
-@pytest.fixture(scope="session")
-def client():
-    """API CLIENT FIXTURE"""
-    s = requests.Session()
+    def validate(self, response=None, schema: str = None, fast: bool = False):
+        """JSON BODY validated against its endpoint schema (utils.schemas, compiled once per session)"""
+        return SCHEMAS.validate_response(response if response is not None else self.last_response, schema, fast=fast)
+
+
+def _build_session(transport: Transport) -> requests.Session:
+    """shared session setup: pooled transport (retries live on its adapter) + default headers"""
+    return transport.session({
+        "User-Agent": "qa-tests",
+        "Accept": "application/json",
+    })
 
+
+@pytest.fixture(scope="session")
+def api_transport(request):
+    """SHARED CONNECTION POOLS (per host) + DNS / TLS session reuse for every API client fixture"""
     retries = Retry(
         total=3,
         backoff_factor=0.5,
         status_forcelist=[429, 500, 502, 503, 504],
     )
-    s.mount("https://", HTTPAdapter(max_retries=retries))
-    s.headers.update({
-        "User-Agent": "qa-tests",
-        "Accept": "application/json",
-    })
+    transport = Transport(
+        pool_size=max(request.config.getoption("--api-pool-size"), request.config.getoption("--api-max-in-flight")),
+        host_pool_sizes=dict(parse_pool_size(spec) for spec in request.config.getoption("--api-pool-host")),
+        max_retries=retries,
+        http2=request.config.getoption("--api-http2"),
+    )
+    request.config.stash[TRANSPORT_KEY] = transport
+    yield transport
+    transport.close()
+
+
+@pytest.fixture(scope="session")
+def host_scheduler(request):
+    """PER-HOST CONCURRENCY / RPS SCHEDULER shared by the API client fixtures"""
+    budgets = dict(DEFAULT_HOST_BUDGETS)
+    budgets.update(parse_budget(spec) for spec in request.config.getoption("--host-budget"))
+    scheduler = HostScheduler(budgets)
+    request.config.stash[HOST_SCHEDULER_KEY] = scheduler
+    return scheduler
+
 
-    wrapper = ClientWrapper(s)
+@pytest.fixture(scope="session")
+def http_cache(request):
+    """HTTP RESPONSE CACHE (ETag / Last-Modified / max-age) shared by the API client fixtures, None when off"""
+    cache = open_http_cache(request.config.getoption("--http-cache"),
+                            max_bytes=int(request.config.getoption("--http-cache-mb") * 1024 * 1024),
+                            disk_dir=Path(request.config.getoption("--http-cache-dir")))
+    if cache is not None:
+        request.config.stash[HTTP_CACHE_KEY] = cache
+    return cache
+
+
+@pytest.fixture(scope="session")
+def client(request, host_scheduler, http_cache, api_transport):
+    """API CLIENT FIXTURE (--cassette record/replay, --http-cache)"""
+    s = _build_session(api_transport)
+    cassette = open_cassette(Path(request.config.getoption("--cassette-dir")) / "public_apis.jsonl",
+                             request.config.getoption("--cassette"))
+
+    wrapper = ClientWrapper(s, cassette=cassette, scheduler=host_scheduler, http_cache=http_cache)
     yield wrapper
 
+    if cassette is not None:
+        cassette.close()
     try:
         s.close()
     except ValueError:
         pass
 
 
+@pytest.fixture(scope="session")
+def async_client(request, host_scheduler, api_transport):
+    """ASYNC API CLIENT FIXTURE — batches run concurrently, capped by --api-max-in-flight"""
+    limit = request.config.getoption("--api-max-in-flight")
+    s = _build_session(api_transport)
+
+    wrapper = AsyncClientWrapper(s, max_in_flight=limit, scheduler=host_scheduler)
+    yield wrapper
+
+    wrapper.close()
+
+
+def _pooled_case(client, fn, param):
+    """one API case on a pool thread; a failure carries that case's response for the failure attachment"""
+    try:
+        return fn(client, param)
+    except BaseException as exc:
+        exc.qa_response = client.thread_response
+        raise
+
+
+class ApiCases:
+    """API_POOLED_CASES of a test module, requested up front on a CasePool (see api_cases)"""
+
+    def __init__(self, client, pool: CasePool):
+        self.client = client
+        self.pool = pool
+
+    def run(self, fn, param):
+        """fn(client, param): waits for the pooled run, or runs it here when it was not submitted"""
+        try:
+            return self.pool.result(_pooled_case, self.client, fn, param)
+        except BaseException as exc:
+            self.client.last_response = getattr(exc, "qa_response", None) or self.client.last_response
+            raise
+
+
+@pytest.fixture(scope="module")
+def api_cases(request, client):
+    """
+    PARAMETRIZED API CASES RUN ON A THREAD POOL (--api-workers; 1 = serial). The module maps test names
+    to (case function, parameter name) in API_POOLED_CASES; every selected case is submitted when the
+    first one starts, under the host budgets of the client fixture.
+    """
+    pool = CasePool(workers=request.config.getoption("--api-workers"))
+    pooled = getattr(request.module, "API_POOLED_CASES", {})
+    if pool.workers > 1:
+        for item in request.session.items:
+            spec = pooled.get(getattr(item, "originalname", None))
+            if spec and getattr(item, "module", None) is request.module and hasattr(item, "callspec"):
+                fn, argname = spec
+                pool.submit(_pooled_case, client, fn, item.callspec.params[argname])
+    yield ApiCases(client, pool)
+    pool.close()
+
+
 @pytest.fixture(scope="function")
-def driver():
-    """DRIVER FIXTURE (MOBILE EMULATION) and IMPORTANT —
-    Selenium Manager auto-installs correct ChromeDriver version"""
+def stub_server():
+    """LOCAL STAND-IN HTTP SERVER (offline tests); add routes via stub_server.route(...)"""
+    server = StubServer().start()
+    yield server
+    server.stop()
 
-    chrome_options = Options()
-    chrome_options.add_experimental_option("mobileEmulation", {
-        "deviceName": "iPhone X"
-    })
 
-    chrome_options.add_argument("--disable-notifications")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
+def _driver_profile(node) -> str:
+    """@pytest.mark.driver_profile("fast") on the test/class/module, else --driver-profile"""
+    marker = node.get_closest_marker("driver_profile")
+    return marker.args[0] if marker and marker.args else node.config.getoption("--driver-profile")
 
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.set_window_size(375, 812)
-    driver.implicitly_wait(3)
 
-    yield driver
+@pytest.fixture(scope="session")
+def driver_pools(request):
+    """PRE-WARMED CHROME POOLS (MOBILE EMULATION), one per driver profile — launched on first use"""
+    pools = DriverPools(
+        size=request.config.getoption("--driver-pool-size"),
+        max_uses=request.config.getoption("--driver-max-uses"),
+    )
+    request.config.stash[DRIVER_POOL_KEY] = pools
+    yield pools
+    pools.close()
+
+
+@pytest.fixture(scope="class")
+def driver_pool(request, driver_pools):
+    """POOL FOR THE CLASS/MODULE DRIVER PROFILE — browsers leased per test or per class"""
+    return driver_pools.get(_driver_profile(request.node))
+
+
+@pytest.fixture(scope="function")
+def driver(request, driver_pools):
+    """DRIVER FIXTURE — leased from the pool of the test's driver profile, state reset on release"""
+    with driver_pools.get(_driver_profile(request.node)).lease() as leased:
+        yield leased
+
+
+@pytest.fixture(scope="session")
+def session_state(request):
+    """SAVED BROWSER STATE (cookies + storage) shared by UI page objects, None with --session-state off"""
+    mode = request.config.getoption("--session-state")
+    if mode == "off":
+        return None
+    cache = SessionStateCache(ttl=request.config.getoption("--session-state-ttl") * 3600)
+    if mode == "refresh":
+        for path in cache.root.glob("*.json"):
+            path.unlink()
+    request.config.stash[SESSION_STATE_KEY] = cache
+    return cache
+
 
+STAND_IN_CHANNELS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot"]
+
+
+def _stand_in_search(req):
+    """GET /api/search?term=..&delay=ms — the XHR behind stand_in/search.html, held `delay` ms"""
+    time.sleep(int(req.query.get("delay") or 0) / 1000.0)
+    return StubResponse.from_json({"term": req.query.get("term", ""), "channels": STAND_IN_CHANNELS})
+
+
+@pytest.fixture(scope="session")
+def stand_in_site():
+    """LOCAL STATIC STAND-IN OF THE TWITCH PAGES (tests/web/stand_in) + its delayed search XHR"""
+    server = StubServer(static_dir=STAND_IN_DIR).route("GET", "/api/search", _stand_in_search).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def headless_chrome():
+    """HEADLESS CHROME FACTORY for stand-in UI tests — skips when Chrome/driver is not installed"""
     try:
-        driver.quit()
-    except Exception:
-        pass
+        create_driver(headless=True).quit()
+    except WebDriverException as exc:
+        pytest.skip(f"headless Chrome unavailable: {exc.msg or exc}")
+
+    def factory(device_name: str = DEFAULT_DEVICE, profile: str = "headless"):
+        return create_driver(device_name=device_name, headless=True, profile=profile)
+    return factory
+
+
+# fixtures of the live Twitch browser; only tests using them feed the cross-run history in reports/timings
+LIVE_BROWSER_FIXTURES = {"driver", "driver_pool"}
+
+
+@pytest.fixture(autouse=True)
+def step_timings_scope(request, monkeypatch):
+    """OFFLINE TESTS (fake drivers, stand-in site) RECORD INTO A THROWAWAY StepTimer, never exported"""
+    if not LIVE_BROWSER_FIXTURES & set(request.fixturenames):
+        monkeypatch.setattr(step_timing, "TIMINGS", StepTimer())
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """ATTACH PAGE-OBJECT STEP + WEBDRIVER COMMAND TIMINGS of this test to allure, ENFORCE COMMAND BUDGETS"""
+    timer = step_timing.TIMINGS  # the test's own timer when step_timings_scope isolated it
+    mark = len(timer)
+    outcome = yield
+    if len(timer) > mark:
+        try:
+            allure.attach(json.dumps(timer.breakdown(since=mark), indent=2), "step_timings",
+                          allure.attachment_type.JSON)
+        except Exception:
+            pass
+
+    # @pytest.mark.command_budget(10) caps the whole test, command_budget(click_first_streamer=10) one step
+    budgets = {}
+    for marker in reversed(list(item.iter_markers("command_budget"))):
+        if marker.args:
+            budgets[command_budget.TOTAL] = marker.args[0]
+        budgets.update(marker.kwargs)
+    mode = item.config.getoption("--command-budget")
+    if budgets and mode != "off":
+        results = command_budget.evaluate(budgets, since=mark, thread=threading.get_ident(), timer=timer)
+        try:
+            command_budget.enforce(results, strict=mode == "fail", where=item.nodeid)
+        except command_budget.CommandBudgetExceeded as exc:
+            if outcome.excinfo is None:
+                outcome.force_exception(exc)
 
 
 @pytest.hookimpl(hookwrapper=True)
@@ -113,24 +426,19 @@ def pytest_runtest_makereport(item, call):
     if rep.failed:
         client_fixture = item.funcargs.get("client", None)
         if client_fixture and client_fixture.last_response:
-            resp = client_fixture.last_response
-
             try:
-                allure.attach(resp.text, "last_response_body", allure.attachment_type.TEXT)
+                # size-capped per --capture-level; a streamed body is shown from what was read, never re-read
+                limit = int(item.config.getoption("--attach-body-max-kb") * 1024)
+                CAPTURE.capture_body(client_fixture.last_response, limit)
             except Exception:
                 pass
 
         driver = item.funcargs.get("driver", None)
         if driver:
             try:
-                ts = int(time.time())
-                screenshot_path = DEBUG_DIR / f"{item.name}_{ts}.png"
-                driver.save_screenshot(str(screenshot_path))
-                allure.attach.file(
-                    str(screenshot_path),
-                    name="ui_screenshot",
-                    attachment_type=allure.attachment_type.PNG
-                )
+                # only what the capture level keeps is produced in the browser; writes run off-thread
+                locators = locators_from_error(call.excinfo.value if call.excinfo else None)
+                CAPTURE.capture_page(driver, "failure", locators=locators, attach=True)
             except Exception:
                 pass
 
@@ -139,3 +447,108 @@ def pytest_runtest_makereport(item, call):
                 allure.attach(str(call.excinfo.value), "exception", allure.attachment_type.TEXT)
             except Exception:
                 pass
+
+
+def pytest_configure(config):
+    """FAILURE CAPTURE LEVEL + PER-SESSION ARTIFACT BUDGET + LOCATOR RESOLUTION CACHE + ALLURE DIR OF THE WRITER"""
+    ARTIFACTS.allure_dir = Path(config.option.allure_report_dir) if getattr(config.option, "allure_report_dir", None) else None
+    budget_mb = config.getoption("--capture-budget-mb", CAPTURE_BUDGET_MB)
+    CAPTURE.configure(config.getoption("--capture-level", "standard"),
+                      int(budget_mb * 1024 * 1024) if budget_mb else None)
+    LOCATOR_CACHE.configure(config.getoption("--locator-cache", "on"))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """FLUSH BACKGROUND ARTIFACT WRITES before reports are generated, then apply the store retention policy"""
+    ARTIFACTS.flush()
+    try:
+        LOCATOR_CACHE.save()
+    except Exception:
+        pass
+    if len(STEP_TIMINGS):
+        try:
+            session.config.stash[STEP_SUMMARY_KEY] = STEP_TIMINGS.export(profiles_path=STEP_PROFILES_FILE)
+        except Exception:
+            pass
+    max_mb = session.config.getoption("--artifact-max-mb")
+    max_age_days = session.config.getoption("--artifact-max-age-days")
+    if max_mb is not None or max_age_days is not None:
+        ARTIFACT_STORE.max_bytes = int(max_mb * 1024 * 1024) if max_mb is not None else None
+        ARTIFACT_STORE.max_age = max_age_days * 86400 if max_age_days is not None else None
+        try:
+            ARTIFACT_STORE.evict()
+        except Exception:
+            pass
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """API HOST BUDGET + WEBDRIVER POOL + EVENT-WAIT SAVINGS + FAILURE CAPTURE + ARTIFACT WRITER REPORTS"""
+    scheduler = config.stash.get(HOST_SCHEDULER_KEY, None)
+    if scheduler is not None and scheduler.stats():
+        terminalreporter.write_sep("-", "api host scheduler")
+        for line in scheduler.report_lines():
+            terminalreporter.write_line(line)
+    cache = config.stash.get(HTTP_CACHE_KEY, None)
+    cache_lines = cache.report_lines() if cache is not None else []
+    if cache_lines:
+        terminalreporter.write_sep("-", "api http cache")
+        for line in cache_lines:
+            terminalreporter.write_line(line)
+    transport = config.stash.get(TRANSPORT_KEY, None)
+    transport_lines = transport.report_lines() if transport is not None else []
+    if transport_lines:
+        terminalreporter.write_sep("-", "api transport (connections opened vs requests served)")
+        for line in transport_lines:
+            terminalreporter.write_line(line)
+    pools = config.stash.get(DRIVER_POOL_KEY, None)
+    pool_lines = pools.report_lines() if pools is not None else []
+    if pool_lines:
+        terminalreporter.write_sep("-", "webdriver pool")
+        for line in pool_lines:
+            terminalreporter.write_line(line)
+    wait_lines = WAIT_LEDGER.report_lines()
+    if wait_lines:
+        terminalreporter.write_sep("-", "page-object waits vs fixed sleeps")
+        for line in wait_lines:
+            terminalreporter.write_line(line)
+    step_summary = config.stash.get(STEP_SUMMARY_KEY, None)
+    if step_summary:
+        terminalreporter.write_sep("-", "page-object step latency (history incl. this run)")
+        for line in STEP_TIMINGS.report_lines(step_summary):
+            terminalreporter.write_line(line)
+        terminalreporter.write_sep("-", "page-object step latency per driver profile (this run)")
+        for line in STEP_TIMINGS.profile_report_lines():
+            terminalreporter.write_line(line)
+    retry_lines = STEP_RETRIES.report_lines()
+    if retry_lines:
+        terminalreporter.write_sep("-", "step retries / rebuilt prerequisites")
+        for line in retry_lines:
+            terminalreporter.write_line(line)
+    locator_lines = LOCATOR_CACHE.report_lines()
+    if locator_lines:
+        terminalreporter.write_sep("-", "locator resolution cache (winning selector variants)")
+        for line in locator_lines:
+            terminalreporter.write_line(line)
+    state = config.stash.get(SESSION_STATE_KEY, None)
+    if state is not None and (state.stats.restored or state.stats.saved):
+        terminalreporter.write_sep("-", "browser session state")
+        for line in state.report_lines():
+            terminalreporter.write_line(line)
+    schema_lines = SCHEMAS.report_lines()
+    if schema_lines:
+        terminalreporter.write_sep("-", "response schemas")
+        for line in schema_lines:
+            terminalreporter.write_line(line)
+    budget_lines = command_budget.report_lines()
+    if budget_lines:
+        terminalreporter.write_sep("-", "webdriver command budgets exceeded")
+        for line in budget_lines:
+            terminalreporter.write_line(line)
+    if CAPTURE.stats.pages or CAPTURE.stats.bodies:
+        terminalreporter.write_sep("-", "failure capture")
+        for line in CAPTURE.report_lines():
+            terminalreporter.write_line(line)
+    if ARTIFACTS.stats.submitted:
+        terminalreporter.write_sep("-", "artifact writer")
+        for line in ARTIFACTS.report_lines() + ARTIFACT_STORE.report_lines():
+            terminalreporter.write_line(line)
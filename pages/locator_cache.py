@@ -0,0 +1,195 @@
+# pages/locator_cache.py
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+from selenium.webdriver.common.by import By
+
+from pages.page_scripts import RESOLVE_LOCATORS_JS
+from utils.locator_scripts import js_locators
+
+STATS_FILE = Path("reports") / "locators" / "resolution_stats.json"
+MODES = ("on", "off", "reset")
+# straight misses (another variant matched, this one did not) after which a variant is tried last
+DEMOTE_AFTER = 3
+# weight an older hit keeps per resolution; the variant with the highest decayed score is tried first
+DECAY = 0.9
+
+
+@dataclass
+class VariantStats:
+    hits: int = 0
+    misses: int = 0
+    streak: int = 0  # consecutive misses
+    score: float = 0.0
+    last_hit: Optional[float] = None
+
+
+@dataclass
+class GroupRun:
+    """this run only"""
+    resolved: int = 0
+    first_try: int = 0  # the variant tried first was the one that matched
+    unmatched: int = 0  # no variant matched (element legitimately absent, or all selectors stale)
+
+
+def variant_key(locator) -> str:
+    return f"{locator[0]}={locator[1]}"
+
+
+def split_css(locator) -> list:
+    """(By.CSS_SELECTOR, "a, b[x='1,2']") -> [(By.CSS_SELECTOR, "a"), (By.CSS_SELECTOR, "b[x='1,2']")]"""
+    by, value = locator
+    if by != By.CSS_SELECTOR:
+        return [locator]
+    parts, depth, quote, current = [], 0, None, ""
+    for ch in value:
+        if quote:
+            quote = None if ch == quote else quote
+        elif ch in "'\"":
+            quote = ch
+        elif ch in "[(":
+            depth += 1
+        elif ch in "])":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        current += ch
+    parts.append(current.strip())
+    return [(By.CSS_SELECTOR, p) for p in parts if p]
+
+
+class LocatorCache:
+    """
+    Remembers which variant of a multi-selector locator matched, per site and locator group,
+    across runs. order() puts the historical winner first and demoted variants (DEMOTE_AFTER
+    straight misses while another variant matched) last; record() feeds one resolution back.
+    A variant tried before the winner counts as a miss; nothing is learned when none matched.
+    """
+
+    def __init__(self, path: Path = STATS_FILE, enabled: bool = True, demote_after: int = DEMOTE_AFTER):
+        self.path = Path(path)
+        self.enabled = enabled
+        self.demote_after = demote_after
+        self._lock = threading.Lock()
+        self._groups: Optional[dict] = None  # loaded on first use
+        self.runs: dict = {}
+        self.dirty = False
+
+    def configure(self, mode: str = "on", path: Optional[Path] = None) -> "LocatorCache":
+        if mode not in MODES:
+            raise ValueError(f"locator cache mode must be one of {', '.join(MODES)}, got {mode!r}")
+        if path is not None:
+            self.path = Path(path)
+        self.enabled = mode != "off"
+        with self._lock:
+            self._groups = {} if mode == "reset" else None
+            self.dirty = mode == "reset"
+        return self
+
+    @staticmethod
+    def group_name(site: str, name: str) -> str:
+        host = urlparse(site).hostname if "//" in site else site
+        return f"{host or site} {name}"
+
+    def _load(self) -> dict:
+        if self._groups is None:
+            try:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+                self._groups = {g: {k: VariantStats(**v) for k, v in variants.items()} for g, variants in raw.items()}
+            except (OSError, ValueError, TypeError):
+                self._groups = {}
+        return self._groups
+
+    def stats(self, group: str, locator) -> VariantStats:
+        with self._lock:
+            return self._load().get(group, {}).get(variant_key(locator), VariantStats())
+
+    def demoted(self, group: str, locator) -> bool:
+        return self.stats(group, locator).streak >= self.demote_after
+
+    def order(self, group: str, locators) -> list:
+        """indexes into `locators`, best first; declared order when disabled or without history"""
+        if not self.enabled:
+            return list(range(len(locators)))
+        with self._lock:
+            known = self._load().get(group, {})
+            rows = [known.get(variant_key(loc), VariantStats()) for loc in locators]
+        return sorted(range(len(locators)),
+                      key=lambda i: (rows[i].streak >= self.demote_after, -rows[i].score, i))
+
+    def record(self, group: str, locators, order, winner: Optional[int]) -> None:
+        """`winner` indexes `locators` (None: nothing matched); variants ordered ahead of it missed"""
+        if not self.enabled:
+            return
+        with self._lock:
+            run = self.runs.setdefault(group, GroupRun())
+            if winner is None:
+                run.unmatched += 1
+                return
+            run.resolved += 1
+            run.first_try += order[0] == winner
+            variants = self._load().setdefault(group, {})
+            for i in order:
+                s = variants.setdefault(variant_key(locators[i]), VariantStats())
+                if i == winner:
+                    s.hits += 1
+                    s.streak = 0
+                    s.score = s.score * DECAY + 1.0
+                    s.last_hit = time.time()
+                    break
+                s.misses += 1
+                s.streak += 1
+                s.score *= DECAY
+            self.dirty = True
+
+    def save(self) -> Optional[Path]:
+        if not self.enabled or not self.dirty:
+            return None
+        with self._lock:
+            data = {g: {k: asdict(v) for k, v in variants.items()} for g, variants in self._load().items()}
+            self.dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+        return self.path
+
+    def report_lines(self) -> list:
+        lines = []
+        with self._lock:
+            groups = self._load()
+            for group, run in sorted(self.runs.items()):
+                variants = groups.get(group, {})
+                best = max(variants.items(), key=lambda kv: kv[1].score, default=None)
+                stale = sum(1 for v in variants.values() if v.streak >= self.demote_after)
+                winner = f" winner={best[0]} (hits={best[1].hits})" if best else ""
+                lines.append(f"{group}: resolved={run.resolved} first_try={run.first_try} "
+                             f"unmatched={run.unmatched} demoted={stale}{winner}")
+        return lines
+
+
+def resolve(waits, cache: LocatorCache, group: str, locators, timeout: float, clickable: bool = True):
+    """
+    First visible (enabled when `clickable`) element among the locator variants, all raced in one
+    in-page wait, tried in the cache's order. Returns (element, index into `locators`) or (None, None).
+    """
+    order = cache.order(group, locators)
+    try:
+        res = waits.execute_async(RESOLVE_LOCATORS_JS, js_locators([locators[i] for i in order]),
+                                  int(timeout * 1000), clickable, timeout=timeout) or {}
+    except Exception:
+        return None, None
+    winner = order[res["index"]] if res.get("index") is not None else None
+    cache.record(group, locators, order, winner)
+    return res.get("element") if winner is not None else None, winner
+
+
+# process-wide cache shared by page objects; persisted by the conftest session hooks
+LOCATOR_CACHE = LocatorCache()
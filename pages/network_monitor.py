@@ -0,0 +1,220 @@
+# pages/network_monitor.py
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from pages.wait_engine import WaitEngine
+
+# Chrome performance-log events that open / close a request (see chrome_options: goog:loggingPrefs)
+REQUEST_STARTED = "Network.requestWillBeSent"
+REQUEST_RESPONDED = "Network.responseReceived"
+REQUEST_FINISHED = "Network.loadingFinished"
+REQUEST_FAILED = "Network.loadingFailed"
+
+# background / streaming traffic that would never let a live channel page go idle
+IGNORED_URL_PATTERNS = (
+    r"^(data|blob|chrome-extension):",
+    r"\.ts(\?|$)", r"\.m3u8(\?|$)",
+    r"usher\.ttvnw\.net", r"video-edge-", r"video-weaver\.",
+    r"spade\.twitch\.tv", r"countess\.twitch\.tv",
+)
+# a request still open after this long is treated as long-lived (long poll, event stream)
+STALE_AFTER = 10.0
+MAX_RECORDS = 2000
+
+
+@dataclass
+class RequestRecord:
+    request_id: str
+    url: str
+    method: str = "GET"
+    resource_type: Optional[str] = None
+    post_data: Optional[str] = None
+    status: Optional[int] = None
+    started: float = 0.0   # wall-clock seconds of the log entry
+    finished: Optional[float] = None
+    failed: bool = False
+    error: Optional[str] = None
+    seq: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.finished is None else self.finished - self.started
+
+    def matches(self, pattern) -> bool:
+        return bool(pattern.search(f"{self.method} {self.url} {self.post_data or ''}"))
+
+
+class NetworkMonitor:
+    """
+    Readiness from the network instead of the DOM: drains Chrome's performance log
+    (driver.get_log("performance")), tracks in-flight requests by requestId and waits for
+    "no request in flight for N ms" or "a request matching a pattern completed".
+    Without the log (not Chrome, or logging not enabled) a wait that replaces a fixed sleep
+    (`legacy`) falls back to the WaitEngine DOM settle; any other wait returns at once.
+    """
+
+    def __init__(self, driver, ignore=IGNORED_URL_PATTERNS, stale_after: float = STALE_AFTER, clock=time.time):
+        self.driver = driver
+        self.waits = WaitEngine.for_driver(driver)  # fallback + shared ledger
+        self.ignore = [re.compile(p) for p in ignore]
+        self.stale_after = stale_after
+        self.clock = clock
+        self.available: Optional[bool] = None  # unknown until the first drain
+        self.records: dict = {}
+        self.last_activity = 0.0  # wall-clock seconds of the latest tracked request event
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_driver(cls, driver) -> "NetworkMonitor":
+        """one monitor per driver: the performance log is drained destructively"""
+        monitor = getattr(driver, "_qa_network_monitor", None)
+        if monitor is None:
+            monitor = cls(driver)
+            try:
+                driver._qa_network_monitor = monitor
+            except Exception:
+                pass
+        return monitor
+
+    # log intake
+    def _ignored(self, url: str) -> bool:
+        return any(p.search(url or "") for p in self.ignore)
+
+    def feed(self, entries) -> int:
+        """Apply performance-log entries ({"message": "<json>", "timestamp": ms}); returns events used."""
+        used = 0
+        with self._lock:
+            for entry in entries or ():
+                try:
+                    message = json.loads(entry["message"])["message"]
+                    method, params = message["method"], message.get("params") or {}
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if method not in (REQUEST_STARTED, REQUEST_RESPONDED, REQUEST_FINISHED, REQUEST_FAILED):
+                    continue
+                at = float(entry.get("timestamp") or self.clock() * 1000) / 1000.0
+                rid = params.get("requestId")
+                record = self.records.get(rid)
+                if method == REQUEST_STARTED:
+                    request = params.get("request") or {}
+                    if record is None or record.done:
+                        self._seq += 1
+                        record = self.records[rid] = RequestRecord(request_id=rid, url="", started=at, seq=self._seq)
+                    # a redirect reuses the requestId: same record, new url
+                    record.url = request.get("url", record.url)
+                    record.method = request.get("method", record.method)
+                    record.post_data = request.get("postData", record.post_data)
+                    record.resource_type = params.get("type", record.resource_type)
+                elif record is None:
+                    continue
+                elif method == REQUEST_RESPONDED:
+                    record.status = (params.get("response") or {}).get("status")
+                    record.resource_type = params.get("type", record.resource_type)
+                else:
+                    record.finished = at
+                    if method == REQUEST_FAILED:
+                        record.failed = True
+                        record.error = params.get("errorText")
+                if not self._ignored(record.url):
+                    self.last_activity = max(self.last_activity, at)
+                used += 1
+            self._prune()
+        return used
+
+    def _prune(self):
+        if len(self.records) <= MAX_RECORDS:
+            return
+        done = sorted((r for r in self.records.values() if r.done), key=lambda r: r.seq)
+        for record in done[:len(self.records) - MAX_RECORDS]:
+            del self.records[record.request_id]
+
+    def drain(self) -> bool:
+        """Pull new performance-log entries from the browser; False when the log is unavailable."""
+        if self.available is False:
+            return False
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            self.available = False
+            return False
+        self.available = True
+        self.feed(entries)
+        return True
+
+    # state
+    def mark(self) -> int:
+        """Sequence number to pass as `since`: only requests started after this call count."""
+        self.drain()
+        with self._lock:
+            return self._seq
+
+    def in_flight(self) -> list:
+        now = self.clock()
+        with self._lock:
+            return [r for r in self.records.values()
+                    if not r.done and not self._ignored(r.url) and now - r.started < self.stale_after]
+
+    def is_idle(self, idle_ms: int) -> bool:
+        return not self.in_flight() and (self.clock() - self.last_activity) * 1000 >= idle_ms
+
+    def find(self, pattern, since: int = 0, resource_types=None) -> Optional[RequestRecord]:
+        """First completed request started after `since` whose "METHOD url postData" matches `pattern`."""
+        pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        with self._lock:
+            records = sorted(self.records.values(), key=lambda r: r.seq)
+        for r in records:
+            if r.seq > since and r.done and r.matches(pattern) \
+                    and (not resource_types or r.resource_type in resource_types):
+                return r
+        return None
+
+    # waits
+    def _fallback(self, step: str, legacy: Optional[float]) -> bool:
+        return self.waits.settle(step, legacy=legacy) if legacy is not None else False
+
+    def wait_for_idle(self, step: str, idle_ms: int = 500, timeout: float = 10.0,
+                      legacy: Optional[float] = None, poll: float = 0.05) -> bool:
+        """No tracked request in flight for `idle_ms`; False on timeout."""
+        if not self.drain():
+            return self._fallback(step, legacy)
+        started = time.perf_counter()
+        while True:
+            ok = self.is_idle(idle_ms)
+            if ok or time.perf_counter() - started >= timeout:
+                break
+            time.sleep(poll)
+            self.drain()
+        if legacy is not None:
+            self.waits.ledger.record(step, legacy, time.perf_counter() - started)
+        return ok
+
+    def wait_for_request(self, step: str, pattern, timeout: float = 10.0, since: int = 0,
+                         resource_types=None, legacy: Optional[float] = None,
+                         poll: float = 0.05) -> Optional[RequestRecord]:
+        """
+        Until a request matching `pattern` (regex over "METHOD url postData") has finished or
+        failed. Returns its RequestRecord, or None on timeout / when the log is unavailable.
+        """
+        if not self.drain():
+            self._fallback(step, legacy)
+            return None
+        pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        started = time.perf_counter()
+        while True:
+            found = self.find(pattern, since=since, resource_types=resource_types)
+            if found is not None or time.perf_counter() - started >= timeout:
+                break
+            time.sleep(poll)
+            self.drain()
+        if legacy is not None:
+            self.waits.ledger.record(step, legacy, time.perf_counter() - started)
+        return found
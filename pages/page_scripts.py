@@ -0,0 +1,211 @@
+# pages/page_scripts.py
+from utils.locator_scripts import LOCATOR_HELPERS_JS
+
+# Each batched script below starts with LOCATOR_HELPERS_JS so it is a single WebDriver round-trip.
+
+# arguments: [locators], appearTimeoutMs, frameIndexOrNull; callback last.
+# Scans the top document and every same-origin iframe for the first visible, enabled match,
+# clicks it, and reports which locator/frame matched plus the cross-origin frames it could not read.
+CONSENT_SCAN_JS = LOCATOR_HELPERS_JS + """
+var locs = arguments[0], timeoutMs = arguments[1], frameTag = arguments[2];
+var done = arguments[arguments.length - 1];
+var start = performance.now();
+function scanDoc(doc, frame) {
+  for (var i = 0; i < locs.length; i++) {
+    var els = __qaFindAll(doc, locs[i][0], locs[i][1]);
+    for (var j = 0; j < els.length; j++) {
+      var el = els[j];
+      if (!__qaVisible(el) || el.disabled) { continue; }
+      try { el.click(); } catch (e) { continue; }
+      return {matched: true, selector_index: i, frame: frame, text: (el.textContent || '').trim().slice(0, 80)};
+    }
+  }
+  return null;
+}
+function scanAll() {
+  var res = scanDoc(document, frameTag);
+  if (res) { return res; }
+  var cross = [];
+  var frames = document.querySelectorAll('iframe');
+  for (var f = 0; f < frames.length; f++) {
+    var doc = null;
+    try { doc = frames[f].contentDocument; } catch (e) { doc = null; }
+    if (!doc) { cross.push(f); continue; }
+    res = scanDoc(doc, f);
+    if (res) { return res; }
+  }
+  return {matched: false, cross_origin_frames: cross};
+}
+(function tick() {
+  var res = scanAll();
+  if (res.matched || performance.now() - start >= timeoutMs) {
+    res.elapsed_ms = performance.now() - start;
+    return done(res);
+  }
+  setTimeout(tick, 50);
+})();
+"""
+
+
+# arguments: [locators], timeoutMs, clickable; callback last.
+# Races every variant of a locator in one round-trip: each poll checks all of them and resolves with the
+# first variant (in the given order) that has a visible match — enabled too when `clickable` — or with
+# index null once timeoutMs has passed without any.
+RESOLVE_LOCATORS_JS = LOCATOR_HELPERS_JS + """
+var locs = arguments[0], timeoutMs = arguments[1], clickable = arguments[2];
+var done = arguments[arguments.length - 1];
+var start = performance.now();
+function scan() {
+  for (var i = 0; i < locs.length; i++) {
+    var els = __qaFindAll(document, locs[i][0], locs[i][1]);
+    for (var j = 0; j < els.length; j++) {
+      if (__qaVisible(els[j]) && !(clickable && els[j].disabled)) { return {index: i, element: els[j]}; }
+    }
+  }
+  return null;
+}
+(function tick() {
+  var res = scan(), elapsed = performance.now() - start;
+  if (res || elapsed >= timeoutMs) {
+    res = res || {index: null, element: null};
+    res.elapsed_ms = elapsed;
+    return done(res);
+  }
+  setTimeout(tick, 50);
+})();
+"""
+
+
+# Ranked, visibility-filtered candidates for a locator list: selector priority first, then document order.
+CANDIDATES_HELPERS_JS = LOCATOR_HELPERS_JS + """
+function __qaCandidates(locs, limit) {
+  var seen = new Set(), out = [];
+  for (var i = 0; i < locs.length && out.length < limit; i++) {
+    var els = __qaFindAll(document, locs[i][0], locs[i][1]);
+    for (var j = 0; j < els.length && out.length < limit; j++) {
+      var el = els[j];
+      if (seen.has(el) || !__qaVisible(el)) { continue; }
+      seen.add(el);
+      var r = el.getBoundingClientRect();
+      out.push({
+        element: el, href: el.href || el.getAttribute('href') || null, selector_index: i,
+        rect: {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height},
+        in_viewport: r.bottom > 0 && r.top < window.innerHeight
+      });
+    }
+  }
+  return out;
+}
+"""
+
+# arguments: [locators], limit
+FIND_CANDIDATES_JS = CANDIDATES_HELPERS_JS + """
+return __qaCandidates(arguments[0], arguments[1]);
+"""
+
+# arguments: [locators], limit, timeoutMs, nudgeMs; callback last.
+# Resolves the moment a matching card intersects the viewport (IntersectionObserver) or any visible
+# candidate exists; new cards are picked up through a MutationObserver. Every `nudgeMs` the page is
+# scrolled a little to trigger lazy loading, like the old Python polling loop did.
+WAIT_CANDIDATES_JS = CANDIDATES_HELPERS_JS + """
+var locs = arguments[0], limit = arguments[1], timeoutMs = arguments[2], nudgeMs = arguments[3];
+var done = arguments[arguments.length - 1];
+var start = performance.now(), finished = false, observed = new Set();
+var io = null, mo = null, timer = null, nudger = null;
+function finish(reason) {
+  if (finished) { return; }
+  finished = true;
+  if (io) { io.disconnect(); }
+  if (mo) { mo.disconnect(); }
+  clearTimeout(timer);
+  clearInterval(nudger);
+  done({reason: reason, waited_ms: performance.now() - start, candidates: __qaCandidates(locs, limit)});
+}
+function observeAll() {
+  for (var i = 0; i < locs.length; i++) {
+    var els = __qaFindAll(document, locs[i][0], locs[i][1]);
+    for (var j = 0; j < els.length; j++) {
+      if (!observed.has(els[j])) { observed.add(els[j]); if (io) { io.observe(els[j]); } }
+    }
+  }
+}
+function check() {
+  if (__qaCandidates(locs, 1).length) { finish('visible'); }
+}
+if (window.IntersectionObserver) {
+  io = new IntersectionObserver(function (entries) {
+    for (var k = 0; k < entries.length; k++) {
+      if (entries[k].isIntersecting && __qaVisible(entries[k].target)) { finish('intersecting'); return; }
+    }
+  });
+}
+mo = new MutationObserver(function () { observeAll(); check(); });
+mo.observe(document.documentElement, {subtree: true, childList: true, attributes: true});
+observeAll();
+check();
+if (!finished) {
+  timer = setTimeout(function () { finish('timeout'); }, timeoutMs);
+  if (nudgeMs > 0) {
+    nudger = setInterval(function () { window.scrollBy(0, window.innerHeight * 0.6); }, nudgeMs);
+  }
+}
+"""
+
+
+
+# Capture-phase media listeners on the document (media events do not bubble, but capture sees them),
+# installed once per document. They accumulate played time, first-frame time (ms since navigation start)
+# and rebuffer/stall counts in window.__qaPlayback. Safe to run before <html> exists, so it is also
+# registered with Page.addScriptToEvaluateOnNewDocument to catch the very first frame.
+PLAYBACK_HOOKS_JS = """
+(function () {
+  if (window.__qaPlayback) { return; }
+  var st = window.__qaPlayback = {firstFrameAt: null, played: 0, rebuffers: 0, rebufferMs: 0, stalls: 0,
+                                  bufferingSince: null, last: new WeakMap()};
+  function firstFrame(v) {
+    if (st.firstFrameAt === null && !v.paused && v.readyState >= 2) { st.firstFrameAt = performance.now(); }
+  }
+  document.addEventListener('timeupdate', function (e) {
+    var v = e.target, t = v.currentTime, prev = st.last.get(v);
+    if (prev !== undefined && t - prev > 0 && t - prev < 1.5) { st.played += t - prev; }
+    st.last.set(v, t);
+    firstFrame(v);
+  }, true);
+  document.addEventListener('playing', function (e) {
+    firstFrame(e.target);
+    if (st.bufferingSince !== null) { st.rebufferMs += performance.now() - st.bufferingSince; st.bufferingSince = null; }
+  }, true);
+  document.addEventListener('waiting', function () {
+    if (st.firstFrameAt !== null && st.bufferingSince === null) { st.rebuffers += 1; st.bufferingSince = performance.now(); }
+  }, true);
+  document.addEventListener('stalled', function () { st.stalls += 1; }, true);
+})();
+"""
+
+# arguments: targetSeconds, timeoutMs, noVideoMs, playerCss; callback last.
+# One round-trip: resolves in-page once `targetSeconds` more playback has been observed (starting a
+# paused <video> once), or when only a non-<video> player is present after noVideoMs, or on timeout.
+PLAYBACK_MONITOR_JS = PLAYBACK_HOOKS_JS + """
+var target = arguments[0], timeoutMs = arguments[1], noVideoMs = arguments[2], playerCss = arguments[3];
+var done = arguments[arguments.length - 1];
+var st = window.__qaPlayback, start = performance.now(), baseline = st.played, nudged = false;
+function result(reason, video) {
+  return {reason: reason, reached: reason === 'played' || reason === 'no_video_player', video: video,
+          played: st.played - baseline, first_frame_ms: st.firstFrameAt, rebuffers: st.rebuffers,
+          rebuffer_ms: st.rebufferMs, stalls: st.stalls, waited_ms: performance.now() - start};
+}
+(function tick() {
+  var v = document.querySelector('video'), elapsed = performance.now() - start;
+  if (v) {
+    if (v.paused && !nudged) {
+      nudged = true;
+      try { var p = v.play(); if (p && p.catch) { p.catch(function () {}); } } catch (e) {}
+    }
+    if (st.played - baseline >= target) { return done(result('played', true)); }
+  } else if (elapsed >= noVideoMs && document.querySelector(playerCss)) {
+    return done(result('no_video_player', false));
+  }
+  if (elapsed >= timeoutMs) { return done(result('timeout', !!v)); }
+  setTimeout(tick, 100);
+})();
+"""
@@ -6,20 +6,55 @@ from pathlib import Path
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
+from selenium.common.exceptions import TimeoutException
+from pages.locator_cache import LOCATOR_CACHE, LocatorCache, resolve, split_css
+from pages.page_scripts import CONSENT_SCAN_JS, FIND_CANDIDATES_JS, WAIT_CANDIDATES_JS
+from pages.network_monitor import NetworkMonitor
+from pages.wait_engine import WaitEngine
+from utils.artifact_store import STORE, ArtifactStore
+from utils.capture import CAPTURE, note_locators
+from utils.locator_scripts import js_locators
+from utils.session_state import SessionStateCache
+from utils.step_timing import timed_steps
 
 REPORTS_DIR = Path("reports")
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
-DEBUG_DIR = REPORTS_DIR / "debug"
-DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+# how long the consent scan may wait in-page for a late banner (0 = single immediate scan)
+CONSENT_APPEAR_TIMEOUT = 0.0
+# ranked stream-card candidates returned per in-page query
+CANDIDATE_LIMIT = 20
+# network readiness: quiet period after load, and the XHR/fetch that carries search results
+NETWORK_IDLE_MS = 250
+SEARCH_RESULTS_REQUEST = r"SearchResultsPage_SearchResults|/api/search\b"
+SEARCH_RESULTS_TYPES = ("XHR", "Fetch")
 
 
+def _is_stream_url(url: str) -> bool:
+    url = (url or "").lower()
+    return "/videos" in url or "/channel/" in url or "twitch.tv" in url
+
+
+@timed_steps
 class TwitchHomePage:
-    def __init__(self, driver, timeout: int = 15):
+    BASE_URL = "https://www.twitch.tv"
+
+    def __init__(self, driver, timeout: int = 15, base_url: str = BASE_URL,
+                 artifacts: ArtifactStore = STORE, session_state: SessionStateCache = None,
+                 locator_cache: LocatorCache = LOCATOR_CACHE):
         self.driver = driver
         self.wait = WebDriverWait(driver, timeout)
         self.timeout = timeout
+        self.base_url = base_url.rstrip("/")
+        self.artifacts = artifacts
+        self.waits = WaitEngine.for_driver(driver)
+        self.network = NetworkMonitor.for_driver(driver)
+        self.consent_report = {}
+        self.last_candidates = []
+        self.session_state = session_state
+        self.restored_state = None  # SessionState pushed into the browser before the first navigation
+        self.state_verified = False
+        self.locator_cache = locator_cache  # which variant of each multi-selector locator wins on this site
 
     # locators
     COOKIES_SELECTORS = [
@@ -43,93 +78,158 @@ class TwitchHomePage:
     ]
 
     # helpers
-    def _safe_save_debug(self, prefix: str):
+    def _safe_save_debug(self, prefix: str, locators=None):
         try:
-            ts = int(time.time())
-            png = DEBUG_DIR / f"{prefix}_{ts}.png"
-            html = DEBUG_DIR / f"{prefix}_{ts}.html"
-            self.driver.save_screenshot(str(png))
-            html.write_text(self.driver.page_source, encoding="utf-8")
+            # sized by the capture level (DOM trimmed around `locators`); store writes run on the artifact writer
+            CAPTURE.capture_page(self.driver, prefix, store=self.artifacts, locators=locators)
         except Exception:
             pass
 
+    def _group(self, name: str) -> str:
+        return self.locator_cache.group_name(self.base_url, f"TwitchHomePage.{name}")
+
+    def _ranked(self, name: str, locators) -> tuple:
+        """(cache group, variant order, locators in that order) for one multi-selector locator"""
+        group = self._group(name)
+        order = self.locator_cache.order(group, locators)
+        return group, order, [locators[i] for i in order]
+
+    def _candidates(self, found, group: str, order: list) -> list:
+        """map ranked-candidate selector indexes back to STREAM_CARD_SELECTORS and feed the winner to the cache"""
+        found = found or []
+        for c in found:
+            c["selector_index"] = order[c["selector_index"]]
+        if found:
+            self.locator_cache.record(group, self.STREAM_CARD_SELECTORS, order, found[0]["selector_index"])
+        self.last_candidates = [{k: v for k, v in c.items() if k != "element"} for c in found]
+        return found
+
+    def _save_state(self):
+        if self.session_state is not None:
+            self.session_state.save(self.driver, self.base_url)
+
     # Steps
-    def go_to_twitch(self, url: str = "https://www.twitch.tv/"):
-        self.driver.get(url)
+    def go_to_twitch(self, url: str = None):
+        if self.session_state is not None and self.restored_state is None:
+            # warm run: cookies + storage from an earlier session, in place before the page loads
+            self.restored_state = self.session_state.restore(self.driver, self.base_url)
+        self.driver.get(url or f"{self.base_url}/")
         try:
             self.wait.until(lambda d: d.execute_script("return document.readyState") in ("interactive", "complete"))
         except TimeoutException:
             pass
-        time.sleep(0.5)
+        self.network.wait_for_idle("go_to_twitch", idle_ms=NETWORK_IDLE_MS, timeout=0.5, legacy=0.5)
 
-    def handle_cookies(self) -> bool:
+    def handle_cookies(self, appear_timeout: float = CONSENT_APPEAR_TIMEOUT) -> bool:
         """
-        Try to click common Accept buttons (including inside iframes).
+        Click the first visible Accept button (COOKIES_SELECTORS) in one injected script that
+        scans the top document and every same-origin iframe; only cross-origin iframes are
+        probed one by one. `appear_timeout` lets the scan wait in-page for a late banner.
         Always save cookies to reports/cookies.json (for debugging / audit).
+        Timings per strategy are kept in self.consent_report. Selectors are scanned in the locator
+        cache's order, so the variant that accepted last time is tried first.
+        When go_to_twitch() restored a saved session state and its cookies are present, no banner is
+        scanned (one cookie read, then cookies.json); otherwise a clicked banner's resulting state is
+        saved for next time.
         Return True (permissive) so test continues even if no banner was present.
         """
         handled = False
+        report = {"matched": False, "strategy": None, "selector": None, "frame": None, "timings": {}}
+        self.consent_report = report
+
+        if self.restored_state is not None:
+            started = time.perf_counter()
+            self.state_verified = self.session_state.verify(self.driver, self.restored_state, self.base_url)
+            report["timings"]["restored_state"] = time.perf_counter() - started
+            if self.state_verified:
+                report.update(matched=True, strategy="restored_state")
+                self._write_cookies_json(report)
+                return True
+            self.restored_state = None
+        # historical winner first; one scan still checks every variant
+        group, order, ranked = self._ranked("COOKIES_SELECTORS", self.COOKIES_SELECTORS)
+        locators = js_locators(ranked)
 
-        # 1) try top-level buttons
-        for locator in self.COOKIES_SELECTORS:
+        def matched(res, strategy):
+            index = order[res["selector_index"]]
+            self.locator_cache.record(group, self.COOKIES_SELECTORS, order, index)
+            report.update(matched=True, strategy=strategy, frame=res.get("frame"),
+                          selector=list(self.COOKIES_SELECTORS[index]))
+
+        # 1) one round-trip: top document + same-origin iframes, all selectors
+        started = time.perf_counter()
+        cross_origin = None
+        try:
+            res = self.waits.execute_async(CONSENT_SCAN_JS, locators, int(appear_timeout * 1000), None,
+                                           timeout=appear_timeout)
+            if res and res.get("matched"):
+                matched(res, "batched_scan")
+                handled = True
+            else:
+                cross_origin = (res or {}).get("cross_origin_frames", [])
+        except Exception:
+            cross_origin = None  # scan unavailable -> probe every frame below
+        report["timings"]["batched_scan"] = time.perf_counter() - started
+
+        # 2) cross-origin iframes only: switch in and run the same scan inside each
+        if not handled and cross_origin != []:
+            started = time.perf_counter()
             try:
-                btn = WebDriverWait(self.driver, 2).until(EC.element_to_be_clickable(locator))
-                try:
-                    btn.click()
-                except ElementClickInterceptedException:
+                frames = self.driver.find_elements(By.TAG_NAME, "iframe")
+                indexes = cross_origin if cross_origin is not None else range(len(frames))
+                for idx in indexes:
+                    if idx >= len(frames):
+                        continue
                     try:
-                        self.driver.execute_script("arguments[0].click();", btn)
+                        self.driver.switch_to.frame(frames[idx])
+                        res = self.waits.execute_async(CONSENT_SCAN_JS, locators, 0, idx, timeout=1)
+                        if res and res.get("matched"):
+                            matched(res, "cross_origin_frame")
+                            handled = True
                     except Exception:
                         pass
-                time.sleep(0.4)
-                handled = True
-                break
-            except Exception:
-                continue
-
-        # 2) try inside iframes (best-effort)
-        try:
-            frames = self.driver.find_elements(By.TAG_NAME, "iframe")
-            for fr in frames:
-                try:
-                    self.driver.switch_to.frame(fr)
-                    for locator in self.COOKIES_SELECTORS:
+                    finally:
                         try:
-                            inner = self.driver.find_element(*locator)
-                            try:
-                                self.driver.execute_script("arguments[0].click();", inner)
-                            except Exception:
-                                pass
-                            time.sleep(0.3)
-                            handled = True
-                            break
+                            self.driver.switch_to.default_content()
                         except Exception:
-                            continue
-                    self.driver.switch_to.default_content()
+                            pass
                     if handled:
                         break
-                except Exception:
-                    try:
-                        self.driver.switch_to.default_content()
-                    except Exception:
-                        pass
-        except Exception:
-            pass
+            except Exception:
+                pass
+            report["timings"]["cross_origin_frames"] = time.perf_counter() - started
+
+        if handled:
+            started = time.perf_counter()
+            self.waits.settle("handle_cookies.click", legacy=0.4)
+            report["timings"]["settle"] = time.perf_counter() - started
 
         # 3) JS fallback: remove known cookie containers
         if not handled:
+            started = time.perf_counter()
             try:
                 self.driver.execute_script("""
                     document.querySelectorAll(
                       '.cookie, .cookies, .cookie-banner, #cookie-banner, .consent, .gdpr, .onetrust-banner-sdk'
                     ).forEach(function(e){ try{ e.remove(); } catch(e){} });
                 """)
-                time.sleep(0.2)
+                self.waits.settle("handle_cookies.js_remove", legacy=0.2)
+                report["strategy"] = "js_remove"
                 handled = True
             except Exception:
                 pass
+            report["timings"]["js_remove"] = time.perf_counter() - started
 
         # 4) Save cookies to file for traceability (even if empty)
+        self._write_cookies_json(report)
+
+        if report["matched"]:
+            self._save_state()
+        return True
+
+    def _write_cookies_json(self, report: dict):
+        """reports/cookies.json with the browser's current cookies, on every handle_cookies() path."""
+        started = time.perf_counter()
         try:
             cookies = self.driver.get_cookies()
             path = REPORTS_DIR / "cookies.json"
@@ -137,12 +237,16 @@ class TwitchHomePage:
                 json.dump(cookies, f, ensure_ascii=False, indent=2)
         except Exception:
             pass
-
-        return True
+        report["timings"]["save_cookies"] = time.perf_counter() - started
 
     def handle_app_modal(self) -> bool:
         """Close 'Download app' modal if visible — multiple strategies."""
         try:
+            if self.state_verified:
+                # warm run: the dismissal is usually in the restored storage — check once, no wait
+                if not self.driver.execute_script("return !!document.querySelector(arguments[0]);", self.APP_MODAL[1]):
+                    return False
+            note_locators(self.driver, [self.APP_MODAL])
             try:
                 WebDriverWait(self.driver, 1).until(EC.presence_of_element_located(self.APP_MODAL))
             except TimeoutException:
@@ -154,24 +258,24 @@ class TwitchHomePage:
                 (By.CSS_SELECTOR, ".app-modal .close"),
                 (By.CSS_SELECTOR, "button[aria-label='Close']")
             ]
-            for loc in close_candidates:
+            # all candidates raced in one in-page wait (was up to 2s per candidate), last winner first
+            btn, _ = resolve(self.waits, self.locator_cache, self._group("close_candidates"), close_candidates,
+                             timeout=2)
+            if btn is not None:
                 try:
-                    btn = WebDriverWait(self.driver, 2).until(EC.element_to_be_clickable(loc))
-                    try:
-                        btn.click()
-                    except Exception:
-                        try:
-                            self.driver.execute_script("arguments[0].click();", btn)
-                        except Exception:
-                            pass
+                    btn.click()
+                except Exception:
                     try:
-                        WebDriverWait(self.driver, 2).until(EC.invisibility_of_element(btn))
+                        self.driver.execute_script("arguments[0].click();", btn)
                     except Exception:
                         pass
-                    time.sleep(0.2)
-                    return True
+                try:
+                    WebDriverWait(self.driver, 2).until(EC.invisibility_of_element(btn))
                 except Exception:
-                    continue
+                    pass
+                self.waits.settle("handle_app_modal.close", legacy=0.2)
+                self._save_state()
+                return True
 
             # last-resort JS remove
             try:
@@ -181,44 +285,55 @@ class TwitchHomePage:
                             document.querySelector('.app-modal');
                     if (s) { s.remove(); }
                 """)
-                time.sleep(0.2)
+                self.waits.settle("handle_app_modal.js_remove", legacy=0.2)
                 return True
             except Exception:
                 pass
             return False
         except Exception:
-            self._safe_save_debug("app_modal_failed")
+            self._safe_save_debug("app_modal_failed", [self.APP_MODAL])
             return False
 
     def search_for_game(self, query: str) -> bool:
         """Click search and type query, fallback to direct search URL."""
+        note_locators(self.driver, [self.SEARCH_INPUT, self.SEARCH_ICON])
+        # the composite CSS locators are raced per variant, so the cache learns which one Twitch serves
+        icon, _ = resolve(self.waits, self.locator_cache, self._group("SEARCH_ICON"), split_css(self.SEARCH_ICON),
+                          timeout=6)
+        if icon is None:
+            return self._direct_search_url(query)
         try:
-            icon = WebDriverWait(self.driver, 6).until(EC.element_to_be_clickable(self.SEARCH_ICON))
+            icon.click()
+        except Exception:
             try:
-                icon.click()
+                self.driver.execute_script("arguments[0].click();", icon)
             except Exception:
-                try:
-                    self.driver.execute_script("arguments[0].click();", icon)
-                except Exception:
-                    pass
-        except TimeoutException:
-            return self._direct_search_url(query)
+                pass
 
         try:
-            input_el = WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located(self.SEARCH_INPUT))
+            input_el, _ = resolve(self.waits, self.locator_cache, self._group("SEARCH_INPUT"),
+                                  split_css(self.SEARCH_INPUT), timeout=5, clickable=False)
+            if input_el is None:
+                return self._direct_search_url(query)
             input_el.clear()
             input_el.send_keys(query)
+            since = self.network.mark()
             input_el.send_keys("\n")
-            # small wait for results to settle
-            time.sleep(1.0)
+            # results are in once the search request has completed (DOM settle without the perf log)
+            self.network.wait_for_request("search_for_game", SEARCH_RESULTS_REQUEST, timeout=1.0, since=since,
+                                          resource_types=SEARCH_RESULTS_TYPES, legacy=1.0)
             return True
         except Exception:
             return self._direct_search_url(query)
 
     def _direct_search_url(self, query: str) -> bool:
         q = urllib.parse.quote_plus(query)
-        url = f"https://www.twitch.tv/search?term={q}"
+        url = f"{self.base_url}/search?term={q}"
+        since = self.network.mark()
         self.driver.get(url)
+        if self.network.wait_for_request("_direct_search_url", SEARCH_RESULTS_REQUEST, timeout=6, since=since,
+                                         resource_types=SEARCH_RESULTS_TYPES):
+            return True
         try:
             WebDriverWait(self.driver, 6).until(lambda d: "search" in d.current_url.lower() or d.execute_script("return document.readyState") == "complete")
         except Exception:
@@ -228,49 +343,59 @@ class TwitchHomePage:
     def scroll_fixed(self, times: int = 2, pause: float = 1.0):
         """Perform exactly `times` scroll actions (assignment requires 2)."""
         for _ in range(times):
+            height = 0
             try:
-                self.driver.execute_script("window.scrollBy(0, window.innerHeight * 0.9);")
+                height = self.driver.execute_script(
+                    "var h = document.documentElement.scrollHeight; window.scrollBy(0, window.innerHeight * 0.9); return h;")
             except Exception:
                 try:
                     self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                 except Exception:
                     pass
-            time.sleep(pause)
+            self.waits.scroll_height_changed("scroll_fixed", height or 0, legacy=pause)
+
+    def find_stream_candidates(self, limit: int = CANDIDATE_LIMIT) -> list:
+        """
+        Visible STREAM_CARD_SELECTORS matches in one execute_script call, ranked by selector
+        (the locator cache's order: historical winner first) then document order:
+        [{element, href, rect, selector_index, in_viewport}, ...]; selector_index is the declared one.
+        """
+        group, order, ranked = self._ranked("STREAM_CARD_SELECTORS", self.STREAM_CARD_SELECTORS)
+        try:
+            found = self.driver.execute_script(FIND_CANDIDATES_JS, js_locators(ranked), limit)
+        except Exception:
+            found = []
+        return self._candidates(found, group, order)
+
+    def wait_for_stream_candidate(self, timeout: float = 15, limit: int = CANDIDATE_LIMIT) -> list:
+        """
+        Block (in-page, IntersectionObserver + MutationObserver) until a stream card is visible,
+        nudging the page down every 500ms to trigger lazy loading. Returns the ranked candidates.
+        """
+        group, order, ranked = self._ranked("STREAM_CARD_SELECTORS", self.STREAM_CARD_SELECTORS)
+        try:
+            res = self.waits.execute_async(WAIT_CANDIDATES_JS, js_locators(ranked), limit,
+                                           int(timeout * 1000), 500, timeout=timeout)
+        except Exception:
+            return self.find_stream_candidates(limit)
+        return self._candidates((res or {}).get("candidates"), group, order)
 
     def click_first_streamer(self, wait_for_navigation: bool = True) -> bool:
         """
         Robust click on first anchor that looks like a streamer/video link.
         Returns True on success.
         """
+        note_locators(self.driver, self.STREAM_CARD_SELECTORS)
         try:
-            end = time.time() + max(self.timeout, 15)
-            candidates = []
-            while time.time() < end:
-                candidates = []
-                try:
-                    anchors = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='/videos/'], a[href*='/channel/'], a[data-test-selector='preview-card-title-link']")
-                except Exception:
-                    anchors = []
-                for a in anchors:
-                    try:
-                        if a.is_displayed():
-                            candidates.append(a)
-                    except Exception:
-                        continue
-                if candidates:
-                    break
-                # quick scroll to force load, then try again
-                try:
-                    self.driver.execute_script("window.scrollBy(0, window.innerHeight * 0.6);")
-                except Exception:
-                    pass
-                time.sleep(0.5)
+            candidates = self.find_stream_candidates()
+            if not candidates:
+                candidates = self.wait_for_stream_candidate(timeout=max(self.timeout, 15))
 
             if not candidates:
-                self._safe_save_debug("click_first_streamer_no_candidates")
+                self._safe_save_debug("click_first_streamer_no_candidates", self.STREAM_CARD_SELECTORS)
                 return False
 
-            target = candidates[0]
+            target = candidates[0]["element"]
             try:
                 self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", target)
             except Exception:
@@ -292,10 +417,11 @@ class TwitchHomePage:
             # wait short for navigation/spa update
             if wait_for_navigation:
                 try:
-                    WebDriverWait(self.driver, 8).until(lambda d: d.current_url and ("/videos" in d.current_url.lower() or "/channel/" in d.current_url.lower() or "twitch.tv" in d.current_url.lower()))
+                    # one getCurrentUrl round-trip per poll
+                    WebDriverWait(self.driver, 8).until(lambda d: _is_stream_url(d.current_url))
                 except Exception:
-                    time.sleep(1.5)
+                    self.waits.settle("click_first_streamer.navigation", legacy=1.5)
             return True
         except Exception:
-            self._safe_save_debug("click_first_streamer_failed_final")
+            self._safe_save_debug("click_first_streamer_failed_final", self.STREAM_CARD_SELECTORS)
             return False
@@ -1,23 +1,55 @@
 # pages/twitch_streamer_page.py
-import time
+from dataclasses import dataclass, asdict
 from pathlib import Path
+from typing import Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from pages.page_scripts import PLAYBACK_HOOKS_JS, PLAYBACK_MONITOR_JS
+from pages.wait_engine import WaitEngine
+from utils.artifact_store import STORE, ArtifactStore
+from utils.artifacts import ARTIFACTS
+from utils.capture import CAPTURE
+from utils.step_timing import timed_steps
 
 REPORTS_DIR = Path("reports")
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
-SCREENSHOTS_DIR = REPORTS_DIR / "screenshots"
-SCREENSHOTS_DIR.mkdir(parents=True, exist_ok=True)
-DEBUG_DIR = REPORTS_DIR / "debug"
-DEBUG_DIR.mkdir(parents=True, exist_ok=True)
 
+# how long a page with a player container but no <video> is given before it counts as played (best-effort)
+NO_VIDEO_GRACE_MS = 2000
 
+
+@dataclass
+class PlaybackMetrics:
+    """Outcome of wait_for_video_playback(); truthy when the target playback time was reached."""
+    reached: bool = False
+    target_seconds: float = 0.0
+    played_seconds: float = 0.0
+    time_to_first_frame: Optional[float] = None  # seconds from navigation start, None if not observed
+    rebuffer_count: int = 0
+    rebuffer_seconds: float = 0.0
+    stall_events: int = 0
+    video_found: bool = False
+    waited_seconds: float = 0.0
+    reason: str = ""
+
+    def __bool__(self) -> bool:
+        return self.reached
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@timed_steps
 class TwitchStreamerPage:
-    def __init__(self, driver, timeout: int = 25):
+    def __init__(self, driver, timeout: int = 25, artifacts: ArtifactStore = STORE):
         self.driver = driver
         self.wait = WebDriverWait(driver, timeout)
         self.timeout = timeout
+        self.artifacts = artifacts
+        self.waits = WaitEngine.for_driver(driver)
+        self.last_playback: Optional[PlaybackMetrics] = None
+        self.install_playback_monitor()
 
     STREAMER_NAME = (By.CSS_SELECTOR, "[data-a-target='channel-name'], h1, .channel-info__username, .tw-title")
     STREAM_PLAYER = (By.CSS_SELECTOR, "video, [data-a-player-state], .video-player__container, [data-test-selector='video-player']")
@@ -34,15 +66,12 @@ class TwitchStreamerPage:
                 WebDriverWait(self.driver, 6).until(EC.visibility_of_element_located(self.STREAMER_NAME))
             except Exception:
                 pass
-            time.sleep(1)
+            self.waits.settle("wait_for_full_load", legacy=1.0)
             return True
         except Exception:
             try:
-                ts = int(time.time())
-                png = DEBUG_DIR / f"stream_full_load_failed_{ts}.png"
-                html = DEBUG_DIR / f"stream_full_load_failed_{ts}.html"
-                self.driver.save_screenshot(str(png))
-                html.write_text(self.driver.page_source, encoding="utf-8")
+                CAPTURE.capture_page(self.driver, "stream_full_load_failed", store=self.artifacts,
+                                     locators=[self.STREAM_PLAYER, self.STREAMER_NAME])
             except Exception:
                 pass
             return False
@@ -57,68 +86,51 @@ class TwitchStreamerPage:
             except Exception:
                 return ""
 
-    def wait_for_video_playback(self, seconds: float = 5.0, timeout: int = 60) -> bool:
+    def install_playback_monitor(self):
         """
-        Wait until an HTML5 <video>'s currentTime advances by `seconds`.
-        If no <video> element found, but player container exists, return True (best-effort).
+        Register the playback listeners for every new document (CDP) so time-to-first-frame is
+        measured from navigation; wait_for_video_playback() installs them itself when CDP is unavailable.
+        Registered once per driver; the script identifier is kept so DriverPool.reset() can remove it.
         """
-        get_current_time_js = "return (function(){ var v=document.querySelector('video'); return v? v.currentTime : null; })();"
-        end = time.time() + timeout
-
-        # wait for some player element
+        if getattr(self.driver, "_qa_playback_hooks", None):
+            return
         try:
-            WebDriverWait(self.driver, min(10, timeout)).until(
-                lambda d: d.execute_script("return (document.querySelector('video')!==null) || (document.querySelector('[data-a-player-state]')!==null) || (document.querySelector('.video-player__container')!==null);")
-            )
+            res = self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": PLAYBACK_HOOKS_JS})
+            self.driver._qa_playback_hooks = (res or {}).get("identifier")
         except Exception:
             pass
 
-        # initial read
-        initial = None
-        for _ in range(4):
-            try:
-                initial = self.driver.execute_script(get_current_time_js)
-            except Exception:
-                initial = None
-            if initial is not None:
-                break
-            time.sleep(0.5)
-
-        if initial is None:
-            # fallback: treat presence of STREAM_PLAYER as success
-            try:
-                WebDriverWait(self.driver, 10).until(EC.presence_of_element_located(self.STREAM_PLAYER))
-                return True
-            except Exception:
-                return False
-
-        # try to play if paused
+    def wait_for_video_playback(self, seconds: float = 5.0, timeout: int = 60) -> PlaybackMetrics:
+        """
+        Wait until the HTML5 <video> has played `seconds` more, in one async script call driven by
+        media events (see PLAYBACK_MONITOR_JS). A paused video is started once.
+        If no <video> element is found but the player container exists, it counts as reached (best-effort).
+        The result is truthy when the target was reached.
+        """
+        metrics = PlaybackMetrics(target_seconds=float(seconds))
         try:
-            is_paused = self.driver.execute_script("var v=document.querySelector('video'); return v? v.paused : null;")
-            if is_paused:
-                try:
-                    self.driver.execute_script("var v=document.querySelector('video'); if(v && v.paused) { try { v.play(); } catch(e){} }")
-                except Exception:
-                    pass
-        except Exception:
-            pass
+            res = self.waits.execute_async(PLAYBACK_MONITOR_JS, float(seconds), int(timeout * 1000),
+                                           NO_VIDEO_GRACE_MS, self.STREAM_PLAYER[1], timeout=timeout)
+        except Exception as exc:
+            metrics.reason = f"error: {type(exc).__name__}"
+            self.last_playback = metrics
+            return metrics
 
-        target = (initial or 0.0) + float(seconds)
-        while time.time() < end:
-            try:
-                cur = self.driver.execute_script(get_current_time_js)
-            except Exception:
-                cur = None
-            if cur is not None:
-                try:
-                    cur = float(cur)
-                except Exception:
-                    pass
-                if cur >= target or cur >= float(seconds):
-                    time.sleep(0.5)  # stabilization
-                    return True
-            time.sleep(0.4)
-        return False
+        res = res or {}
+        first_frame_ms = res.get("first_frame_ms")
+        metrics.reached = bool(res.get("reached"))
+        metrics.reason = res.get("reason") or ""
+        metrics.video_found = bool(res.get("video"))
+        metrics.played_seconds = float(res.get("played") or 0.0)
+        metrics.time_to_first_frame = first_frame_ms / 1000.0 if first_frame_ms is not None else None
+        metrics.rebuffer_count = int(res.get("rebuffers") or 0)
+        metrics.rebuffer_seconds = float(res.get("rebuffer_ms") or 0.0) / 1000.0
+        metrics.stall_events = int(res.get("stalls") or 0)
+        metrics.waited_seconds = float(res.get("waited_ms") or 0.0) / 1000.0
+        self.last_playback = metrics
+        if metrics.reached and metrics.video_found:
+            self.waits.settle("wait_for_video_playback.stabilize", legacy=0.5)  # stabilization
+        return metrics
 
     def take_screenshot_after_playback(self, filename_prefix: str = "streamer", playback_seconds: float = 5.0, timeout: int = 60) -> str | None:
         """
@@ -134,17 +146,16 @@ class TwitchStreamerPage:
             played = self.wait_for_video_playback(seconds=playback_seconds, timeout=timeout)
             # even if not observed, wait small stabilization
             if not played:
-                time.sleep(1.5)
+                self.waits.settle("take_screenshot_after_playback", legacy=1.5)
 
-            ts = int(time.time())
-            path = SCREENSHOTS_DIR / f"{filename_prefix}_{ts}.png"
-            self.driver.save_screenshot(str(path))
+            # content-addressed blob written by the artifact writer; readers use ARTIFACTS.wait_for(path)
+            path = ARTIFACTS.submit_blob(self.driver.get_screenshot_as_png(), "png",
+                                         step=filename_prefix, store=self.artifacts)
             return str(path)
         except Exception:
             try:
-                ts = int(time.time())
-                fallback = SCREENSHOTS_DIR / f"{filename_prefix}_failed_{ts}.png"
-                self.driver.save_screenshot(str(fallback))
+                fallback = ARTIFACTS.submit_blob(self.driver.get_screenshot_as_png(), "png",
+                                                 step=f"{filename_prefix}_failed", store=self.artifacts)
                 return str(fallback)
             except Exception:
                 return None
@@ -0,0 +1,171 @@
+# pages/wait_engine.py
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+# WebDriver errors meaning the document went away under the script (navigation), not that the wait failed
+NAVIGATION_ERRORS = ("document unloaded", "execution context was destroyed", "target frame detached",
+                     "inspected target navigated")
+
+
+def _is_navigation(exc: WebDriverException) -> bool:
+    message = (getattr(exc, "msg", None) or str(exc)).lower()
+    return any(marker in message for marker in NAVIGATION_ERRORS)
+
+# Installed once per document (idempotent): a MutationObserver + scroll listener that stamp
+# the last DOM activity. The same async script then polls in-page (no WebDriver round-trips)
+# until the predicate holds, or the DOM has been quiet for `quietMs`, or `timeoutMs` elapses.
+WAIT_JS = """
+var predSrc = arguments[0], quietMs = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var st = window.__qaWait;
+if (!st) {
+  st = window.__qaWait = {last: performance.now(), count: 0};
+  try {
+    new MutationObserver(function (records) { st.last = performance.now(); st.count += records.length; })
+      .observe(document.documentElement || document, {subtree: true, childList: true, attributes: true, characterData: true});
+  } catch (e) {}
+  window.addEventListener('scroll', function () { st.last = performance.now(); }, {passive: true});
+}
+var pred = predSrc ? new Function(predSrc) : null;
+var start = performance.now();
+(function tick() {
+  var now = performance.now(), ok = false;
+  try {
+    ok = pred ? !!pred() : (document.readyState !== 'loading' && now - st.last >= quietMs);
+  } catch (e) { ok = false; }
+  if (ok || now - start >= timeoutMs) {
+    return done({ok: ok, waited: (now - start) / 1000.0, mutations: st.count});
+  }
+  setTimeout(tick, 16);
+})();
+"""
+
+
+class WaitLedger:
+    """Per-step totals of the fixed sleep a wait replaced vs. the time it actually took."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = defaultdict(lambda: {"calls": 0, "legacy": 0.0, "actual": 0.0})
+
+    def record(self, step: str, legacy: float, actual: float):
+        with self._lock:
+            row = self._rows[step]
+            row["calls"] += 1
+            row["legacy"] += legacy
+            row["actual"] += actual
+
+    def rows(self) -> dict:
+        with self._lock:
+            return {k: dict(v) for k, v in self._rows.items()}
+
+    def total_saved(self) -> float:
+        return sum(r["legacy"] - r["actual"] for r in self.rows().values())
+
+    def report_lines(self) -> list:
+        lines = []
+        for step, r in sorted(self.rows().items()):
+            lines.append(f"{step}: calls={r['calls']} fixed_sleep={r['legacy']:.2f}s "
+                         f"event_wait={r['actual']:.2f}s saved={r['legacy'] - r['actual']:.2f}s")
+        if lines:
+            lines.append(f"total saved vs fixed sleeps: {self.total_saved():.2f}s")
+        return lines
+
+
+LEDGER = WaitLedger()
+
+
+class WaitEngine:
+    """
+    Event-driven replacement for fixed time.sleep() calls in page objects.
+    Every wait is capped at the sleep it replaces, so it is never slower than before,
+    and returns as soon as the DOM condition holds.
+    """
+
+    def __init__(self, driver, ledger: WaitLedger = LEDGER):
+        self.driver = driver
+        self.ledger = ledger
+        self._script_timeout: Optional[float] = None
+
+    @classmethod
+    def for_driver(cls, driver) -> "WaitEngine":
+        """one engine per driver, shared by every page object wrapping it"""
+        engine = getattr(driver, "_qa_wait_engine", None)
+        if engine is None:
+            engine = cls(driver)
+            try:
+                driver._qa_wait_engine = engine
+            except Exception:
+                pass
+        return engine
+
+    def _ensure_script_timeout(self, seconds: float):
+        needed = seconds + 2.0
+        if self._script_timeout is None or self._script_timeout < needed:
+            self.driver.set_script_timeout(needed)
+            self._script_timeout = needed
+
+    def execute_async(self, script: str, *args, timeout: float = 5.0):
+        """execute_async_script with the session script timeout raised to fit `timeout` (set once)."""
+        self._ensure_script_timeout(timeout)
+        return self.driver.execute_async_script(script, *args)
+
+    def _run(self, predicate: Optional[str], quiet_ms: int, timeout: float) -> bool:
+        """
+        True once the predicate holds (or, without one, the DOM is quiet). A navigation mid-wait
+        counts as settled only without a predicate; with one, the new document is checked again
+        within the remaining time. Any other WebDriver error is logged and reported as not met.
+        """
+        deadline = time.perf_counter() + timeout
+        last_check = False
+        while True:
+            remaining = max(0.0, deadline - time.perf_counter())
+            try:
+                res = self.execute_async(WAIT_JS, predicate, quiet_ms, int(remaining * 1000), timeout=remaining)
+                return bool(res and res.get("ok"))
+            except WebDriverException as exc:
+                if last_check or not _is_navigation(exc):
+                    logger.warning("in-page wait failed (%s): %s", "predicate" if predicate else "settle",
+                                   getattr(exc, "msg", None) or exc)
+                    return False
+            # document unloaded mid-wait (navigation) — wait for the next document to be parsed
+            try:
+                WebDriverWait(self.driver, max(remaining, 0.5)).until(
+                    lambda d: d.execute_script("return document.readyState") != "loading")
+            except Exception:
+                return False
+            if predicate is None:
+                return True
+            last_check = time.perf_counter() >= deadline  # out of time: one immediate check of the new page
+
+    def settle(self, step: str, legacy: float, quiet_ms: int = 150) -> bool:
+        """Replacement for time.sleep(legacy): returns once the DOM is quiet for quiet_ms."""
+        started = time.perf_counter()
+        ok = self._run(None, quiet_ms, legacy)
+        self.ledger.record(step, legacy, time.perf_counter() - started)
+        return ok
+
+    def until(self, step: str, predicate_js: str, timeout: float, legacy: Optional[float] = None) -> bool:
+        """Wait in-page until `predicate_js` (a function body returning truthy) holds."""
+        started = time.perf_counter()
+        ok = self._run(predicate_js, 0, timeout)
+        if legacy is not None:
+            self.ledger.record(step, legacy, time.perf_counter() - started)
+        return ok
+
+    def scroll_height_changed(self, step: str, previous_height: int, legacy: float) -> bool:
+        """After a scroll: done when the page grew (lazy load) or the DOM settled, whichever is first."""
+        predicate = (
+            "var w = window.__qaWait; "
+            f"return document.documentElement.scrollHeight !== {int(previous_height)} "
+            "|| (w && performance.now() - w.last >= 150);"
+        )
+        return self.until(step, predicate, timeout=legacy, legacy=legacy)
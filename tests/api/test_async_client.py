@@ -0,0 +1,67 @@
+"""
+Async client fan-out verified offline against the local stand-in server.
+tests/api/test_async_client.py
+"""
+import asyncio
+import time
+
+import pytest
+import requests
+
+from utils.async_client import AsyncClientWrapper
+
+LATENCY = 0.2
+
+
+@pytest.fixture
+def slow_server(stub_server):
+    """stand-in server with fixed per-request latency"""
+    stub_server.latency = LATENCY
+    stub_server.route("GET", "/item", json={"ok": True})
+    stub_server.route("POST", "/item", json={"created": True}, status=201)
+    stub_server.route("PUT", "/item", json={"updated": True})
+    stub_server.route("DELETE", "/item", json={"deleted": True})
+    return stub_server
+
+
+@pytest.fixture
+def aclient():
+    """async client with a small in-flight cap"""
+    wrapper = AsyncClientWrapper(requests.Session(), timeout=5, max_in_flight=4)
+    yield wrapper
+    wrapper.close()
+
+
+def test_batch_runs_concurrently_within_limit(slow_server, aclient):
+    """12 calls at 4 in flight take ~3 latency rounds, never more than 4 at once"""
+    calls = [("get", slow_server.url("/item"), {"params": {"i": i}}) for i in range(12)]
+    started = time.perf_counter()
+    responses = aclient.run_batch(calls)
+    elapsed = time.perf_counter() - started
+
+    assert [r.status_code for r in responses] == [200] * 12
+    assert [r.request.url.endswith(f"i={i}") for i, r in enumerate(responses)] == [True] * 12
+    assert slow_server.max_in_flight <= 4
+    assert elapsed < 12 * LATENCY / 2
+    assert elapsed >= 3 * LATENCY * 0.9
+
+
+def test_batch_limit_narrows_in_flight(slow_server, aclient):
+    """per-batch limit caps concurrency below the client default"""
+    aclient.run_batch([("get", slow_server.url("/item"))] * 4, limit=2)
+    assert slow_server.max_in_flight <= 2
+
+
+def test_verbs_and_last_response(slow_server, aclient):
+    """get/post/put/delete are awaitable and update last_response"""
+    url = slow_server.url("/item")
+    statuses = aclient.run_batch([("get", url), ("post", url, {"json": {"a": 1}}), ("put", url), ("delete", url)])
+    assert [r.status_code for r in statuses] == [200, 201, 200, 200]
+    assert aclient.last_response is not None
+
+    async def single():
+        return await aclient.post(url, json={"a": 1})
+
+    r = asyncio.run(single())
+    assert aclient.last_response is r
+    assert r.json() == {"created": True}
@@ -0,0 +1,79 @@
+"""
+Record/replay cassette layer, verified offline against the local stand-in server.
+tests/api/test_cassette.py
+"""
+import pytest
+import requests
+
+from conftest import ClientWrapper
+from utils.cassette import Cassette, CassetteMiss, request_key
+from utils.client import SimpleClient
+from utils.stub_server import StubResponse
+
+
+@pytest.fixture
+def api(stub_server):
+    """stand-in endpoints shaped like the public APIs"""
+    stub_server.route("GET", "/api/breeds/list/all", json={"status": "success", "message": {"hound": []}})
+    stub_server.route("GET", "/agify", _agify)
+    stub_server.route("POST", "/api/users", json={"name": "automation", "job": "qa", "id": "1"}, status=201)
+    return stub_server
+
+
+def _agify(req):
+    return StubResponse.from_json({"name": req.query.get("name"), "age": 42})
+
+
+def test_request_key_normalizes_params_and_body():
+    """param order, host case and json key order do not change the key"""
+    a = request_key("get", "https://API.example.com/x?b=2", params={"a": "1"})
+    b = request_key("GET", "https://api.example.com/x?a=1&b=2")
+    assert a == b
+    assert request_key("post", "https://e.x/u", json={"a": 1, "b": 2}) == \
+        request_key("POST", "https://e.x/u", json={"b": 2, "a": 1})
+    assert request_key("post", "https://e.x/u", json={"a": 1}) != request_key("post", "https://e.x/u", json={"a": 2})
+
+
+def test_client_wrapper_record_then_replay_offline(api, tmp_path):
+    """responses recorded once are served from memory after the server is gone"""
+    path = tmp_path / "public_apis.jsonl"
+    recorder = ClientWrapper(requests.Session(), cassette=Cassette(path, "record"))
+    live = recorder.get(api.url("/agify"), params={"name": "olga"})
+    recorder.post(api.url("/api/users"), json={"name": "automation", "job": "qa"})
+    recorder.cassette.close()
+    served = api.requests_served
+    api.stop()
+
+    player = ClientWrapper(requests.Session(), cassette=Cassette(path, "replay"))
+    assert len(player.cassette) == 2
+    r = player.get(api.url("/agify"), params={"name": "olga"})
+    assert r.status_code == 200
+    assert r.json() == live.json()
+    assert player.last_response is r
+    created = player.post(api.url("/api/users"), json={"job": "qa", "name": "automation"})
+    assert created.status_code == 201 and created.json()["id"] == "1"
+    assert player.cassette.hits == 2
+    assert served == 2
+
+    with pytest.raises(CassetteMiss):
+        player.get(api.url("/agify"), params={"name": "juan"})
+
+
+def test_simple_client_record_then_replay(api, tmp_path):
+    """SimpleClient goes through the same cassette"""
+    path = tmp_path / "simple.jsonl"
+    rec = SimpleClient(api.base_url, cassette=Cassette(path, "record"))
+    assert rec.get("/api/breeds/list/all").json()["status"] == "success"
+    rec.close()
+    api.stop()
+
+    play = SimpleClient(api.base_url, cassette=Cassette(path, "replay"))
+    r = play.get("api/breeds/list/all")
+    assert r.json()["message"] == {"hound": []}
+    assert r.headers["Content-Type"] == "application/json"
+
+
+def test_invalid_mode_rejected(tmp_path):
+    """unknown modes fail loudly"""
+    with pytest.raises(ValueError):
+        Cassette(tmp_path / "x.jsonl", "rewind")
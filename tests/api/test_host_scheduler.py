@@ -0,0 +1,139 @@
+"""
+Per-host budgets for the API worker pool, verified offline against the local stand-in server.
+tests/api/test_host_scheduler.py
+"""
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+from conftest import ClientWrapper
+from utils.async_client import AsyncClientWrapper
+from utils.host_scheduler import CasePool, HostBudget, HostScheduler, parse_budget
+
+pytest_plugins = ["pytester"]
+ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def api(stub_server):
+    """stand-in endpoint with a little latency so requests overlap"""
+    stub_server.latency = 0.1
+    stub_server.route("GET", "/pokemon", json={"name": "pikachu"})
+    return stub_server
+
+
+def test_parse_budget():
+    """CLI spec parses into a HostBudget"""
+    assert parse_budget("PokeAPI.co:rps=5,concurrency=2") == ("pokeapi.co", HostBudget(max_concurrent=2, rps=5.0))
+    assert parse_budget("reqres.in:concurrency=3") == ("reqres.in", HostBudget(max_concurrent=3))
+    with pytest.raises(ValueError):
+        parse_budget("reqres.in")
+    with pytest.raises(ValueError):
+        parse_budget("reqres.in:burst=3")
+
+
+def test_concurrency_budget_caps_worker_pool(api):
+    """8 workers against a host limited to 2 concurrent never exceed 2 in flight"""
+    scheduler = HostScheduler({"127.0.0.1": HostBudget(max_concurrent=2)})
+    client = ClientWrapper(requests.Session(), scheduler=scheduler)
+    results = scheduler.run_parallel(lambda _: client.get(api.url("/pokemon")).status_code, range(8), workers=8)
+
+    assert results == [200] * 8
+    assert api.max_in_flight <= 2
+    stats = scheduler.stats()["127.0.0.1"]
+    assert stats["requests"] == 8
+    assert stats["max_queue_depth"] >= 6
+    assert stats["throttle_wait"] > 0
+    assert stats["queue_depth"] == 0 and stats["in_flight"] == 0
+
+
+def test_rps_budget_spaces_request_starts(api):
+    """6 requests at 20 rps need at least 5 intervals even with 6 in flight allowed"""
+    api.latency = 0
+    scheduler = HostScheduler({"127.0.0.1": HostBudget(rps=20)})
+    client = AsyncClientWrapper(requests.Session(), max_in_flight=6, scheduler=scheduler)
+    started = time.perf_counter()
+    client.run_batch([("get", api.url("/pokemon"))] * 6)
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    assert elapsed >= 5 / 20 * 0.9
+    assert "127.0.0.1: requests=6" in scheduler.report_lines()[0]
+
+
+def test_budget_covers_subdomains_and_unbudgeted_hosts_pass():
+    """agify.io budget applies to api.agify.io; other hosts get the default"""
+    scheduler = HostScheduler({"agify.io": HostBudget(max_concurrent=1)})
+    assert scheduler._budget_for("api.agify.io") == HostBudget(max_concurrent=1)
+    assert scheduler._budget_for("dog.ceo") == HostBudget()
+
+
+def test_slot_is_returned_when_interrupted_while_throttled(monkeypatch):
+    """an exception after the semaphore was taken (here: during the rps sleep) must not leak the slot"""
+    scheduler = HostScheduler({"pokeapi.co": HostBudget(max_concurrent=1, rps=1)})
+    url = "https://pokeapi.co/api/v2/pokemon/pikachu"
+    with scheduler.slot(url):
+        pass
+
+    def interrupted(_seconds):
+        raise KeyboardInterrupt
+    monkeypatch.setattr("utils.host_scheduler.time.sleep", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        with scheduler.slot(url):
+            pass
+    stats = scheduler.stats()["pokeapi.co"]
+    assert stats["requests"] == 1 and stats["queue_depth"] == 0 and stats["in_flight"] == 0
+    assert scheduler._state(url).sem.acquire(blocking=False)  # the one slot is free again
+
+
+def test_case_pool_runs_submitted_cases_concurrently():
+    """three submitted cases meet at a barrier (only possible in parallel); outcomes come back per case"""
+    barrier = threading.Barrier(3, timeout=5)
+
+    def case(n):
+        barrier.wait()
+        assert n != 1, "case 1 fails"
+        return threading.current_thread().name
+
+    pool = CasePool(workers=3)
+    for n in range(3):
+        pool.submit(case, n)
+    assert pool.result(case, 0).startswith("api-case")
+    with pytest.raises(AssertionError, match="case 1 fails"):
+        pool.result(case, 1)
+    assert pool.result(case, 2).startswith("api-case")
+    pool.close()
+    assert CasePool().result(lambda n: threading.current_thread().name, 0) == threading.current_thread().name
+
+
+def test_parametrized_cases_run_on_the_pool(pytester, monkeypatch):
+    """api_cases submits every selected case of the module up front; fail / skip stay per test"""
+    monkeypatch.setenv("PYTHONPATH", str(ROOT))
+    pytester.makeconftest((ROOT / "conftest.py").read_text(encoding="utf-8"))
+    (pytester.path / "pytest.ini").write_text((ROOT / "pytest.ini").read_text(encoding="utf-8"), encoding="utf-8")
+    pytester.makepyfile(
+        """
+        import threading
+        import pytest
+
+        barrier = threading.Barrier(3, timeout=10)
+
+        def case(client, n):
+            barrier.wait()
+            if n == 2:
+                pytest.skip("rate limited")
+            assert n != 1, "case 1 fails"
+
+        @pytest.mark.parametrize("n", [0, 1, 2])
+        def test_case(api_cases, n):
+            api_cases.run(case, n)
+
+        API_POOLED_CASES = {"test_case": (case, "n")}
+        """
+    )
+    result = pytester.runpytest_subprocess("-p", "no:cacheprovider", "--api-workers", "3")
+    result.assert_outcomes(passed=1, failed=1, skipped=1)
+    result.stdout.fnmatch_lines(["*case 1 fails*"])
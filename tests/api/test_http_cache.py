@@ -0,0 +1,137 @@
+"""
+HTTP response cache: max-age freshness, ETag / Last-Modified revalidation, LRU byte cap, disk tier.
+tests/api/test_http_cache.py
+"""
+import pytest
+import requests
+
+from conftest import ClientWrapper
+from utils.client import SimpleClient
+from utils.http_cache import HttpCache, _freshness, parse_cache_control
+from utils.stub_server import StubResponse
+
+BREEDS = {"status": "success", "message": {"hound": ["afghan"]}}
+LAST_MODIFIED = "Wed, 01 Oct 2025 10:00:00 GMT"
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def api(stub_server):
+    """stand-in endpoints emitting cache headers; conditional requests are answered with 304"""
+    def etag(req):
+        if req.headers.get("If-None-Match") == '"v1"':
+            return StubResponse(status=304, headers={"ETag": '"v1"', "Cache-Control": "max-age=60"})
+        return StubResponse.from_json(BREEDS, headers={"ETag": '"v1"', "Cache-Control": "max-age=60"})
+
+    def modified(req):
+        if req.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            return StubResponse(status=304)
+        return StubResponse.from_json({"name": "pikachu"}, headers={"Last-Modified": LAST_MODIFIED})
+
+    stub_server.route("GET", "/api/breeds/list/all", etag)
+    stub_server.route("GET", "/api/v2/pokemon/pikachu", modified)
+    stub_server.route("GET", "/nostore", json={"x": 1}, headers={"Cache-Control": "no-store", "ETag": '"n"'})
+    stub_server.route("GET", "/plain", json={"x": 1})
+    return stub_server
+
+
+def test_cache_control_parsing():
+    assert parse_cache_control('public, max-age=300, no-cache, foo="b"') == \
+        {"public": True, "max-age": "300", "no-cache": True, "foo": "b"}
+
+
+def test_malformed_age_counts_as_zero():
+    assert _freshness({"Cache-Control": "max-age=60", "Age": "1, 2"}) == 60.0
+    assert _freshness({"Cache-Control": "max-age=60", "Age": "-5"}) == 60.0
+    assert _freshness({"Cache-Control": "max-age=60", "Age": "15"}) == 45.0
+
+
+def test_fresh_entry_served_without_request_then_revalidated(api):
+    clock = Clock()
+    cache = HttpCache(clock=clock)
+    client = ClientWrapper(requests.Session(), http_cache=cache)
+    url = api.url("/api/breeds/list/all")
+
+    assert client.get(url).qa_cache == "miss"
+    hit = client.get(url)
+    assert hit.qa_cache == "hit" and hit.json() == BREEDS and api.requests_served == 1
+    assert client.validate(hit, schema="dog_breeds")
+
+    clock.now += 61
+    revalidated = client.get(url)
+    assert revalidated.qa_cache == "revalidated" and revalidated.status_code == 200
+    assert revalidated.json() == BREEDS
+    assert api.log[-1].headers.get("If-None-Match") == '"v1"'
+    assert client.get(url).qa_cache == "hit"  # the 304 renewed max-age
+    s = cache.stats
+    assert (s.hits, s.misses, s.revalidated, s.stored) == (2, 1, 1, 1)
+    assert s.bytes_saved == 3 * len(hit.content)
+
+
+def test_last_modified_revalidates_every_time(api):
+    """no max-age: always a conditional GET, but the body comes from the cache"""
+    client = SimpleClient(api.base_url, http_cache=HttpCache())
+    assert client.get("/api/v2/pokemon/pikachu").json() == {"name": "pikachu"}
+    again = client.get("/api/v2/pokemon/pikachu")
+    assert again.qa_cache == "revalidated" and again.json() == {"name": "pikachu"}
+    assert api.log[-1].headers.get("If-Modified-Since") == LAST_MODIFIED
+    assert client.http_cache.stats.revalidated == 1
+
+
+def test_uncacheable_responses_and_non_get_pass_through(api):
+    cache = HttpCache()
+    client = ClientWrapper(requests.Session(), http_cache=cache)
+    for path in ("/nostore", "/plain"):
+        client.get(api.url(path))
+        assert client.get(api.url(path)).qa_cache == "miss"
+    client.post(api.url("/api/breeds/list/all"))
+    assert len(cache) == 0 and cache.stats.misses == 4
+
+
+def test_uncacheable_refresh_evicts_the_stale_entry(api, tmp_path):
+    """a stale entry whose refresh comes back uncacheable is dropped, not served again later"""
+    clock = Clock()
+    cache = HttpCache(disk_dir=tmp_path, clock=clock)
+    client = ClientWrapper(requests.Session(), http_cache=cache)
+    url = api.url("/api/breeds/list/all")
+    client.get(url)
+    api.route("GET", "/api/breeds/list/all", json={"status": "changed"}, headers={"Cache-Control": "no-store"})
+    clock.now += 61
+    refreshed = client.get(url)
+    assert refreshed.json() == {"status": "changed"} and cache.stats.refreshed == 1
+    assert len(cache) == 0 and not list(tmp_path.rglob("*.body"))
+    assert client.get(url).json() == {"status": "changed"} and cache.stats.misses == 2
+
+
+def test_lru_evicts_by_body_bytes(api):
+    cache = HttpCache(max_bytes=120)
+    client = ClientWrapper(requests.Session(), http_cache=cache)
+    client.get(api.url("/api/breeds/list/all"))        # 55 bytes
+    client.get(api.url("/api/v2/pokemon/pikachu"))     # 19 bytes
+    assert len(cache) == 2 and cache.bytes_used == 74
+    client.get(api.url("/api/breeds/list/all"))        # touch: pokemon is now least recently used
+    big = StubResponse.from_json({"pad": "x" * 40}, headers={"ETag": '"p"'})
+    api.route("GET", "/pad", big)
+    client.get(api.url("/pad"))                         # 52 bytes: over the cap by 6
+    assert cache.stats.evictions == 1
+    assert client.get(api.url("/api/breeds/list/all")).qa_cache == "hit"
+    assert client.get(api.url("/api/v2/pokemon/pikachu")).qa_cache == "miss"
+
+
+def test_disk_tier_shared_by_a_later_session(api, tmp_path):
+    clock = Clock()
+    first = ClientWrapper(requests.Session(), http_cache=HttpCache(disk_dir=tmp_path, clock=clock))
+    first.get(api.url("/api/breeds/list/all"))
+
+    later = HttpCache(disk_dir=tmp_path, clock=clock)
+    r = ClientWrapper(requests.Session(), http_cache=later).get(api.url("/api/breeds/list/all"))
+    assert r.qa_cache == "hit" and r.json() == BREEDS
+    assert later.stats.disk_hits == 1 and api.requests_served == 1
+    assert "disk_hits=1" in later.report_lines()[1]
@@ -0,0 +1,104 @@
+"""
+Streaming JSON path extraction for large API payloads, and size-capped failure bodies.
+tests/api/test_json_stream.py
+"""
+import json
+
+import pytest
+import requests
+
+from conftest import ClientWrapper
+from utils.cassette import Cassette
+from utils.json_stream import CHUNK_SIZE, JsonPathExtractor, bench, body_excerpt, recorded_payloads
+from utils.schemas import synthetic_pokemon
+from utils.stub_server import StubResponse
+
+TRICKY = {
+    "abilities": [{"name": "static", "note": "brackets ] } inside \"strings\" \\"}],
+    "moves": [{"move": {"name": "tackle"}}] * 50,
+    "name": "pikaçhu",
+    "sprites": {"other": {"x": [1, {"y": "}"}]}, "front_default": "https://img/25.png"},
+    "types": [{"slot": 1, "type": {"name": "electric", "url": "https://pokeapi.co/api/v2/type/13/"}}],
+    "weight": 60,
+}
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 7, 64, 1 << 20])
+def test_paths_found_across_any_chunking(chunk):
+    text = json.dumps(TRICKY, indent=1, ensure_ascii=False)
+    extractor = JsonPathExtractor(["name", "types", "sprites.front_default", "weight"])
+    for i in range(0, len(text), chunk):
+        if extractor.feed(text[i:i + chunk]):
+            break
+    assert extractor.found == {"name": "pikaçhu", "types": TRICKY["types"],
+                               "sprites.front_default": "https://img/25.png", "weight": 60}
+
+
+def test_missing_path_reads_to_end_and_reports_incomplete():
+    extractor = JsonPathExtractor(["name", "held_items"])
+    assert extractor.feed(json.dumps(TRICKY)) is True  # document closed: nothing more to wait for
+    assert extractor.found == {"name": "pikaçhu"}
+
+
+def test_skipped_values_are_not_buffered():
+    doc = json.dumps(synthetic_pokemon(moves=300), sort_keys=True)
+    extractor = JsonPathExtractor(["name", "types"])
+    for i in range(0, len(doc), 4096):
+        extractor.feed(doc[i:i + 4096])
+    assert extractor.found["name"] == "pikachu"
+    assert extractor.peak_buffer < 3 * 4096 < len(doc)
+
+
+@pytest.fixture
+def pokemon_api(stub_server):
+    """name/types first, then a large tail the test never needs"""
+    doc = {"name": "pikachu", "types": [{"slot": 1, "type": {"name": "electric", "url": "https://x/13/"}}]}
+    doc.update({k: v for k, v in synthetic_pokemon(moves=2000).items() if k not in doc})
+    body = json.dumps(doc).encode("utf-8")
+    stub_server.route("GET", "/api/v2/pokemon/pikachu",
+                      StubResponse(body=body, headers={"Content-Type": "application/json"}))
+    return stub_server, len(body)
+
+
+def test_client_streams_and_stops_reading_early(pokemon_api):
+    server, size = pokemon_api
+    client = ClientWrapper(requests.Session())
+    r = client.get(server.url("/api/v2/pokemon/pikachu"), stream=True)
+    found = client.extract("name", "types")
+    assert found["name"] == "pikachu" and found["types"][0]["type"]["name"] == "electric"
+    stats = client.last_extract
+    assert stats.complete and stats.body_bytes == size
+    assert stats.bytes_read < size / 4
+
+    excerpt = body_excerpt(r, limit=100)
+    assert excerpt.startswith('{"name": "pikachu"')
+    assert excerpt.endswith(f"[truncated: first 100 of {stats.bytes_read} bytes; streamed body, {stats.bytes_read} bytes read]")
+
+
+def test_body_excerpt_caps_loaded_bodies(stub_server):
+    stub_server.route("GET", "/big", StubResponse(body=b"x" * 5000))
+    stub_server.route("GET", "/small", StubResponse(body=b"ok"))
+    assert body_excerpt(requests.get(stub_server.url("/small"))) == "ok"
+    big = body_excerpt(requests.get(stub_server.url("/big")), limit=1000)
+    assert big == "x" * 1000 + "\n... [truncated: first 1000 of 5000 bytes]"
+
+
+def test_benchmark_on_recorded_payloads(pokemon_api, tmp_path):
+    """record a large pokemon body once, then compare r.json() vs streaming on the recording"""
+    server, size = pokemon_api
+    path = tmp_path / "public_apis.jsonl"
+    recorder = ClientWrapper(requests.Session(), cassette=Cassette(path, "record"))
+    recorder.get(server.url("/api/v2/pokemon/pikachu"))
+    recorder.cassette.close()
+
+    replayed = ClientWrapper(requests.Session(), cassette=Cassette(path, "replay"))
+    replayed.get(server.url("/api/v2/pokemon/pikachu"), stream=True)
+    assert replayed.extract("name")["name"] == "pikachu"
+
+    (result,) = bench(recorded_payloads(path), iterations=3)
+    assert result.payload_bytes == size
+    # deterministic measures only: the work saved shows in bytes parsed and memory, not wall-clock time
+    assert 0 < result.stream_bytes_read < size / 4
+    assert result.stream_bytes_read % CHUNK_SIZE == 0  # stopped on the chunk that completed the paths
+    assert result.stream_peak_bytes * 4 < result.full_peak_bytes
+    assert result.stream_seconds > 0 and result.full_seconds > 0  # reported, not compared
@@ -0,0 +1,117 @@
+"""
+Load mode: the public API test cases driven at a target rate / concurrency against local stand-ins.
+tests/api/test_load.py
+"""
+import json
+import random
+
+import pytest
+
+from utils.load import (CHECK_FAILED, DEFAULT_CASES, LatencyHistogram, LoadConfig, LoadResult, compare,
+                        load_cases, main, retarget, run)
+from utils.stub_server import StubResponse
+
+
+@pytest.fixture
+def stand_ins(stub_server):
+    """one local server standing in for Dog CEO, Agify and PokeAPI; returns the --target mapping"""
+    stub_server.route("GET", "/api/breeds/list/all", json={"status": "success", "message": {"hound": ["afghan"]}})
+    for count in (1, 3):
+        stub_server.route("GET", f"/api/breeds/image/random/{count}",
+                          json={"status": "success", "message": [f"https://images.dog.ceo/{i}.jpg" for i in range(count)]})
+    stub_server.route("GET", "/", lambda req: StubResponse.from_json(
+        {"name": req.query.get("name"), "age": 40, "count": 10}))
+    for name in ("pikachu", "charizard", "bulbasaur"):
+        stub_server.route("GET", f"/api/v2/pokemon/{name}", json={
+            "id": 1, "name": name, "types": [{"slot": 1, "type": {"name": "electric", "url": "https://x/13/"}}]})
+    base = stub_server.base_url
+    return {"dog.ceo": base, "agify.io": base, "pokeapi.co": base}
+
+
+def test_histogram_percentiles_within_precision():
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(-4, 0.8) for _ in range(20_000))
+    h = LatencyHistogram()
+    for v in values:
+        h.record(v)
+    for p in (50, 90, 99, 99.9):
+        exact = values[int(p / 100 * len(values)) - 1]
+        assert h.percentile(p) == pytest.approx(exact, rel=0.01, abs=2e-6)
+    assert len(h.counts) < 1000  # bucketed, not one entry per value
+
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for i, v in enumerate(values):
+        (a if i % 2 else b).record(v)
+    merged = LatencyHistogram.from_dict(json.loads(json.dumps(a.to_dict()))).merge(b)
+    assert merged.count == h.count and merged.percentile(99) == h.percentile(99)
+
+
+def test_cases_come_from_the_api_tests_and_are_retargeted():
+    cases = load_cases(DEFAULT_CASES, {"agify.io": "http://127.0.0.1:9000/"}, select="agify")
+    assert [c.name for c in cases] == ["agify[michael]", "agify[olga]", "agify[juan]"]
+    assert cases[0].url == "http://127.0.0.1:9000" and cases[0].kwargs == {"params": {"name": "michael"}}
+    assert retarget("https://dog.ceo/api/breeds/list/all", {"dog.ceo": "https://gw.local/dog"}) == \
+        "https://gw.local/dog/api/breeds/list/all"
+    assert retarget("https://reqres.in/api/users", {"dog.ceo": "http://x"}) == "https://reqres.in/api/users"
+    with pytest.raises(ValueError, match="no load cases"):
+        load_cases(DEFAULT_CASES, select="nothing-matches")
+
+
+def test_closed_loop_runs_every_case_clean(stand_ins):
+    result = run(LoadConfig(targets=stand_ins, concurrency=4, duration=0.5))
+    assert result.mode == "closed" and result.requests > 20
+    assert result.errors == 0 and set(result.statuses) == {"200"}
+    assert len(result.cases) == 9
+    assert 1 <= result.connections <= 4  # keep-alive: the workers reuse their pooled connections
+    assert 0 < result.latency.percentile(50) <= result.latency.percentile(99) <= result.latency.max_us / 1e6
+
+
+def test_open_model_holds_rate_and_breaks_down_errors(stub_server, stand_ins):
+    stub_server.route("GET", "/api/breeds/list/all", StubResponse.from_json({"error": "down"}, status=503))
+    stub_server.route("GET", "/", json={"name": "someone-else", "age": 1})
+    result = run(LoadConfig(targets=stand_ins, rps=90, concurrency=8, duration=1.0))
+    assert result.mode == "open"
+    assert 80 <= result.requests <= 92
+    assert result.throughput == pytest.approx(90, rel=0.2)
+    assert result.statuses["503"] == result.cases["dog_breeds"].requests > 0
+    assert result.statuses[CHECK_FAILED] == sum(result.cases[f"agify[{n}]"].requests for n in ("michael", "olga", "juan"))
+    assert result.errors == result.statuses["503"] + result.statuses[CHECK_FAILED]
+    lines = result.report_lines()
+    assert lines[0].startswith("open load:") and "target 90 rps" in lines[0]
+    assert any(line.startswith("statuses ") and "503=" in line for line in lines)
+
+
+def test_processes_merge(stand_ins):
+    result = run(LoadConfig(targets=stand_ins, concurrency=4, duration=0.5, processes=2, select="pokemon"))
+    assert result.processes == 2 and result.concurrency == 4
+    assert result.requests == sum(c.requests for c in result.cases.values()) == result.latency.count
+    assert set(result.cases) == {"pokemon[pikachu]", "pokemon[charizard]", "pokemon[bulbasaur]"}
+    assert result.errors == 0
+
+
+def _result(latency, requests=100, errors=0, duration=1.0):
+    r = LoadResult(mode="closed", duration=duration)
+    for i in range(requests):
+        r.record("case", "200" if i >= errors else "500", i >= errors, latency, latency)
+    return r
+
+
+def test_baseline_comparison_flags_regressions():
+    base = _result(0.010)
+    rows = {row.metric: row for row in compare(_result(0.0105), base)}
+    assert not any(row.regressed for row in rows.values())
+    rows = {row.metric: row for row in compare(_result(0.020, requests=80, errors=5), base)}
+    assert rows["p99_ms"].regressed and rows["p50_ms"].change == pytest.approx(1.0, rel=0.02)
+    assert rows["throughput_rps"].regressed and rows["error_rate"].regressed
+
+
+def test_cli_saves_result_and_fails_on_regression(stand_ins, tmp_path, capsys):
+    targets = [f"--target={host}={url}" for host, url in stand_ins.items()]
+    out, baseline = tmp_path / "last.json", tmp_path / "baseline.json"
+    fast = _result(0.0001, requests=100_000)
+    baseline.write_text(json.dumps(fast.to_dict()), encoding="utf-8")
+    code = main(targets + ["--select", "dog", "--duration", "0.3", "--concurrency", "2",
+                           "--out", str(out), "--baseline", str(baseline)])
+    printed = capsys.readouterr().out
+    assert code == 1 and "REGRESSION" in printed and "throughput_rps" in printed
+    assert LoadResult.from_dict(json.loads(out.read_text())).requests > 0
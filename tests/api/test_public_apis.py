@@ -9,6 +9,9 @@ import time
 import pytest
 from requests.exceptions import RequestException
 
+from utils.api_cases import (AGIFY_NAMES, API_CASES, DOG_IMAGE_COUNTS, POKEMON_NAMES, check_agify,
+                             check_dog_breeds, check_dog_random_images, check_pokemon)
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,45 +21,35 @@ def test_dog_api_list_all_breeds(client):
     url = "https://dog.ceo/api/breeds/list/all"
     r = client.get(url)
     assert r.status_code == 200, f"Expected 200, got {r.status_code}"
-    j = r.json()
-    assert j.get("status") == "success"
-    assert isinstance(j.get("message"), dict)
-    # At least one well-known breed present
-    assert "hound" in j["message"] or "retriever" in j["message"] or len(j["message"]) > 0
+    check_dog_breeds(r.json())
 
 
-@pytest.mark.api
-@pytest.mark.parametrize("count", [1, 3])
-def test_dog_api_random_image_message_is_url(client, count):
-    """Dog CEO: get random image message from url"""
+def dog_random_images_case(client, count):
     url = f"https://dog.ceo/api/breeds/image/random/{count}"
     r = client.get(url)
     assert r.status_code == 200
-    j = r.json()
-    assert j.get("status") == "success"
-    message = j.get("message")
-    if isinstance(message, list):
-        assert len(message) == count
-        for u in message:
-            assert isinstance(u, str) and (u.startswith("http://") or u.startswith("https://"))
-    else:
-        assert isinstance(message, str)
-        assert message.startswith("http://") or message.startswith("https://")
+    check_dog_random_images(r.json(), count)
 
 
 @pytest.mark.api
-@pytest.mark.parametrize("name", ["michael", "olga", "juan"])
-def test_agify_returns_name_and_age(client, name):
-    """Agify: prediction of age by name"""
+@pytest.mark.parametrize("count", DOG_IMAGE_COUNTS)
+def test_dog_api_random_image_message_is_url(api_cases, count):
+    """Dog CEO: get random image message from url"""
+    api_cases.run(dog_random_images_case, count)
+
+
+def agify_case(client, name):
     url = "https://api.agify.io"
     r = client.get(url, params={"name": name})
     assert r.status_code == 200
-    j = r.json()
-    assert j.get("name") == name
-    assert "age" in j
-    if j["age"] is not None:
-        assert isinstance(j["age"], (int, float))
-        assert j["age"] >= 0
+    check_agify(r.json(), name)
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("name", AGIFY_NAMES)
+def test_agify_returns_name_and_age(api_cases, name):
+    """Agify: prediction of age by name"""
+    api_cases.run(agify_case, name)
 
 
 @pytest.mark.api
@@ -86,11 +79,9 @@ def test_reqres_create_user_post(client):
             last_response = r
             # success codes historically 201 (created) — accept 200 too to be tolerant
             if r.status_code in (200, 201):
-                j = r.json()
+                j = client.validate(r)
                 assert j.get("name") == payload["name"]
                 assert j.get("job") == payload["job"]
-                assert "id" in j and isinstance(j["id"], str)
-                assert "createdAt" in j
                 return
             # If service responds with 403 (possible protection), retry a little then decide
             if r.status_code == 403:
@@ -128,18 +119,39 @@ def test_reqres_create_user_post(client):
         pytest.fail("Request to ReqRes failed repeatedly (no response).")
 
 
-@pytest.mark.api
-@pytest.mark.parametrize("pokemon", ["pikachu", "charizard", "bulbasaur"])
-def test_pokemon_api_get_pokemon_has_name_and_types(client, pokemon):
-    """Pokemon API: get pokemon by name and validate types"""
+def pokemon_case(client, pokemon):
     url = f"https://pokeapi.co/api/v2/pokemon/{pokemon}"
-    r = client.get(url)
+    r = client.get(url, stream=True)
     if r.status_code == 429:
         pytest.skip("Rate limited by PokeAPI (429)")
     assert r.status_code == 200
-    j = r.json()
-    assert j.get("name") == pokemon
-    types = j.get("types")
-    assert isinstance(types, list) and len(types) >= 1
-    for t in types:
-        assert "type" in t and "name" in t["type"]
+    check_pokemon(client.extract("name", "types", response=r), pokemon)
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("pokemon", POKEMON_NAMES)
+def test_pokemon_api_get_pokemon_has_name_and_types(api_cases, pokemon):
+    """
+    Pokemon API: get pokemon by name and validate types
+    (streamed: only name + types are parsed)
+    """
+    api_cases.run(pokemon_case, pokemon)
+
+
+# parametrized tests whose requests run up front on the api_cases thread pool: test -> (case, parameter)
+API_POOLED_CASES = {
+    "test_dog_api_random_image_message_is_url": (dog_random_images_case, "count"),
+    "test_agify_returns_name_and_age": (agify_case, "name"),
+    "test_pokemon_api_get_pokemon_has_name_and_types": (pokemon_case, "pokemon"),
+}
+
+
+@pytest.mark.api
+def test_public_apis_gathered_batch(async_client):
+    """Dog CEO, Agify and PokeAPI cases fired as one concurrent batch"""
+    responses = async_client.run_batch([case.call for case in API_CASES])
+    if any(r.status_code == 429 for r in responses):
+        pytest.skip("Rate limited (429) during gathered batch")
+    for case, r in zip(API_CASES, responses):
+        assert r.status_code == 200, f"{case.url}: expected 200, got {r.status_code}"
+        case.check(r.json())
@@ -0,0 +1,95 @@
+"""
+Per-endpoint response schemas: compiled-once validators, subtree fast path, micro-benchmark.
+tests/api/test_schemas.py
+"""
+import pytest
+import requests
+
+from conftest import ClientWrapper
+from utils import schemas
+from utils.schemas import SchemaRegistry, SchemaValidationError, bench, synthetic_pokemon
+
+
+@pytest.fixture
+def registry():
+    return SchemaRegistry()
+
+
+def test_endpoint_resolved_from_method_and_url(registry):
+    assert registry.endpoint_for("GET", "https://api.agify.io?name=olga").name == "agify"
+    assert registry.endpoint_for("get", "https://dog.ceo/api/breeds/image/random/3").name == "dog_random_images"
+    assert registry.endpoint_for("GET", "https://pokeapi.co/api/v2/pokemon/pikachu").name == "pokemon"
+    assert registry.endpoint_for("POST", "https://reqres.in/api/users").name == "reqres_user_created"
+    assert registry.endpoint_for("GET", "https://reqres.in/api/users") is None
+
+
+def test_validators_compiled_once(registry):
+    for name in ("olga", "juan", "michael"):
+        registry.validate({"name": name, "age": 40, "count": 10}, "agify")
+    registry.validate({"name": "x", "age": None}, "agify")
+    assert registry.stats.compiled == 1 and registry.stats.validations == 4
+
+
+def test_failure_names_endpoint_and_json_path(registry):
+    with pytest.raises(SchemaValidationError, match=r"agify: \$\.age: -1 is less than the minimum of 0"):
+        registry.validate({"name": "olga", "age": -1}, "agify")
+    with pytest.raises(SchemaValidationError, match=r"dog_breeds: \$\.status: 'success' was expected"):
+        registry.validate({"status": "error", "message": {"hound": []}}, "dog_breeds")
+    doc = synthetic_pokemon(moves=3)
+    del doc["types"][0]["type"]["name"]
+    with pytest.raises(SchemaValidationError, match=r"pokemon: \$\.types\[0\]\.type: 'name' is a required"):
+        registry.validate(doc, "pokemon", fast=True)
+    assert registry.stats.failures == 3
+
+
+def test_fast_path_walks_only_the_needed_subtree(registry):
+    """a malformed move is caught by the full schema, ignored by the name/types subtree"""
+    doc = synthetic_pokemon(moves=50)
+    doc["moves"][10]["move"] = "tackle"
+    with pytest.raises(SchemaValidationError, match=r"\$\.moves\[10\]\.move"):
+        registry.validate(doc, "pokemon")
+    assert registry.validate(doc, "pokemon", fast=True) is doc
+    with pytest.raises(SchemaValidationError, match="'types' is a required property"):
+        registry.validate({"name": "pikachu"}, "pokemon", fast=True)
+
+
+def test_client_wrapper_validates_last_response(stub_server):
+    stub_server.route("GET", "/api/breeds/list/all", json={"status": "success", "message": {"hound": ["afghan"]}})
+    stub_server.route("GET", "/api/breeds/image/random/2", json={"status": "success", "message": ["ftp://x"]})
+    client = ClientWrapper(requests.Session())
+    client.get(stub_server.url("/api/breeds/list/all"))
+    assert client.validate(schema="dog_breeds")["message"] == {"hound": ["afghan"]}
+    r = client.get(stub_server.url("/api/breeds/image/random/2"))
+    with pytest.raises(SchemaValidationError, match=r"\$\.message"):
+        client.validate(r, schema="dog_random_images")
+    with pytest.raises(LookupError, match="no schema registered"):
+        client.validate(r)
+
+
+def test_micro_benchmark_compiled_vs_per_call(monkeypatch):
+    """compiled validators skip check_schema + validator construction; the subtree skips the moves"""
+    checked = []
+    real_validator_for = schemas.validator_for
+
+    def counting_validator_for(schema):
+        cls = real_validator_for(schema)
+        return type(cls.__name__, (cls,), {"check_schema": classmethod(
+            lambda c, s, *a, **kw: checked.append(s) or cls.check_schema(s, *a, **kw))})
+
+    monkeypatch.setattr(schemas, "validator_for", counting_validator_for)
+    registry = SchemaRegistry()
+    doc = synthetic_pokemon(moves=200)
+    first = registry.validator("pokemon")
+    for _ in range(5):
+        registry.validate(doc, "pokemon")
+        registry.validate(doc, "pokemon", fast=True)
+    assert registry.validator("pokemon") is first  # cache hit: same compiled validator every call
+    assert len(checked) == registry.stats.compiled == 2  # full schema + name/types subtree, checked once each
+    assert set(registry.validator("pokemon", ("name", "types")).schema["properties"]) == {"name", "types"}
+
+    # timings are for the bench() / python -m utils.schemas output, not for assertions
+    results = bench(iterations=2, cases={"agify": {"name": "olga", "age": 55, "count": 1},
+                                         "pokemon": doc})
+    assert set(results["agify"]) == {"payload_bytes", "per_call", "compiled"}
+    assert set(results["pokemon"]) == {"payload_bytes", "per_call", "compiled", "fast_subtree"}
+    assert results["pokemon"]["payload_bytes"] > 100_000
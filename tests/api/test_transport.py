@@ -0,0 +1,169 @@
+"""
+Shared API transport: per-host pools, keep-alive reuse, DNS / TLS session reuse, against a local TLS stand-in.
+tests/api/test_transport.py
+"""
+import shutil
+import socket
+import ssl
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from conftest import ClientWrapper
+from utils.async_client import AsyncClientWrapper
+from utils.client import SimpleClient
+from utils.stub_server import StubServer
+from utils.transport import DnsCache, Transport, httpx, parse_pool_size
+
+
+@pytest.fixture(scope="module")
+def tls_cert(tmp_path_factory):
+    """self-signed cert for localhost / 127.0.0.1 (openssl CLI)"""
+    openssl = shutil.which("openssl")
+    if openssl is None:
+        pytest.skip("openssl CLI not available to create a test certificate")
+    d = tmp_path_factory.mktemp("tls")
+    subprocess.run([openssl, "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-keyout", str(d / "key.pem"), "-out", str(d / "cert.pem"), "-subj", "/CN=localhost",
+                    "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1"], check=True, capture_output=True)
+    return d / "cert.pem", d / "key.pem"
+
+
+@pytest.fixture(scope="module")
+def tls_server(tls_cert):
+    """https:// stand-in API, reached as https://localhost:PORT so name resolution is exercised"""
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ctx.load_cert_chain(*map(str, tls_cert))
+    server = StubServer(latency=0.01, ssl_context=ctx).route("GET", "/api/item", json={"ok": True}).start()
+    server.api_url = f"https://localhost:{server.port}/api/item"
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def transport(tls_cert):
+    t = Transport(pool_size=4)
+    t.verify = str(tls_cert[0])
+    yield t
+    t.close()
+
+
+def _load(transport, url, requests_total=48, workers=4):
+    session = transport.session()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda _: session.get(url, verify=transport.verify, timeout=5).status_code,
+                             range(requests_total)))
+
+
+def test_keep_alive_reuse_under_concurrent_load(tls_server, transport):
+    assert set(_load(transport, tls_server.api_url)) == {200}
+    s = transport.stats("localhost")
+    assert s.requests == 48
+    assert 1 <= s.opened <= 4 and s.discarded == 0
+    assert s.reused == 48 - s.opened and s.failed == 0
+    assert s.tls_handshakes == s.opened
+    assert s.dns_lookups == 1 and s.dns_cached == s.opened - 1
+
+
+def test_pool_smaller_than_concurrency_discards_connections(tls_server, tls_cert):
+    """the thrash this layer is meant to expose: more workers than pooled connections per host"""
+    small = Transport(pool_size=8, host_pool_sizes={"localhost": 1})
+    try:
+        session = small.session()
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda _: session.get(tls_server.api_url, verify=str(tls_cert[0])), range(36)))
+        s = small.stats("localhost")
+        assert s.discarded > 0 and s.opened > 1
+    finally:
+        small.close()
+
+
+def test_tls_session_resumed_on_new_connection(tls_server, transport):
+    _load(transport, tls_server.api_url, requests_total=2, workers=1)
+    transport.close()  # drop the pooled connections; DNS + TLS sessions are kept
+    _load(transport, tls_server.api_url, requests_total=2, workers=1)
+    s = transport.stats("localhost")
+    assert s.opened == 2 and s.tls_handshakes == 2
+    assert s.tls_resumed == 1
+    assert s.dns_lookups == 1 and s.dns_cached == 1
+
+
+def test_clients_share_one_pool(tls_server, transport):
+    """conftest ClientWrapper, AsyncClientWrapper and SimpleClient all ride the same keep-alive connection"""
+    url = tls_server.api_url
+    wrapper = ClientWrapper(transport.session())
+    simple = SimpleClient(f"https://localhost:{tls_server.port}", transport=transport)
+    async_wrapper = AsyncClientWrapper(transport.session(), max_in_flight=1)
+
+    assert wrapper.get(url, verify=transport.verify).json() == {"ok": True}
+    assert simple.get("/api/item", verify=transport.verify).status_code == 200
+    simple.close()  # closing one client's session must not close the shared pool
+    assert async_wrapper.run_batch([("get", url, {"verify": transport.verify})])[0].status_code == 200
+    async_wrapper.close()
+    assert wrapper.get(url, verify=transport.verify).status_code == 200
+
+    s = transport.stats("localhost")
+    assert s.requests == 4 and s.opened == 1
+
+
+def test_failed_send_is_not_counted_as_reuse(transport):
+    """a refused connection is a failed attempt, never a request served on a pooled connection"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]  # closed again before the request: nothing listens there
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.session().get(f"http://127.0.0.1:{port}/", timeout=5)
+    s = transport.stats("127.0.0.1")
+    assert s.failed == 1 and s.requests == 0 and s.reused == 0 and s.opened == 0
+    assert transport.report_lines()[0].startswith("127.0.0.1: requests=0 failed=1 connections=0 reuse=0%")
+
+
+def test_per_host_pool_sizes_cover_subdomains():
+    t = Transport(pool_size=10, host_pool_sizes=dict([parse_pool_size("agify.io:2"), parse_pool_size("PokeAPI.co:4")]))
+    assert t.pool_size("api.agify.io") == 2
+    assert t.pool_size("pokeapi.co") == 4
+    assert t.pool_size("reqres.in") == 10
+    with pytest.raises(ValueError, match="HOST:N"):
+        parse_pool_size("pokeapi.co")
+
+
+def test_dns_cache_expires():
+    now = [0.0]
+    dns = DnsCache(ttl=30, clock=lambda: now[0])
+    first, cached = dns.resolve("localhost", 80)
+    assert first and not cached
+    assert dns.resolve("localhost", 80) == (first, True)
+    now[0] = 31.0
+    assert dns.resolve("localhost", 80)[1] is False
+
+
+def test_report_lines(tls_server, transport):
+    assert transport.report_lines() == []
+    _load(transport, tls_server.api_url, requests_total=6, workers=2)
+    lines = transport.report_lines()
+    assert lines[0].startswith("localhost: requests=6 connections=")
+    assert "pool=4" in lines[0] and "tls=" in lines[0]
+    assert lines[-1].startswith("transport total: requests=6") and "backend=http/1.1" in lines[-1]
+
+
+@pytest.mark.skipif(httpx is not None, reason="httpx[http2] installed")
+def test_http2_backend_needs_httpx():
+    with pytest.raises(ValueError, match="httpx"):
+        Transport(http2=True)
+
+
+@pytest.mark.skipif(httpx is None, reason="httpx[http2] not installed")
+def test_http2_backend_serves_and_counts(tls_server, tls_cert):
+    """the stand-in only speaks HTTP/1.1, so ALPN settles on it; streams still share the pooled connections"""
+    t = Transport(pool_size=4, http2=True)
+    t.verify = str(tls_cert[0])
+    try:
+        assert set(_load(t, tls_server.api_url, requests_total=12, workers=3)) == {200}
+        s = t.stats("localhost")
+        assert s.requests == 12 and 1 <= s.opened <= 3
+        assert s.reused == 12 - s.opened
+        assert "backend=http2" in t.report_lines()[-1]
+    finally:
+        t.close()
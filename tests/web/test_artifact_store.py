@@ -0,0 +1,74 @@
+"""
+Content-addressed artifact store: dedup, compression, index queries and eviction.
+tests/web/test_artifact_store.py
+"""
+import gzip
+
+from utils.artifact_store import ArtifactStore
+from utils.artifacts import ArtifactWriter
+
+
+def test_identical_blobs_are_stored_once(tmp_path):
+    """same bytes from two steps -> one blob, two index entries"""
+    store = ArtifactStore(tmp_path, compression=None)
+    a = store.put(b"\x89PNG same", "png", step="search", test="t1")
+    b = store.put(b"\x89PNG same", "png", step="click", test="t2")
+
+    assert a.blob == b.blob
+    assert store.dedup_hits == 1
+    assert len(list((tmp_path / "blobs").glob("*/*"))) == 1
+    assert [e.step for e in store.entries()] == ["search", "click"]
+    assert [e.step for e in store.entries(test="t2")] == ["click"]
+
+
+def test_text_kinds_are_compressed_and_read_back(tmp_path):
+    """html is gzipped on disk, png is stored as-is; read() returns the original bytes"""
+    store = ArtifactStore(tmp_path, compression="gzip")
+    html = ("<div class='card'>stream</div>" * 200).encode("utf-8")
+    h = store.put(html, "html", step="dump")
+    p = store.put(b"\x89PNG raw", "png", step="dump")
+
+    assert h.blob.endswith(".html.gz") and h.stored_size < h.size
+    assert gzip.decompress((tmp_path / h.blob).read_bytes()) == html
+    assert store.read(h) == html
+    assert p.blob.endswith(".png") and store.read(p) == b"\x89PNG raw"
+
+
+def test_eviction_by_age_then_size(tmp_path):
+    """old entries go first; then the oldest until the blobs fit; orphaned blobs are deleted"""
+    store = ArtifactStore(tmp_path, compression=None, max_age=100)
+    store.put(b"a" * 100, "png", step="old", ts=0)
+    store.put(b"b" * 100, "png", step="mid", ts=950)
+    store.put(b"c" * 100, "png", step="new", ts=990)
+
+    store.evict(now=1000)
+    assert [e.step for e in store.entries()] == ["mid", "new"]
+
+    store.max_bytes = 150
+    res = store.evict(now=1000)
+    assert [e.step for e in store.entries()] == ["new"]
+    assert res["bytes_removed"] == 100
+    assert len(list((tmp_path / "blobs").glob("*/*"))) == 1
+
+
+def test_size_eviction_counts_a_shared_blob_until_its_last_entry(tmp_path):
+    """dropping one of two entries that share a blob frees nothing; the next oldest goes as well"""
+    store = ArtifactStore(tmp_path, compression=None, max_bytes=150)
+    store.put(b"a" * 100, "png", step="first", ts=1)
+    store.put(b"b" * 100, "png", step="other", ts=2)
+    store.put(b"a" * 100, "png", step="again", ts=3)
+    store.evict(now=10)
+    assert [e.step for e in store.entries()] == ["again"]
+    assert store.dedup_hits == 1
+
+
+def test_writer_submit_blob_returns_final_path(tmp_path):
+    """the blob path is known on submit; the store write happens on the writer"""
+    store = ArtifactStore(tmp_path, compression=None)
+    writer = ArtifactWriter(workers=1, store=store)
+    path = writer.submit_blob(b"\x89PNG shot", "png", step="screenshot", test="t")
+    assert writer.wait_for(path)
+    writer.flush()
+
+    assert path.read_bytes() == b"\x89PNG shot"
+    assert [(e.step, e.test) for e in store.entries()] == [("screenshot", "t")]
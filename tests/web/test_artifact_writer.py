@@ -0,0 +1,77 @@
+"""
+Background artifact writer: disk writes and Allure attachment bodies off the test thread.
+tests/web/test_artifact_writer.py
+"""
+import json
+import threading
+
+from utils.artifacts import ArtifactWriter
+
+pytest_plugins = ["pytester"]
+
+
+def test_writes_land_on_disk_after_flush(tmp_path):
+    """every submitted blob is written by the workers; stats count bytes"""
+    writer = ArtifactWriter(workers=2, max_queue=4)
+    paths = [writer.submit(b"x" * 100, tmp_path / "debug" / f"shot_{i}.png") for i in range(20)]
+    writer.submit("<html>ok</html>", tmp_path / "debug" / "page.html")
+    writer.flush()
+
+    assert all(p.read_bytes() == b"x" * 100 for p in paths)
+    assert (tmp_path / "debug" / "page.html").read_text(encoding="utf-8") == "<html>ok</html>"
+    assert writer.stats.written == 21
+    assert writer.stats.bytes_written == 20 * 100 + len("<html>ok</html>")
+    assert 1 <= writer.stats.max_queue_depth <= 4
+    assert writer.queue_depth == 0
+    assert not list((tmp_path / "debug").glob("*.tmp"))
+
+
+def test_writes_run_off_the_submitting_thread(tmp_path):
+    """the caller never performs the disk write itself"""
+    writer = ArtifactWriter(workers=1)
+    writer_threads = []
+    target = tmp_path / "a.bin"
+    writer.submit(b"abc", target)
+    assert writer.wait_for(target, timeout=5)
+    writer_threads.extend(t.name for t in writer._threads)
+    assert writer_threads == ["artifact-writer-0"]
+    assert threading.current_thread().name not in writer_threads
+    assert target.read_bytes() == b"abc"
+
+
+def test_wait_for_tracks_every_submission_to_a_path(tmp_path):
+    """a second submit to the same path is waited for too; an unknown path is never reported written"""
+    writer = ArtifactWriter(workers=2)
+    target = tmp_path / "same.bin"
+    writer.submit(b"first", target)
+    writer.submit(b"second", target)
+    assert writer.wait_for(target, timeout=5)
+    assert len(writer._pending) == 0 and writer.stats.written == 2
+    assert not writer.wait_for(tmp_path / "never.bin", timeout=0)
+
+
+def test_allure_attachment_registered_on_test_and_written_in_background(pytester):
+    """attachment metadata belongs to the submitting test, the body is written by the worker"""
+    pytester.makepyfile(
+        """
+        from pathlib import Path
+
+        import allure
+        from utils.artifacts import ArtifactWriter
+
+        def test_capture(request):
+            writer = ArtifactWriter(workers=1, allure_dir=Path(request.config.option.allure_report_dir))
+            writer.submit(b"PNGDATA", attach_name="ui_screenshot", attachment_type=allure.attachment_type.PNG)
+            writer.flush()
+            assert writer.stats.attachments == 1 and writer.stats.attachment_bytes == 7
+            assert writer.stats.bytes_written == 0  # counted once, as an attachment
+        """
+    )
+    results = pytester.path / "allure-results"
+    outcome = pytester.runpytest_inprocess(f"--alluredir={results}", "-p", "no:cacheprovider")
+    outcome.assert_outcomes(passed=1)
+
+    result = [json.loads(p.read_text()) for p in results.glob("*-result.json")][0]
+    attachment = result["attachments"][0]
+    assert attachment["name"] == "ui_screenshot"
+    assert (results / attachment["source"]).read_bytes() == b"PNGDATA"
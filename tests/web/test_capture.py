@@ -0,0 +1,138 @@
+"""
+Failure capture levels: scaled JPEG / trimmed DOM per level, body truncation, per-session byte budget.
+tests/web/test_capture.py
+"""
+import base64
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from pages.twitch_home_page import TwitchHomePage
+from utils.artifact_store import ArtifactStore
+from utils.artifacts import ArtifactWriter
+from utils.capture import Capturer, locators_from_error, note_locators
+
+
+class _Browser:
+    """records what a capture asks the browser for; answers like Chrome would"""
+
+    def __init__(self, width=1280, html_chars=200_000):
+        self.width = width
+        self.html_chars = html_chars
+        self.calls = []
+
+    def get_screenshot_as_png(self):
+        self.calls.append("png")
+        return b"\x89PNG" + b"p" * 300_000
+
+    @property
+    def page_source(self):
+        self.calls.append("page_source")
+        return "<html>" + "x" * self.html_chars + "</html>"
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.calls.append((cmd, params))
+        return {"data": base64.b64encode(b"\xff\xd8" + b"j" * 20_000).decode()}
+
+    def execute_script(self, script, *args):
+        if "innerWidth" in script:
+            return [self.width, 720, 0, 400]
+        locs, max_chars, _levels = args
+        self.calls.append(("dom", locs, max_chars))
+        return {"matched": 0 if locs else None, "tag": "section", "html": "<section>" + "d" * (max_chars - 9),
+                "truncated": True, "html_chars": self.html_chars, "page_nodes": 5000}
+
+
+class _Response:
+    def __init__(self, size):
+        self._content = b"b" * size
+        self.encoding = "utf-8"
+
+
+@pytest.fixture
+def capturer(tmp_path):
+    writer = ArtifactWriter(store=ArtifactStore(tmp_path / "artifacts"))
+    yield lambda level="standard", budget=None: Capturer(level, budget, writer=writer)
+    writer.flush()
+
+
+def test_levels_decide_what_is_generated(capturer):
+    browser = _Browser()
+    minimal = capturer("minimal")
+    assert minimal.capture_page(browser, "failure") == [] and browser.calls == []
+
+    browser = _Browser()
+    standard = capturer("standard")
+    note_locators(browser, [(By.CSS_SELECTOR, ".card"), (By.LINK_TEXT, "not in-page")])
+    paths = standard.capture_page(browser, "failure")
+    assert [p.name.split(".")[1] for p in paths] == ["jpg", "html"]
+    (cmd, params), (_, locs, max_chars) = browser.calls
+    assert cmd == "Page.captureScreenshot" and params["format"] == "jpeg"
+    assert params["clip"] == {"x": 0, "y": 400, "width": 1280, "height": 720, "scale": 800 / 1280}
+    assert locs == [["css", ".card"]] and max_chars == 32 * 1024
+    assert "png" not in browser.calls and "page_source" not in browser.calls
+    assert standard.stats.by_kind["html"] < 33 * 1024
+
+    browser = _Browser()
+    full = capturer("full")
+    assert [p.name.split(".")[1] for p in full.capture_page(browser, "failure")] == ["png", "html"]
+    assert browser.calls == ["png", "page_source"]
+
+
+def test_jpeg_falls_back_to_png_without_cdp(capturer):
+    class _NoCdp(_Browser):
+        def execute_cdp_cmd(self, cmd, params):
+            raise AttributeError("not a Chromium driver")
+    browser = _NoCdp(width=600)
+    paths = capturer().capture_page(browser, "failure")
+    assert paths[0].suffix == ".png"
+
+
+def test_body_truncated_per_level(capturer):
+    assert capturer("standard").capture_body(_Response(100_000), limit=64 * 1024) is not None
+    c = capturer("minimal")
+    c.capture_body(_Response(100_000), limit=64 * 1024)
+    assert 4 * 1024 < c.stats.by_kind["txt"] < 4 * 1024 + 100  # 4 KB plus the truncation note
+
+
+def test_budget_degrades_then_drops(capturer):
+    c = capturer("full", budget=1_000_000)
+    c.capture_page(_Browser(), "a")  # png + page source ~ 500 KB -> half the budget used
+    assert c.policy().name == "standard"
+    while c.policy().name == "standard":
+        c.capture_page(_Browser(), "b")  # JPEG + trimmed DOM ~ 53 KB each, until 80% is used
+    assert c.stats.pages == 7 and c.stats.degraded == 6 and c.stats.bytes >= 800_000
+    browser = _Browser()
+    assert c.capture_page(browser, "f") == [] and browser.calls == []
+    assert c.capture_body(_Response(50_000)) is not None  # bodies still fit, capped at 4 KB
+    assert c.stats.bytes <= 1_000_000
+
+    tight = capturer("full", budget=100_000)
+    assert tight.capture_page(_Browser(), "g") == []  # neither artifact fits: dropped, not written
+    assert tight.stats.skipped == 2 and tight.stats.bytes == 0
+    assert "skipped=2" in tight.report_lines()[1]
+
+
+def test_failing_locator_parsed_from_error():
+    msg = ('Message: no such element: Unable to locate element: '
+           '{"method":"css selector","selector":"a[data-a-target=\\"preview-card-title-link\\"]"}')
+    assert locators_from_error(msg) == [("css selector", 'a[data-a-target="preview-card-title-link"]')]
+    assert locators_from_error(TimeoutError("timed out")) == []
+
+
+def test_dom_snapshot_trimmed_in_page(headless_chrome, stand_in_site, tmp_path):
+    """the real script against the stand-in: anchored at the card, scripts stripped, capped"""
+    d = headless_chrome()
+    try:
+        d.get(stand_in_site.url("/search?term=sc2&delay=0"))
+        home = TwitchHomePage(d, base_url=stand_in_site.base_url)
+        home.waits.until("render", "return document.querySelectorAll('.card').length === 6;", timeout=5)
+        c = Capturer("standard", writer=ArtifactWriter(store=ArtifactStore(tmp_path / "artifacts")))
+        jpg, html = c.capture_page(d, "failure", locators=home.STREAM_CARD_SELECTORS)
+        c.writer.flush()
+        assert jpg.read_bytes()[:2] == b"\xff\xd8"
+        snapshot = ArtifactStore(tmp_path / "artifacts").read(html).decode()
+        assert snapshot.startswith("<!-- dom snapshot: css ") and "<script" not in snapshot
+        assert "/channel/alpha" in snapshot and len(snapshot) < 33 * 1024
+    finally:
+        d.quit()
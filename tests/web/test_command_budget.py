@@ -0,0 +1,105 @@
+"""
+WebDriver command counting and per-test / per-step round-trip budgets.
+tests/web/test_command_budget.py
+"""
+from pathlib import Path
+
+import pytest
+
+from utils import command_budget as budget_module, step_timing
+from utils.command_budget import CommandBudgetExceeded, CommandBudgetWarning, command_budget, count_commands
+from utils.step_timing import StepTimer, timed_steps
+
+pytest_plugins = ["pytester"]
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+class FakeDriver:
+    def execute(self, driver_command, params=None):
+        return {"value": None}
+
+
+@timed_steps
+class FakePage:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def click_first_streamer(self, polls: int = 1):
+        self.driver.execute("executeScript", {})
+        self.find_stream_candidates()
+        for _ in range(polls):
+            self.driver.execute("getCurrentUrl", {})
+
+    def find_stream_candidates(self):
+        self.driver.execute("executeScript", {})
+
+
+@pytest.fixture
+def page(monkeypatch):
+    monkeypatch.setattr(step_timing, "TIMINGS", StepTimer())
+    monkeypatch.setattr(budget_module, "VIOLATIONS", [])
+    return FakePage(FakeDriver())
+
+
+def test_step_count_includes_nested_steps(page):
+    """commands of find_stream_candidates count toward the enclosing click_first_streamer"""
+    page.click_first_streamer(polls=2)
+    counts = count_commands(step="click_first_streamer")
+    assert counts == {"executeScript": 2, "getCurrentUrl": 2}
+    assert sum(count_commands(step="find_stream_candidates").values()) == 1
+
+
+def test_context_manager_passes_within_budget(page):
+    with command_budget(4, step="click_first_streamer") as usage:
+        page.click_first_streamer(polls=2)
+    assert usage.used == 4 and not usage.exceeded
+
+
+def test_context_manager_fails_or_warns_over_budget(page):
+    with pytest.raises(CommandBudgetExceeded, match=r"click_first_streamer used 5 .*budget 3.*getCurrentUrl=3"):
+        with command_budget(3, step="click_first_streamer"):
+            page.click_first_streamer(polls=3)
+    with pytest.warns(CommandBudgetWarning):
+        with command_budget(1, strict=False):
+            page.click_first_streamer()
+
+
+def test_marker_fails_test_over_budget(pytester, monkeypatch):
+    """@pytest.mark.command_budget fails the test (checked by the root conftest hook)"""
+    monkeypatch.setenv("PYTHONPATH", str(ROOT))
+    pytester.makeconftest((ROOT / "conftest.py").read_text(encoding="utf-8"))
+    (pytester.path / "pytest.ini").write_text((ROOT / "pytest.ini").read_text(encoding="utf-8"), encoding="utf-8")
+    pytester.makepyfile(
+        """
+        import pytest
+        from utils.step_timing import timed_steps
+
+        class Driver:
+            def execute(self, command, params=None):
+                return {"value": None}
+
+        @timed_steps
+        class Page:
+            def __init__(self):
+                self.driver = Driver()
+
+            def click_first_streamer(self):
+                for _ in range(3):
+                    self.driver.execute("getCurrentUrl", {})
+
+        @pytest.mark.command_budget(click_first_streamer=2)
+        def test_over():
+            Page().click_first_streamer()
+
+        @pytest.mark.command_budget(3)
+        def test_within():
+            Page().click_first_streamer()
+        """
+    )
+    result = pytester.runpytest_subprocess("-p", "no:cacheprovider")
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(["*CommandBudgetExceeded*click_first_streamer used 3 WebDriver commands (budget 2)*"])
+
+    warned = pytester.runpytest_subprocess("-p", "no:cacheprovider", "--command-budget", "warn")
+    warned.assert_outcomes(passed=2, warnings=1)
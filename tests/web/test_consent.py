@@ -0,0 +1,57 @@
+"""
+Batched consent dismissal against the local static stand-in of the Twitch pages.
+tests/web/test_consent.py
+"""
+import pytest
+
+from pages.twitch_home_page import TwitchHomePage
+
+
+@pytest.fixture
+def home(headless_chrome, stand_in_site):
+    """home page object on a fresh headless browser"""
+    d = headless_chrome()
+    yield TwitchHomePage(d, base_url=stand_in_site.base_url)
+    d.quit()
+
+
+def test_top_level_banner_in_one_scan(home, stand_in_site):
+    """the accept button in the top document is clicked by the batched scan"""
+    home.go_to_twitch()
+    assert home.handle_cookies() is True
+    report = home.consent_report
+    assert report["matched"] and report["strategy"] == "batched_scan"
+    assert report["frame"] is None
+    assert report["timings"]["batched_scan"] < 1.0
+    assert home.driver.execute_script("return document.getElementById('cookie-banner') === null")
+    assert any(c["name"] == "consent" for c in home.driver.get_cookies())
+
+
+def test_same_origin_iframe_needs_no_frame_switch(home, stand_in_site):
+    """banners in same-origin frames are found by the same single scan"""
+    home.driver.get(stand_in_site.url("/consent_frames.html?frame=same"))
+    home.handle_cookies()
+    report = home.consent_report
+    assert report["strategy"] == "batched_scan"
+    assert report["frame"] == 1
+    assert "cross_origin_frames" not in report["timings"]
+    assert home.driver.title == "accepted"
+
+
+def test_cross_origin_iframe_is_probed_individually(home, stand_in_site):
+    """only the unreadable frame falls back to switch_to.frame probing"""
+    home.driver.get(stand_in_site.url("/consent_frames.html?frame=cross"))
+    home.waits.until("frame_loaded", "return document.querySelectorAll('iframe').length === 2;", timeout=5)
+    home.handle_cookies(appear_timeout=0.5)
+    report = home.consent_report
+    assert report["strategy"] == "cross_origin_frame"
+    assert report["frame"] == 1
+
+
+def test_no_banner_worst_case_is_fast(home, stand_in_site):
+    """without any banner the whole consent step stays well under a second"""
+    home.driver.get(stand_in_site.url("/search?term=x"))
+    home.handle_cookies()
+    report = home.consent_report
+    assert report["matched"] is False and report["strategy"] == "js_remove"
+    assert sum(report["timings"].values()) < 1.0
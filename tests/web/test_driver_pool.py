@@ -0,0 +1,216 @@
+"""
+Driver pool leasing/reset/recycle logic. Runs without Chrome: the pool is given a
+factory of minimal in-process browsers that record the commands they receive.
+tests/web/test_driver_pool.py
+"""
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from utils.capture import note_locators
+from utils.driver_pool import DriverPool, DriverPoolTimeout
+
+
+class RecordingBrowser:
+    """bare WebDriver surface used by DriverPool"""
+    launched = 0
+
+    def __init__(self):
+        RecordingBrowser.launched += 1
+        self.commands = []
+        self.crashed = False
+        self.quit_called = False
+        self.performance_log = []
+
+    @property
+    def window_handles(self):
+        if self.crashed:
+            raise WebDriverException("chrome not reachable")
+        return ["main"]
+
+    def execute_script(self, script, *args):
+        self.commands.append(("execute_script", script))
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append(("cdp", cmd))
+
+    def get(self, url):
+        self.commands.append(("get", url))
+
+    def implicitly_wait(self, seconds):
+        self.commands.append(("implicitly_wait", seconds))
+
+    def get_log(self, log_type):
+        self.commands.append(("get_log", log_type))
+        entries, self.performance_log = self.performance_log, []
+        return entries
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def pool():
+    """two pre-warmed browsers, recycled after 3 leases"""
+    p = DriverPool(size=2, max_uses=3, factory=RecordingBrowser).start()
+    yield p
+    p.close()
+
+
+def test_prewarm_launches_size_browsers(pool):
+    """start() launches every browser before the first lease"""
+    assert pool.stats.launches == 2
+    d = pool.acquire()
+    assert pool.stats.launches == 2
+    pool.release(d)
+
+
+def test_release_resets_state(pool):
+    """cookies, storage and page are reset between leases"""
+    with pool.lease() as d:
+        d.commands.clear()
+    assert ("cdp", "Network.clearBrowserCookies") in d.commands
+    assert ("get", "about:blank") in d.commands
+    assert any(c[0] == "execute_script" and "localStorage.clear" in c[1] for c in d.commands)
+
+
+def test_release_removes_playback_hooks(pool):
+    """the new-document playback script of one lease does not run in the next one"""
+    with pool.lease() as d:
+        d._qa_playback_hooks = "7"
+        d.commands.clear()
+    assert ("cdp", "Page.removeScriptToEvaluateOnNewDocument") in d.commands
+    assert d._qa_playback_hooks is None
+
+
+def test_release_forgets_noted_locators(pool):
+    """a failure snapshot in the next lease is not anchored on the previous test's locators"""
+    with pool.lease() as d:
+        note_locators(d, [("css selector", ".card")])
+    assert d._qa_locators == []
+
+
+def test_release_drains_the_performance_log(pool):
+    """Network.* events of a lease that never used NetworkMonitor are not left buffered in the browser"""
+    with pool.lease() as d:
+        d.performance_log = [{"message": "{}", "timestamp": 1}] * 500
+        d._qa_network_monitor = object()
+    assert ("get_log", "performance") in d.commands
+    assert d.performance_log == [] and d._qa_network_monitor is None
+
+
+class TwoOriginBrowser(RecordingBrowser):
+    """keeps storage per origin the way Chrome does; the lease navigates across two sites"""
+
+    def __init__(self):
+        super().__init__()
+        self.history = []
+        self.storage = {}
+
+    def get(self, url):
+        super().get(url)
+        self.history.append(url)
+
+    def set_item(self, key, value):
+        origin = "/".join(self.history[-1].split("/")[:3])
+        self.storage.setdefault(origin, {})[key] = value
+
+    def execute_script(self, script, *args):
+        super().execute_script(script, *args)
+        if "localStorage.clear" in script and self.history:
+            self.storage.pop("/".join(self.history[-1].split("/")[:3]), None)
+
+    def execute_cdp_cmd(self, cmd, params):
+        super().execute_cdp_cmd(cmd, params)
+        if cmd == "Page.getNavigationHistory":
+            return {"currentIndex": len(self.history) - 1, "entries": [{"url": u} for u in self.history]}
+        if cmd == "Storage.clearDataForOrigin":
+            assert params["storageTypes"] == "all"
+            self.storage.pop(params["origin"], None)
+        if cmd == "Page.resetNavigationHistory":
+            self.history = self.history[-1:]
+        return {}
+
+
+def test_release_clears_storage_of_every_origin():
+    """storage written on two sites during a lease is gone on the next lease, not just the current site's"""
+    p = DriverPool(size=1, factory=TwoOriginBrowser).start()
+    with p.lease() as d:
+        d.get("https://www.twitch.tv/directory")
+        d.set_item("consent", "1")
+        d.get("https://id.twitch.tv:8443/login")
+        d.set_item("token", "abc")
+        assert len(d.storage) == 2
+    with p.lease() as again:
+        assert again is d
+        assert d.storage == {}
+    p.close()
+
+
+def test_recycle_after_max_uses(pool):
+    """a browser is quit and replaced after max_uses leases"""
+    first = pool.acquire()
+    pool.release(first)
+    seen = {id(first): 1}
+    for _ in range(6):
+        d = pool.acquire()
+        seen[id(d)] = seen.get(id(d), 0) + 1
+        pool.release(d)
+    assert max(seen.values()) <= 3
+    assert pool.stats.recycled_max_uses >= 1
+    _wait_for(lambda: pool.stats.launches >= 3)
+    assert 3 in pool.stats.reuse_counts
+
+
+def test_crashed_browser_is_replaced(pool):
+    """a dead browser is retired on release and never leased again"""
+    d = pool.acquire()
+    d.crashed = True
+    pool.release(d)
+    assert d.quit_called
+    assert pool.stats.recycled_crashed == 1
+    _wait_for(lambda: pool.stats.launches == 3)
+    leased = [pool.acquire(), pool.acquire()]
+    assert d not in leased
+    for x in leased:
+        pool.release(x)
+
+
+def test_lease_wait_is_reported(pool):
+    """a third concurrent lease waits for a release and the wait is recorded"""
+    a, b = pool.acquire(), pool.acquire()
+    threading.Timer(0.3, pool.release, args=(a,)).start()
+    c = pool.acquire(timeout=5)
+    assert c is a
+    assert pool.stats.lease_wait_max >= 0.25
+    assert "lease wait" in pool.report_lines()[1]
+    pool.release(b)
+    pool.release(c)
+
+
+def test_acquire_times_out():
+    """DriverPoolTimeout when every browser stays leased"""
+    p = DriverPool(size=1, factory=RecordingBrowser).start()
+    d = p.acquire()
+    with pytest.raises(DriverPoolTimeout):
+        p.acquire(timeout=0.6)
+    p.release(d)
+    p.close()
+
+
+def test_launch_failure_surfaces():
+    """a factory that cannot start Chrome fails the lease instead of hanging"""
+    def broken():
+        raise WebDriverException("no chrome binary")
+    p = DriverPool(size=1, factory=broken).start()
+    with pytest.raises(WebDriverException):
+        p.acquire(timeout=5)
+
+
+def _wait_for(cond, timeout=2.0):
+    end = time.time() + timeout
+    while time.time() < end and not cond():
+        time.sleep(0.02)
+    assert cond()
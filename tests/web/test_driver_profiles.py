@@ -0,0 +1,102 @@
+"""
+Driver launch profiles: headless, CDP URL blocking, image disabling and per-browser disk cache slots.
+tests/web/test_driver_profiles.py
+"""
+from pathlib import Path
+
+import pytest
+
+from utils import driver_factory
+from utils.driver_factory import chrome_options, get_profile
+from utils.driver_pool import DriverPools
+from utils.stub_server import StubServer
+
+STAND_IN_DIR = Path(__file__).parent / "stand_in"
+NAV_LOAD_MS_JS = "var n = performance.getEntriesByType('navigation')[0]; return n ? n.loadEventEnd : null;"
+
+
+def test_profiles_resolve_and_configure_chrome(tmp_path):
+    fast = get_profile("fast")
+    assert get_profile(None).name == "default" and get_profile(fast) is fast
+    with pytest.raises(ValueError, match="unknown driver profile"):
+        get_profile("turbo")
+
+    args = chrome_options(profile=fast, cache_dir=tmp_path).arguments
+    assert "--headless=new" in args
+    assert "--blink-settings=imagesEnabled=false" in args
+    assert f"--disk-cache-dir={tmp_path.resolve()}" in args
+    assert "--headless=new" not in chrome_options(profile=get_profile("default")).arguments
+    assert "*.png" in fast.blocked_urls and "*doubleclick.net*" in fast.blocked_urls
+
+
+def test_cache_slots_are_exclusive_and_reused(tmp_path, monkeypatch):
+    """two live browsers never share a disk cache; a released slot is reused"""
+    monkeypatch.setattr(driver_factory, "CACHE_ROOT", tmp_path)
+    slots = driver_factory._CacheSlots()
+    a, b = slots.acquire("fast"), slots.acquire("fast")
+    assert a != b and a.is_dir() and b.is_dir()
+    slots.release(a)
+    assert slots.acquire("fast") == a
+
+
+class ProfileBrowser:
+    """bare WebDriver surface used by DriverPool, remembering its profile"""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.window_handles = ["main"]
+
+    def execute_script(self, script, *args):
+        pass
+
+    def execute_cdp_cmd(self, cmd, params):
+        pass
+
+    def get(self, url):
+        pass
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def quit(self):
+        pass
+
+
+def test_one_pool_per_profile():
+    pools = DriverPools(size=1, max_uses=5, factory=lambda profile: ProfileBrowser(profile))
+    with pools.get("fast").lease() as fast_browser:
+        assert fast_browser.profile == "fast"
+    assert pools.get("fast") is pools.get("fast")
+    assert pools.get("default").acquire().profile == "default"
+    lines = pools.report_lines()
+    assert any(line.startswith("[default] ") for line in lines)
+    assert any(line.startswith("[fast] ") for line in lines)
+    pools.close()
+
+
+@pytest.fixture
+def slow_assets_site():
+    """stand-in site where every request costs 300ms, like a far-away CDN"""
+    server = StubServer(latency=0.3, static_dir=STAND_IN_DIR).start()
+    yield server
+    server.stop()
+
+
+def _load(factory, profile: str, url: str) -> float:
+    driver = factory(profile=profile)
+    try:
+        driver.get(url)
+        return driver.execute_script(NAV_LOAD_MS_JS)
+    finally:
+        driver.quit()
+
+
+def test_fast_profile_blocks_assets_and_loads_faster(headless_chrome, slow_assets_site):
+    url = slow_assets_site.url("/heavy")
+    baseline_ms = _load(headless_chrome, "headless", url)
+    assert any(r.path.startswith("/assets/") for r in slow_assets_site.log)
+
+    slow_assets_site.log.clear()
+    fast_ms = _load(headless_chrome, "fast", url)
+    assert not any(r.path.startswith("/assets/") for r in slow_assets_site.log)
+    assert fast_ms < baseline_ms
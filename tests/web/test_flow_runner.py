@@ -0,0 +1,34 @@
+"""
+Parallel (query, device) flow runner against the local static stand-in of the Twitch pages.
+tests/web/test_flow_runner.py
+"""
+import json
+
+from utils.flow_runner import FlowCase, FlowRunner, matrix
+
+
+def test_matrix_and_namespaces():
+    """every (query, device) pair gets a distinct artifact namespace"""
+    cases = matrix(["StarCraft II", "Dota 2"], ["iPhone X", "Pixel 5"])
+    assert len(cases) == 4
+    assert FlowCase("StarCraft II", "iPhone X").namespace == "iphone_x__starcraft_ii"
+    assert len({c.namespace for c in cases}) == 4
+
+
+def test_flows_run_concurrently_against_stand_in(stand_in_site, headless_chrome, tmp_path):
+    """4 flows on 4 headless browsers: all pass, each with its own timings and artifacts"""
+    cases = matrix(["StarCraft II", "Dota 2"], ["iPhone X", "Pixel 5"])
+    runner = FlowRunner(base_url=stand_in_site.base_url, workers=4, driver_factory=headless_chrome,
+                        artifacts_root=tmp_path, playback_seconds=1.0, playback_timeout=10)
+    results = runner.run(cases)
+
+    assert [r.ok for r in results] == [True] * 4, [r.error for r in results]
+    for r in results:
+        names = [s.name for s in r.steps]
+        assert names[0] == "launch_browser" and names[-1] == "screenshot"
+        assert all(s.seconds >= 0 for s in r.steps)
+        ns = tmp_path / r.case.namespace
+        assert (ns / "result.json").exists()
+        assert any(a.startswith(str(ns)) and a.endswith(".png") for a in r.artifacts)
+    summary = json.loads((tmp_path / "summary.json").read_text(encoding="utf-8"))
+    assert {s["namespace"] for s in summary} == {c.namespace for c in cases}
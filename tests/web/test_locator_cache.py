@@ -0,0 +1,109 @@
+"""
+Locator resolution cache: historical winner first, demotion of stale variants, one in-page race, persistence.
+tests/web/test_locator_cache.py
+"""
+import json
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from pages.locator_cache import LocatorCache, resolve, split_css
+from pages.twitch_home_page import TwitchHomePage
+
+VARIANTS = [(By.CSS_SELECTOR, ".old"), (By.CSS_SELECTOR, ".new"), (By.XPATH, "//button[@id='x']")]
+GROUP = "www.twitch.tv TwitchHomePage.TEST"
+
+
+class _Waits:
+    """answers RESOLVE_LOCATORS_JS like the page would: the first listed variant present in `page`"""
+
+    def __init__(self, page):
+        self.page = page
+        self.calls = []
+
+    def execute_async(self, script, locators, timeout_ms, clickable, timeout):
+        self.calls.append([value for _kind, value in locators])
+        for i, (_kind, value) in enumerate(locators):
+            if value in self.page:
+                return {"index": i, "element": f"<{value}>", "elapsed_ms": 3}
+        return {"index": None, "element": None, "elapsed_ms": timeout_ms}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LocatorCache(tmp_path / "resolution_stats.json")
+
+
+def test_winner_moves_first_and_stale_variant_is_demoted(cache):
+    waits = _Waits(page={".new"})
+    assert resolve(waits, cache, GROUP, VARIANTS, timeout=1) == ("<.new>", 1)
+    assert cache.order(GROUP, VARIANTS) == [1, 0, 2]  # the winner now leads
+    assert waits.calls == [[".old", ".new", "//button[@id='x']"]]  # every variant raced in one call
+
+    for _ in range(9):
+        resolve(waits, cache, GROUP, VARIANTS, timeout=1)
+    assert waits.calls[-1][0] == ".new"
+    assert cache.stats(GROUP, VARIANTS[1]).hits == 10
+    assert cache.stats(GROUP, VARIANTS[0]).misses == 1  # only counted while it was tried ahead of the winner
+
+    # the long-time winner stops matching: after three straight misses it goes last, although its
+    # decayed score alone would have kept it first for many more runs
+    waits.page = {"//button[@id='x']"}
+    for _ in range(3):
+        assert resolve(waits, cache, GROUP, VARIANTS, timeout=1)[1] == 2
+        assert waits.calls[-1][0] == ".new"
+    assert cache.demoted(GROUP, VARIANTS[1])
+    assert cache.stats(GROUP, VARIANTS[1]).score > cache.stats(GROUP, VARIANTS[2]).score
+    assert cache.order(GROUP, VARIANTS) == [2, 0, 1]
+    resolve(waits, cache, GROUP, VARIANTS, timeout=1)
+    assert waits.calls[-1][0] == "//button[@id='x']"
+
+
+def test_nothing_learned_when_no_variant_matches(cache):
+    assert resolve(_Waits(page=set()), cache, GROUP, VARIANTS, timeout=0.1) == (None, None)
+    assert cache.order(GROUP, VARIANTS) == [0, 1, 2]
+    assert cache.stats(GROUP, VARIANTS[0]).misses == 0
+    assert "unmatched=1" in cache.report_lines()[0]
+
+
+def test_stats_persist_across_runs_and_reset(cache, tmp_path):
+    resolve(_Waits(page={".new"}), cache, GROUP, VARIANTS, timeout=1)
+    path = cache.save()
+    assert json.loads(path.read_text())[GROUP]["css selector=.new"]["hits"] == 1
+
+    next_run = LocatorCache(path)
+    assert next_run.order(GROUP, VARIANTS) == [1, 0, 2]
+    assert LocatorCache(path).configure("off").order(GROUP, VARIANTS) == [0, 1, 2]
+    fresh = LocatorCache(path).configure("reset")
+    assert fresh.order(GROUP, VARIANTS) == [0, 1, 2]
+    fresh.save()
+    assert json.loads(path.read_text()) == {}
+
+
+def test_composite_css_split_into_variants():
+    assert split_css(TwitchHomePage.SEARCH_ICON) == [
+        (By.CSS_SELECTOR, "button[aria-label*='Search']"),
+        (By.CSS_SELECTOR, "button[data-a-target*='search']"),
+        (By.CSS_SELECTOR, "button[data-test-selector*='search']"),
+    ]
+    assert split_css((By.CSS_SELECTOR, "a[title='x, y'], :is(b, i)")) == [
+        (By.CSS_SELECTOR, "a[title='x, y']"), (By.CSS_SELECTOR, ":is(b, i)")]
+    assert split_css((By.XPATH, "//a | //b")) == [(By.XPATH, "//a | //b")]
+    assert LocatorCache.group_name("https://www.twitch.tv/", "X") == "www.twitch.tv X"
+
+
+def test_search_icon_variant_learned_on_stand_in(headless_chrome, stand_in_site, tmp_path):
+    """the stand-in's icon matches the aria-label variant, which is recorded as the winner; cards map back"""
+    d = headless_chrome()
+    try:
+        cache = LocatorCache(tmp_path / "resolution_stats.json")
+        home = TwitchHomePage(d, base_url=stand_in_site.base_url, locator_cache=cache)
+        home.go_to_twitch()
+        assert home.search_for_game("StarCraft II")
+        group = home._group("SEARCH_ICON")
+        assert cache.order(group, split_css(home.SEARCH_ICON))[0] == 0
+        assert cache.runs[group].resolved == 1
+        assert home.wait_for_stream_candidate(timeout=5)
+        assert home.last_candidates[0]["selector_index"] == 0
+    finally:
+        d.quit()
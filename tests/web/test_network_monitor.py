@@ -0,0 +1,111 @@
+"""
+Network readiness from Chrome's performance log: in-flight tracking, idle and request-completed waits.
+tests/web/test_network_monitor.py
+"""
+import json
+import time
+
+import pytest
+
+from pages.network_monitor import NetworkMonitor
+from pages.twitch_home_page import TwitchHomePage
+from pages.wait_engine import WaitLedger
+
+
+def entry(method, ts, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}}), "timestamp": ts * 1000}
+
+
+def started(rid, url, ts, kind="XHR", method="GET", post=None):
+    request = {"url": url, "method": method}
+    if post:
+        request["postData"] = post
+    return entry("Network.requestWillBeSent", ts, requestId=rid, request=request, type=kind)
+
+
+class LogBrowser:
+    """performance log handed out in batches, one per get_log call"""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.calls = 0
+
+    def get_log(self, log_type):
+        assert log_type == "performance"
+        self.calls += 1
+        return self.batches.pop(0) if self.batches else []
+
+
+def test_feed_tracks_in_flight_by_request_id():
+    now = [100.0]
+    monitor = NetworkMonitor(LogBrowser(), clock=lambda: now[0])
+    monitor.feed([
+        started("1", "http://x/api/search?term=a", 99.0),
+        started("2", "http://x/app.js", 99.1, kind="Script"),
+        started("3", "http://edge/segment.ts", 99.2, kind="Media"),
+        entry("Page.frameNavigated", 99.2),
+        entry("Network.responseReceived", 99.5, requestId="1", type="XHR", response={"status": 200}),
+        entry("Network.loadingFinished", 99.6, requestId="1"),
+    ])
+    assert [r.request_id for r in monitor.in_flight()] == ["2"]  # the video segment is ignored
+    assert not monitor.is_idle(100)
+
+    monitor.feed([entry("Network.loadingFailed", 99.8, requestId="2", errorText="net::ERR_ABORTED")])
+    assert monitor.records["2"].failed and monitor.records["2"].error == "net::ERR_ABORTED"
+    assert monitor.is_idle(100) and not monitor.is_idle(300)
+
+    found = monitor.find(r"/api/search\b", resource_types=("XHR",))
+    assert found.status == 200 and found.duration == pytest.approx(0.6)
+
+
+def test_request_wait_matches_post_body_after_mark():
+    """GraphQL requests share one url: the operation name is in the post body"""
+    early = started("1", "https://gql.twitch.tv/gql", 1.0, method="POST", post='{"operationName":"SearchResultsPage_SearchResults"}')
+    browser = LogBrowser([early, entry("Network.loadingFinished", 1.1, requestId="1")],
+                         [started("2", "https://gql.twitch.tv/gql", 2.0, method="POST",
+                                  post='[{"operationName":"SearchResultsPage_SearchResults"}]')],
+                         [],
+                         [entry("Network.loadingFinished", 2.3, requestId="2")])
+    monitor = NetworkMonitor(browser)
+    monitor.waits.ledger = WaitLedger()
+    since = monitor.mark()
+    found = monitor.wait_for_request("search", "SearchResultsPage_SearchResults", timeout=2, since=since,
+                                     legacy=1.0, poll=0.01)
+    assert found.request_id == "2" and found.method == "POST"
+    assert monitor.waits.ledger.rows()["search"]["calls"] == 1
+
+
+def test_no_performance_log_returns_at_once():
+    """not Chrome / logging off: no fixed wait unless a legacy sleep is being replaced"""
+    monitor = NetworkMonitor(object())
+    started_at = time.perf_counter()
+    assert monitor.wait_for_request("x", "anything", timeout=5) is None
+    assert monitor.wait_for_idle("x", timeout=5) is False
+    assert time.perf_counter() - started_at < 0.5
+    assert monitor.available is False
+
+
+@pytest.fixture
+def browser(headless_chrome):
+    """one headless browser per test"""
+    d = headless_chrome()
+    yield d
+    d.quit()
+
+
+def test_search_xhr_completion_is_observed(browser, stand_in_site):
+    """the stand-in search page fetches its cards; the wait ends when that XHR has completed"""
+    monitor = NetworkMonitor.for_driver(browser)
+    since = monitor.mark()
+    browser.get(stand_in_site.url("/search?term=sc2&delay=800"))
+    found = monitor.wait_for_request("search", r"/api/search\b", timeout=5, since=since, resource_types=("XHR",))
+    assert monitor.available and found is not None
+    assert found.status == 200 and found.duration >= 0.7
+    assert browser.execute_script("return document.querySelectorAll('.card a').length") == 6
+    assert monitor.wait_for_idle("idle", idle_ms=200, timeout=3)
+
+
+def test_direct_search_waits_for_results_request(browser, stand_in_site):
+    home = TwitchHomePage(browser, base_url=stand_in_site.base_url)
+    assert home._direct_search_url("sc2")
+    assert home.find_stream_candidates()
@@ -0,0 +1,69 @@
+"""
+Harness benchmark suite: Welch's t-test, per-commit history, regression gate, offline benchmarks.
+tests/web/test_perf_bench.py
+"""
+import json
+import random
+
+import pytest
+
+from utils import perf_bench
+from utils.perf_bench import _betainc, baseline_run, compare, make_run, read_history, run_benchmarks, welch_t_test
+
+
+def _noisy(mean, n=30, rel=0.03, seed=1):
+    rng = random.Random(seed)
+    return [rng.gauss(mean, mean * rel) for _ in range(n)]
+
+
+def test_student_t_p_values():
+    # t = 2.0 with 10 degrees of freedom: two-sided p = 0.0734
+    assert _betainc(5.0, 0.5, 10 / 14) == pytest.approx(0.0734, abs=1e-4)
+    assert welch_t_test([1.0, 1.0, 1.0], [1.0, 1.0, 1.0])[2] == 1.0
+    t, df, p = welch_t_test(_noisy(10.0, seed=2), _noisy(12.0, seed=3))
+    assert t < 0 and 40 < df <= 58 and p < 1e-6
+
+
+def test_regression_needs_threshold_and_significance():
+    base = {"hook": {"samples": _noisy(100e-6)}}
+    assert not compare({"hook": {"samples": _noisy(104e-6, seed=5)}}, base)[0].regressed  # under 10%
+    row = compare({"hook": {"samples": _noisy(125e-6, seed=6)}}, base)[0]
+    assert row.regressed and row.change == pytest.approx(0.25, abs=0.03) and row.p_value < 0.05
+    noisy = compare({"hook": {"samples": _noisy(125e-6, n=3, rel=0.6, seed=7)}}, base)[0]
+    assert not noisy.regressed  # slower on average, but within the noise
+    assert compare({"hook": {"skipped": "no Chrome"}}, base) == []
+
+
+def test_baseline_is_previous_commit_or_requested_one():
+    history = [{"commit": "aaa1111"}, {"commit": "bbb2222"}, {"commit": "ccc3333"}, {"commit": "ccc3333"}]
+    assert baseline_run(history, "ccc3333")["commit"] == "bbb2222"
+    assert baseline_run(history, "ccc3333", against="aaa")["commit"] == "aaa1111"
+    assert baseline_run(history[:1], "aaa1111") is None
+
+
+def test_offline_benchmarks_measure_harness_overhead():
+    metrics = run_benchmarks(samples=3, batch=5, only="client|safe_save|makereport", chrome_samples=0)
+    assert set(metrics) == {"client_wrapper_request", "simple_client_request", "makereport_failure_hook",
+                            "safe_save_debug"}
+    for m in metrics.values():
+        assert m.skipped is None and len(m.samples) == 3 and m.mean > 0
+    # capturing a JPEG + trimmed DOM snapshot costs more than routing a request through the wrappers
+    assert metrics["safe_save_debug"].mean > metrics["simple_client_request"].mean
+
+
+def test_cli_appends_history_and_fails_on_regression(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(perf_bench, "current_commit", lambda cwd=None: "new0001")
+    history = tmp_path / "history.jsonl"
+    args = ["--only", "simple_client", "--samples", "8", "--batch", "50", "--chrome-samples", "0",
+            "--history", str(history)]
+    assert perf_bench.main(args) == 0
+    assert "no baseline run" in capsys.readouterr().out
+
+    fast = make_run({}, commit="old0001")
+    fast["metrics"] = {"simple_client_request": {"samples": _noisy(1e-9, n=8)}}
+    lines = history.read_text().splitlines()
+    history.write_text(json.dumps(fast) + "\n" + "\n".join(lines) + "\n")
+    assert perf_bench.main(args) == 1
+    out = capsys.readouterr().out
+    assert "vs old0001" in out and "REGRESSION" in out
+    assert [r["commit"] for r in read_history(history)] == ["old0001", "new0001", "new0001"]
@@ -0,0 +1,52 @@
+"""
+Event-driven playback verification against the local static stand-in of a channel page.
+tests/web/test_playback_monitor.py
+"""
+import pytest
+
+from pages.twitch_streamer_page import PlaybackMetrics, TwitchStreamerPage
+from utils.command_budget import command_budget
+
+
+def test_metrics_are_truthy_only_when_target_reached():
+    """`assert played` keeps working for callers of the old bool API"""
+    assert not PlaybackMetrics(target_seconds=5.0, played_seconds=4.9)
+    assert PlaybackMetrics(reached=True, target_seconds=5.0, played_seconds=5.1)
+    assert PlaybackMetrics(rebuffer_count=2).to_dict()["rebuffer_count"] == 2
+
+
+@pytest.fixture
+def streamer(headless_chrome):
+    """streamer page object (playback hooks registered) on a fresh headless browser"""
+    d = headless_chrome()
+    yield TwitchStreamerPage(d)
+    d.quit()
+
+
+def test_playback_observed_in_one_round_trip(streamer, stand_in_site):
+    """played time, first frame and no rebuffers, from a single in-page wait"""
+    streamer.driver.get(stand_in_site.url("/channel/alpha"))
+    with command_budget(3, step="wait_for_video_playback"):
+        played = streamer.wait_for_video_playback(seconds=1.0, timeout=10)
+
+    assert played, played
+    assert played.video_found and played.reason == "played"
+    assert played.played_seconds >= 1.0
+    assert played.time_to_first_frame is not None and 0 < played.time_to_first_frame < 10
+    assert played.rebuffer_count == 0
+    assert streamer.last_playback is played
+
+
+def test_rebuffers_are_counted(streamer, stand_in_site):
+    streamer.driver.get(stand_in_site.url("/channel/alpha?rebuffer=2"))
+    played = streamer.wait_for_video_playback(seconds=1.5, timeout=10)
+    assert played
+    assert played.rebuffer_count == 2
+    assert played.rebuffer_seconds > 0
+
+
+def test_player_without_video_is_best_effort_success(streamer, stand_in_site):
+    streamer.driver.get(stand_in_site.url("/channel/no_video"))
+    played = streamer.wait_for_video_playback(seconds=5.0, timeout=10)
+    assert played and not played.video_found
+    assert played.reason == "no_video_player"
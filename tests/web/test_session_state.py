@@ -0,0 +1,130 @@
+"""
+Saved browser state (cookies + storage) restored into fresh browsers so consent is skipped on warm runs.
+tests/web/test_session_state.py
+"""
+import json
+
+from pages.twitch_home_page import TwitchHomePage
+from utils.session_state import SessionState, SessionStateCache
+
+URL = "https://www.twitch.tv"
+
+
+class StateBrowser:
+    """bare WebDriver surface used by SessionStateCache"""
+
+    def __init__(self, cookies=(), storage=None, cdp_fails=False):
+        self.cookies = list(cookies)
+        self.storage = storage or {"local": {}, "session": {}}
+        self.cdp = []
+        self.cdp_fails = cdp_fails
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def execute(self, driver_command, params=None):  # wrapped by the step timer of page objects
+        return None
+
+    def execute_script(self, script, *args):
+        return self.storage
+
+    def execute_cdp_cmd(self, cmd, params):
+        if self.cdp_fails:
+            raise RuntimeError("cdp unavailable")
+        self.cdp.append((cmd, params))
+        return {"identifier": "7"} if cmd == "Page.addScriptToEvaluateOnNewDocument" else {}
+
+
+COOKIE = {"name": "consent", "value": "1", "domain": ".twitch.tv", "path": "/", "secure": True,
+          "httpOnly": False, "expiry": 2000000000, "sameSite": "Lax"}
+
+
+def test_save_then_restore_before_navigation(tmp_path):
+    cache = SessionStateCache(tmp_path)
+    cache.save(StateBrowser([COOKIE], {"local": {"consent_choice": "accepted"},
+                                       "session": {"tab": "1", "__qaStateSeeded": "1"}}), URL + "/directory")
+    saved = json.loads(cache.path_for(URL).read_text(encoding="utf-8"))
+    assert saved["origin"] == URL and saved["session_storage"] == {"tab": "1"}
+
+    fresh = StateBrowser()
+    state = cache.restore(fresh, URL)
+    assert state.local_storage == {"consent_choice": "accepted"}
+    (cmd, params), (seed_cmd, seed) = fresh.cdp
+    assert cmd == "Network.setCookies"
+    assert params["cookies"][0] == {"name": "consent", "value": "1", "path": "/", "secure": True,
+                                    "httpOnly": False, "domain": ".twitch.tv", "expires": 2000000000,
+                                    "sameSite": "Lax"}
+    assert seed_cmd == "Page.addScriptToEvaluateOnNewDocument" and '"consent_choice": "accepted"' in seed["source"]
+    assert fresh._qa_state_script == "7"
+
+    SessionStateCache.forget(fresh)
+    assert fresh.cdp[-1] == ("Page.removeScriptToEvaluateOnNewDocument", {"identifier": "7"})
+    assert cache.stats.saved == 1 and cache.stats.restored == 1
+
+
+def test_expired_or_broken_state_is_dropped(tmp_path):
+    cache = SessionStateCache(tmp_path, ttl=60)
+    path = cache.path_for(URL)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"origin": URL, "cookies": [COOKIE], "saved_at": 1000.0}), encoding="utf-8")
+    assert cache.load(URL, now=1030.0) is not None
+    assert cache.load(URL, now=1100.0) is None
+    assert not path.exists() and cache.stats.expired == 1
+
+    cache.save(StateBrowser([COOKIE]), URL)
+    assert cache.restore(StateBrowser(cdp_fails=True), URL) is None
+    assert not path.exists() and cache.stats.invalidated == 2
+
+
+def test_verify_invalidates_when_cookies_did_not_stick(tmp_path):
+    cache = SessionStateCache(tmp_path)
+    cache.save(StateBrowser([COOKIE]), URL)
+    state = SessionState(origin=URL, cookies=[COOKIE])
+    assert cache.verify(StateBrowser([COOKIE]), state, URL) is True
+    assert cache.verify(StateBrowser([]), state, URL) is False
+    assert not cache.path_for(URL).exists()
+
+
+def test_verify_compares_cookie_values_and_expiry(tmp_path):
+    cache = SessionStateCache(tmp_path)
+    state = SessionState(origin=URL, cookies=[COOKIE])
+    assert cache.verify(StateBrowser([{**COOKIE, "value": "0"}]), state, URL) is False
+    assert cache.verify(StateBrowser([COOKIE]), state, URL, now=COOKIE["expiry"] + 1) is False
+    assert cache.verify(StateBrowser([{**COOKIE, "expiry": 2100000000}]), state, URL) is True
+
+
+def test_restored_state_still_writes_cookies_json(tmp_path, monkeypatch):
+    """the warm-run short cut keeps the reports/cookies.json audit file"""
+    monkeypatch.setattr("pages.twitch_home_page.REPORTS_DIR", tmp_path)
+    home = TwitchHomePage(StateBrowser([COOKIE]), base_url=URL, session_state=SessionStateCache(tmp_path))
+    home.restored_state = SessionState(origin=URL, cookies=[COOKIE])
+    assert home.handle_cookies()
+    assert home.consent_report["strategy"] == "restored_state"
+    assert json.loads((tmp_path / "cookies.json").read_text(encoding="utf-8")) == [COOKIE]
+
+
+def test_warm_browser_skips_consent(headless_chrome, stand_in_site, tmp_path):
+    """second browser gets cookie + localStorage before loading, so handle_cookies is a no-op"""
+    cache = SessionStateCache(tmp_path)
+    cold_driver = headless_chrome()
+    try:
+        cold = TwitchHomePage(cold_driver, base_url=stand_in_site.base_url, session_state=cache)
+        cold.go_to_twitch()
+        cold.handle_cookies()
+        assert cold.consent_report["strategy"] == "batched_scan"
+    finally:
+        cold_driver.quit()
+    assert cache.stats.saved == 1
+
+    warm_driver = headless_chrome()
+    try:
+        warm = TwitchHomePage(warm_driver, base_url=stand_in_site.base_url, session_state=cache)
+        warm.go_to_twitch()
+        assert warm_driver.execute_script("return document.getElementById('cookie-banner') === null")
+        assert warm_driver.execute_script("return localStorage.getItem('consent_choice')") == "accepted"
+        assert warm.handle_cookies() is True
+        assert warm.consent_report["strategy"] == "restored_state"
+        assert warm.state_verified and cache.stats.restored == 1
+    finally:
+        warm_driver.quit()
+
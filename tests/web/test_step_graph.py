@@ -0,0 +1,109 @@
+"""
+Step-graph runner: only the failed step is retried, prerequisites are rebuilt instead of cascading.
+tests/web/test_step_graph.py
+"""
+import pytest
+
+from pages.twitch_home_page import TwitchHomePage
+from pages.twitch_streamer_page import TwitchStreamerPage
+from utils.step_graph import RetryLedger, Step, StepGraph, twitch_step_graph
+
+
+class Flaky:
+    """callable failing its first `failures` calls"""
+
+    def __init__(self, failures=0, value=True):
+        self.failures = failures
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError(f"flake {self.calls}")
+        return self.value
+
+
+def graph(steps):
+    sleeps = []
+    g = StepGraph(steps, ledger=RetryLedger(), sleep=sleeps.append)
+    return g, sleeps
+
+
+def test_failed_step_alone_is_retried_with_backoff():
+    open_, search, click = Flaky(), Flaky(), Flaky(failures=2)
+    g, sleeps = graph([Step("open", open_), Step("search", search, requires=("open",)),
+                       Step("click", click, requires=("search",))])
+    assert g.run("open") and g.run("search")
+
+    outcome = g.run("click")
+    assert outcome and outcome.attempts == 3
+    assert sleeps == [0.5, 1.0]
+    assert (open_.calls, search.calls, click.calls) == (1, 1, 3)
+    row = g.ledger.rows()["click"]
+    assert row["recovered"] == 1 and row["retries"] == 2 and row["retry_seconds"] >= 0
+    assert g.ledger.report_lines()[0].startswith("click: runs=1 first_try=0 recovered=1 failed=0 retries=2")
+
+
+def test_retry_rebuilds_lost_prerequisite_the_cheap_way():
+    """a failed click left the browser off the results page: rebuild search via the direct URL"""
+    state = {"on_results": True}
+    typed, direct = Flaky(), Flaky()
+
+    def click():
+        state["on_results"] = False  # navigated somewhere useless
+        return click.calls_left.pop(0)
+    click.calls_left = [False, True]
+
+    def rebuild():
+        direct()
+        state["on_results"] = True
+        return True
+
+    g, _ = graph([Step("search", typed, check=lambda: state["on_results"], rebuild=rebuild),
+                  Step("click", click, requires=("search",))])
+    g.run("search")
+    outcome = g.run("click")
+    assert outcome and outcome.rebuilt == ("search",)
+    assert typed.calls == 1 and direct.calls == 1
+    assert g.ledger.rows()["search"]["rebuilt"] == 1
+
+
+def test_later_step_recovers_after_prerequisite_failed():
+    """click failed for good in its own test; the next step re-runs it instead of failing in cascade"""
+    click = Flaky(failures=2)
+    load = Flaky()
+    g, _ = graph([Step("search", Flaky()), Step("click", click, requires=("search",), retries=1),
+                  Step("load", load, requires=("click",))])
+    g.run("search")
+    assert not g.run("click")
+    outcome = g.run("load")
+    assert outcome and outcome.attempts == 1 and outcome.rebuilt == ("click",)
+    assert click.calls == 3
+    assert g.ledger.rows()["click"]["failed"] == 1
+
+
+def test_unrecoverable_prerequisite_fails_with_reason():
+    g, _ = graph([Step("search", Flaky(failures=99), retries=0), Step("click", Flaky(), requires=("search",),
+                                                                       retries=1)])
+    outcome = g.run("click")
+    assert not outcome and "prerequisite 'search'" in outcome.error and outcome.attempts == 2
+
+
+def test_steps_must_be_declared_in_order():
+    with pytest.raises(ValueError, match="undeclared"):
+        StepGraph([Step("click", Flaky(), requires=("search",))])
+
+
+def test_twitch_flow_rebuilds_search_to_reach_stream(headless_chrome, stand_in_site):
+    """jump to the streamer page without running the earlier steps: search is rebuilt by URL"""
+    driver = headless_chrome()
+    try:
+        home = TwitchHomePage(driver, base_url=stand_in_site.base_url)
+        flow = twitch_step_graph(home, TwitchStreamerPage(driver), "sc2")
+        flow.ledger = RetryLedger()
+        outcome = flow.run("click_first_streamer")
+        assert outcome, outcome.error
+        assert "search_for_game" in outcome.rebuilt and "/channel/" in driver.current_url
+    finally:
+        driver.quit()
@@ -0,0 +1,95 @@
+"""
+Step timing: page-object methods and the WebDriver commands they issue, with cross-run quantiles.
+tests/web/test_step_timing.py
+"""
+import json
+
+from conftest import STEP_TIMINGS as SESSION_TIMINGS
+from utils import step_timing
+from utils.step_timing import StepTimer, percentile, timed_steps
+
+
+class FakeDriver:
+    """records commands the way RemoteWebDriver.execute receives them"""
+
+    def __init__(self):
+        self.commands = []
+
+    def execute(self, driver_command, params=None):
+        self.commands.append(driver_command)
+        return {"value": None}
+
+
+@timed_steps
+class FakePage:
+    LOCATOR = ("css selector", "a")
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def open(self):
+        self.driver.execute("get", {"url": "about:blank"})
+        self.click()
+
+    def click(self):
+        self.driver.execute("findElement", {})
+        self.driver.execute("clickElement", {})
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) == 0.0
+
+
+def test_page_methods_and_commands_are_timed(monkeypatch):
+    """every public method is a step; commands are attributed to the innermost step"""
+    timer = StepTimer()
+    monkeypatch.setattr(step_timing, "TIMINGS", timer)
+    driver = FakeDriver()
+    FakePage(driver).open()
+
+    steps = timer.samples("step")
+    assert [s.name for s in steps] == ["click", "open"]
+    assert steps[0].step == "open"
+    commands = [(s.name, s.step) for s in timer.samples("command")]
+    assert commands == [("get", "open"), ("findElement", "click"), ("clickElement", "click")]
+    assert driver.commands == ["get", "findElement", "clickElement"]
+
+    # instrumenting twice does not double-count
+    timer.instrument(driver)
+    FakePage(driver).click()
+    assert len(timer.samples("command")) == 5
+    assert timer.breakdown(since=4)["commands"]["findElement"]["count"] == 1
+
+
+def test_export_merges_history_and_writes_prometheus(tmp_path):
+    history, prom = tmp_path / "timings.json", tmp_path / "timings.prom"
+    first = StepTimer(history_limit=3)
+    for seconds in (0.1, 0.2):
+        first.record("step", "search_for_game", seconds)
+    first.export(history, prom)
+
+    second = StepTimer(history_limit=3)
+    second.record("step", "search_for_game", 0.3)
+    second.record("step", "search_for_game", 0.4)
+    summary = second.export(history, prom)
+
+    row = summary["step"]["search_for_game"]
+    assert row["count"] == 3  # capped to history_limit, oldest dropped
+    assert json.loads(history.read_text(encoding="utf-8"))["step"]["search_for_game"] == [0.2, 0.3, 0.4]
+    assert row["p50"] == 0.3 and row["p99"] == 0.4
+    text = prom.read_text(encoding="utf-8")
+    assert "# TYPE qa_ui_step_duration_seconds summary" in text
+    assert 'qa_ui_step_duration_seconds{step="search_for_game",quantile="0.95"} 0.400000' in text
+    assert 'qa_ui_step_duration_seconds_count{step="search_for_game"} 3' in text
+
+
+def test_offline_tests_do_not_feed_the_session_history():
+    """fake-driver page steps land in a per-test timer; the exported session timer stays untouched"""
+    before = len(SESSION_TIMINGS)
+    FakePage(FakeDriver()).open()
+    assert step_timing.TIMINGS is not SESSION_TIMINGS
+    assert len(step_timing.TIMINGS.samples("step")) == 2 and len(SESSION_TIMINGS) == before
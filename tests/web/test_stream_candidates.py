@@ -0,0 +1,50 @@
+"""
+Single-script stream-card discovery against the local static stand-in of the Twitch pages.
+tests/web/test_stream_candidates.py
+"""
+import time
+
+import pytest
+
+from pages.twitch_home_page import TwitchHomePage
+
+
+@pytest.fixture
+def home(headless_chrome, stand_in_site):
+    """home page object on a fresh headless browser"""
+    d = headless_chrome()
+    yield TwitchHomePage(d, base_url=stand_in_site.base_url)
+    d.quit()
+
+
+def test_candidates_are_visible_ranked_and_described(home, stand_in_site):
+    """one call returns visible cards only, with href and bounding box"""
+    home.driver.get(stand_in_site.url("/search?term=sc2&delay=0"))
+    home.waits.until("render", "return document.querySelectorAll('.card').length === 6;", timeout=5)
+    found = home.find_stream_candidates()
+    hrefs = [c["href"] for c in found]
+    assert hrefs[0].endswith("/channel/alpha")
+    assert not any(h.endswith("/channel/hidden") for h in hrefs)
+    assert len(set(hrefs)) == len(hrefs) == 6
+    assert all(c["rect"]["width"] > 0 and c["rect"]["height"] > 0 for c in found)
+    assert home.last_candidates[0]["selector_index"] == 0
+    assert "element" not in home.last_candidates[0]
+
+
+def test_wait_resolves_as_soon_as_a_card_appears(home, stand_in_site):
+    """the observer-backed wait returns right after the delayed render, not at timeout"""
+    home.driver.get(stand_in_site.url("/search?term=sc2&delay=700"))
+    assert home.find_stream_candidates() == []
+    started = time.perf_counter()
+    found = home.wait_for_stream_candidate(timeout=10)
+    elapsed = time.perf_counter() - started
+    assert found and found[0]["href"].endswith("/channel/alpha")
+    assert elapsed < 3.0
+
+
+@pytest.mark.command_budget(click_first_streamer=10)
+def test_click_first_streamer_navigates(home, stand_in_site):
+    """the top-ranked card is clicked"""
+    home.driver.get(stand_in_site.url("/search?term=sc2&delay=200"))
+    assert home.click_first_streamer() is True
+    assert home.driver.current_url.endswith("/channel/alpha")
@@ -5,10 +5,11 @@ import json
 from logging import exception
 from pathlib import Path
 import allure
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import pytest
 from pages.twitch_home_page import TwitchHomePage
 from pages.twitch_streamer_page import TwitchStreamerPage
+from utils.artifacts import ARTIFACTS
+from utils.step_graph import twitch_step_graph
 
 
 ROOT = Path.cwd()
@@ -22,53 +23,37 @@ for d in (REPORTS_DIR, SCREENSHOTS_DIR, DEBUG_DIR):
 @allure.feature("Twitch Web — Step-by-step E2E")
 class TestTwitchStepByStep:
     """
-    Each test is one step. Browser session is shared for the whole class (setup_class),
+    Each test is one step. Browser session is shared for the whole class (browser_session),
     so state (opened page, search results, navigation) is preserved.
+    Steps run through a step graph (utils.step_graph): a failed step is retried alone, and a step
+    whose prerequisite failed rebuilds it first (e.g. direct search URL) instead of failing in cascade.
     """
 
-    @classmethod
-    def setup_class(cls):
+    @pytest.fixture(scope="class", autouse=True)
+    def browser_session(self, request, driver_pool, session_state):
         """
-        create Chrome with mobile emulation (iPhone X)
-        Selenium Manager will select proper chromedriver
+        lease one pre-warmed Chrome (iPhone X emulation) from driver_pool for the whole class,
+        give it back (reset) after the last step; consent state saved by an earlier run is restored
         """
-        chrome_options = Options()
-        try:
-            chrome_options.add_experimental_option("mobileEmulation", {"deviceName": "iPhone X"})
-        except Exception as e:
-            pass
-        chrome_options.add_argument("--disable-notifications")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
-
-        cls.driver = webdriver.Chrome(options=chrome_options)
-        try:
-            cls.driver.set_window_size(375, 812)
-        except Exception as e:
-            pass
+        cls = request.cls
+        cls.driver = driver_pool.acquire()
         cls.driver.implicitly_wait(2)
 
-        cls.home = TwitchHomePage(cls.driver)
+        cls.home = TwitchHomePage(cls.driver, session_state=session_state)
         cls.streamer = TwitchStreamerPage(cls.driver)
         cls.last_screenshot = None
+        cls.flow = twitch_step_graph(cls.home, cls.streamer, "StarCraft II")
 
-    @classmethod
-    def teardown_class(cls):
-        """
-        teardown method after each test
-        """
-        try:
-            cls.driver.quit()
-        except Exception as e:
-            pass
+        yield
+
+        driver_pool.release(cls.driver)
 
 
     @allure.title("Step 1 — Open Twitch homepage")
     def test_01_open_homepage(self):
         """Open Twitch homepage"""
         with allure.step("Open https://www.twitch.tv"):
-            self.home.go_to_twitch()
+            self.flow.run("go_to_twitch")
             assert self.driver.current_url.startswith("http"), "Twitch not opened properly"
 
 
@@ -76,7 +61,9 @@ class TestTwitchStepByStep:
     def test_02_close_cookies(self):
         """save cookies for debugging/verification and do not fail if cookies not present"""
         with allure.step("Attempt to accept cookies and save cookies.json"):
-            self.home.handle_cookies()
+            self.flow.run("handle_cookies")
+            allure.attach(json.dumps(getattr(self.home, "consent_report", {}), indent=2),
+                          name="consent_report", attachment_type=allure.attachment_type.JSON)
             try:
                 cookies = self.driver.get_cookies()
                 path = REPORTS_DIR / "cookies.json"
@@ -95,7 +82,7 @@ class TestTwitchStepByStep:
         and method may fallback to direct URL, treat as success"""
         with allure.step("Reveal search input by clicking search icon"):
 
-            ok = self.home.search_for_game("")
+            ok = self.flow.run("open_search").value
             assert ok is True or ok is None
 
 
@@ -103,35 +90,31 @@ class TestTwitchStepByStep:
     def test_04_enter_search_query(self):
         """Search and submit for 'StarCraft II'"""
         with allure.step("Enter 'StarCraft II' and submit search"):
-            ok = self.home.search_for_game("StarCraft II")
-            assert ok, "Search action failed"
+            ok = self.flow.run("search_for_game")
+            assert ok, ok.error or "Search action failed"
 
 
     @allure.title("Step 5 — Scroll down exactly 2 times")
     def test_05_scroll_two_times(self):
         """Scroll down 2 times"""
         with allure.step("Scroll down 2 times to load results"):
-            self.home.scroll_fixed(times=2, pause=1.0)
+            self.flow.run("scroll_fixed")
             assert True
 
 
     @allure.title("Step 6 — Click first streamer from results")
+    @pytest.mark.command_budget(click_first_streamer=10)
     def test_06_click_first_streamer(self):
         """Select one streamer from results and save debug"""
         with allure.step("Select first visible streamer in results"):
-            clicked = self.home.click_first_streamer(wait_for_navigation=True)
+            clicked = self.flow.run("click_first_streamer")
             if not clicked:
-                ts = int(time.time())
-                png = DEBUG_DIR / f"click_failed_{ts}.png"
-                html = DEBUG_DIR / f"click_failed_{ts}.html"
                 try:
-                    self.driver.save_screenshot(str(png))
-                    html.write_text(self.driver.page_source,\
-                    encoding="utf-8")
-                    allure.attach.file(str(png), name="click_failed_screenshot",
-                    attachment_type=allure.attachment_type.PNG)
-                    allure.attach(html.read_text(encoding="utf-8"), name="click_failed_html",
-                    attachment_type=allure.attachment_type.TEXT)
+                    # capture in the browser, store + attach on the artifact writer
+                    ARTIFACTS.submit_blob(self.driver.get_screenshot_as_png(), "png", step="click_failed",
+                    attach_name="click_failed_screenshot", attachment_type=allure.attachment_type.PNG)
+                    ARTIFACTS.submit_blob(self.driver.page_source, "html", step="click_failed",
+                    attach_name="click_failed_html", attachment_type=allure.attachment_type.TEXT)
                 except Exception as e:
                     pass
             assert clicked, "Could not click a streamer"
@@ -141,16 +124,19 @@ class TestTwitchStepByStep:
     def test_07_wait_streamer_page(self):
         """Wait until streamer page loads"""
         with allure.step("Wait for streamer page to be ready"):
-            ok = self.streamer.wait_for_full_load(timeout=20)
-            assert ok, "Streamer page did not load"
+            ok = self.flow.run("wait_for_full_load")
+            assert ok, ok.error or "Streamer page did not load"
 
 
     @allure.title("Step 8 — Play video for 5 seconds")
     def test_08_play_video_5s(self):
         """Video playback for 5 seconds"""
         with allure.step("Ensure video starts playing and play for ~5 seconds"):
-            played = self.streamer.wait_for_video_playback(seconds=5.0, timeout=60)
-            assert played, "Video did not progress as expected"
+            outcome = self.flow.run("wait_for_video_playback")
+            played = outcome.value
+            if played is not None:
+                allure.attach(json.dumps(played.to_dict(), indent=2), "playback_metrics", allure.attachment_type.JSON)
+            assert outcome, f"Video did not progress as expected: {played.reason if played is not None else outcome.error}"
 
 
     @allure.title("Step 9 — Take screenshot after playback")
@@ -160,6 +146,7 @@ class TestTwitchStepByStep:
             path = self.streamer.take_screenshot_after_playback(filename_prefix="streamer_e2e",
                                                                 playback_seconds=0.0, timeout=10)
             assert path, "Screenshot not created"
+            ARTIFACTS.wait_for(path)
             p = Path(path)
             assert p.exists(), f"Screenshot not found: {path}"
             allure.attach.file(str(p), name="streamer_final_screenshot",
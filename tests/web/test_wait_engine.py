@@ -0,0 +1,101 @@
+"""
+Event-driven page-object waits against the local static stand-in of the Twitch pages.
+tests/web/test_wait_engine.py
+"""
+import time
+
+import pytest
+from selenium.common.exceptions import JavascriptException, TimeoutException
+
+from pages.twitch_home_page import TwitchHomePage
+from pages.wait_engine import WaitEngine, WaitLedger
+
+
+def test_ledger_reports_time_saved():
+    """saved = fixed sleep - actual wait, per step and in total"""
+    ledger = WaitLedger()
+    ledger.record("search_for_game", 1.0, 0.2)
+    ledger.record("search_for_game", 1.0, 0.3)
+    ledger.record("go_to_twitch", 0.5, 0.5)
+    rows = ledger.rows()
+    assert rows["search_for_game"]["calls"] == 2
+    assert ledger.total_saved() == pytest.approx(1.5)
+    assert ledger.report_lines()[-1] == "total saved vs fixed sleeps: 1.50s"
+
+
+@pytest.fixture
+def browser(headless_chrome):
+    """one headless browser per test"""
+    d = headless_chrome()
+    yield d
+    d.quit()
+
+
+def test_settle_returns_before_fixed_sleep(browser, stand_in_site):
+    """a static page settles well before the 1s sleep it replaces"""
+    browser.get(stand_in_site.url("/"))
+    engine = WaitEngine(browser, ledger=WaitLedger())
+    started = time.perf_counter()
+    assert engine.settle("static", legacy=1.0) is True
+    assert time.perf_counter() - started < 0.9
+    assert engine.ledger.total_saved() > 0.1
+
+
+def test_until_resolves_when_results_render(browser, stand_in_site):
+    """waiting for late-rendered cards ends as soon as they exist"""
+    browser.get(stand_in_site.url("/search?term=x&delay=400"))
+    engine = WaitEngine(browser, ledger=WaitLedger())
+    started = time.perf_counter()
+    ok = engine.until("cards", "return document.querySelectorAll('.card a').length > 0;", timeout=5)
+    assert ok
+    assert time.perf_counter() - started < 2.0
+
+
+def test_home_page_steps_use_event_waits(browser, stand_in_site):
+    """page-object steps record their waits in the shared engine ledger"""
+    home = TwitchHomePage(browser, base_url=stand_in_site.base_url)
+    home.waits.ledger = WaitLedger()
+    home.go_to_twitch()
+    home.handle_cookies()
+    home.scroll_fixed(times=2, pause=1.0)
+    rows = home.waits.ledger.rows()
+    assert {"go_to_twitch", "scroll_fixed"} <= set(rows)
+    assert rows["scroll_fixed"]["actual"] < rows["scroll_fixed"]["legacy"]
+
+
+class _ScriptedDriver:
+    """execute_async_script answers from a script of results / exceptions; the page is always parsed"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def execute_async_script(self, script, *args):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def execute_script(self, script, *args):
+        return "complete"
+
+
+UNLOADED = JavascriptException("javascript error: document unloaded while waiting for result")
+
+
+def test_until_errors_are_not_success():
+    """a predicate that throws / a script timeout is 'not met'; only settle treats navigation as done"""
+    engine = WaitEngine(_ScriptedDriver(JavascriptException("SyntaxError: Unexpected token")), ledger=WaitLedger())
+    assert engine.until("bad_js", "return (;", timeout=1) is False
+    engine = WaitEngine(_ScriptedDriver(TimeoutException("script timeout")), ledger=WaitLedger())
+    assert engine.until("slow", "return false;", timeout=1) is False
+
+    # navigation mid-wait: the predicate is evaluated again on the new document
+    engine = WaitEngine(_ScriptedDriver(UNLOADED, {"ok": False}), ledger=WaitLedger())
+    assert engine.until("nav", "return false;", timeout=1) is False
+    engine = WaitEngine(_ScriptedDriver(UNLOADED, {"ok": True}), ledger=WaitLedger())
+    assert engine.until("nav", "return true;", timeout=1) is True
+    engine = WaitEngine(_ScriptedDriver(UNLOADED), ledger=WaitLedger())
+    assert engine.settle("nav", legacy=1.0) is True
@@ -0,0 +1,68 @@
+# utils/api_cases.py
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Optional
+
+from utils.schemas import SCHEMAS
+
+DOG_IMAGE_COUNTS = [1, 3]
+AGIFY_NAMES = ["michael", "olga", "juan"]
+POKEMON_NAMES = ["pikachu", "charizard", "bulbasaur"]
+
+
+@dataclass(frozen=True)
+class ApiCase:
+    """One request + the invariants its body must hold; shared by the API tests and the load mode."""
+    name: str
+    method: str
+    url: str
+    check: Optional[Callable] = None  # check(json_body), raises AssertionError
+    kwargs: dict = field(default_factory=dict)
+    status: tuple = (200,)
+
+    @property
+    def call(self) -> tuple:
+        """(method, url, kwargs) as taken by AsyncClientWrapper.gather"""
+        return self.method, self.url, self.kwargs
+
+
+def check_dog_breeds(j):
+    """Dog CEO breeds/list/all body invariants (schema: success status, non-empty breed map)"""
+    SCHEMAS.validate(j, "dog_breeds")
+
+
+def check_dog_random_images(j, count):
+    """Dog CEO breeds/image/random/{count} body invariants"""
+    SCHEMAS.validate(j, "dog_random_images")
+    if isinstance(j["message"], list):
+        assert len(j["message"]) == count
+
+
+def check_agify(j, name):
+    """Agify body invariants"""
+    SCHEMAS.validate(j, "agify")
+    assert j["name"] == name
+
+
+def check_pokemon(j, pokemon):
+    """PokeAPI pokemon/{name} body invariants — only the name/types subtree of the large document"""
+    SCHEMAS.validate(j, "pokemon", fast=True)
+    assert j["name"] == pokemon
+
+
+def api_cases() -> list:
+    """GET cases of tests/api/test_public_apis.py as request + body checks (gathered batch test, load mode)"""
+    cases = [ApiCase("dog_breeds", "get", "https://dog.ceo/api/breeds/list/all", check_dog_breeds)]
+    for count in DOG_IMAGE_COUNTS:
+        cases.append(ApiCase(f"dog_random_images[{count}]", "get", f"https://dog.ceo/api/breeds/image/random/{count}",
+                             partial(check_dog_random_images, count=count)))
+    for name in AGIFY_NAMES:
+        cases.append(ApiCase(f"agify[{name}]", "get", "https://api.agify.io", partial(check_agify, name=name),
+                             kwargs={"params": {"name": name}}))
+    for pokemon in POKEMON_NAMES:
+        cases.append(ApiCase(f"pokemon[{pokemon}]", "get", f"https://pokeapi.co/api/v2/pokemon/{pokemon}",
+                             partial(check_pokemon, pokemon=pokemon)))
+    return cases
+
+
+API_CASES = api_cases()
@@ -0,0 +1,188 @@
+# utils/artifact_store.py
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip is used when zstandard is not installed
+    zstandard = None
+
+ARTIFACTS_DIR = Path("reports") / "artifacts"
+
+# already-compressed formats are stored as-is
+_COMPRESSIBLE = {"html", "txt", "json", "xml", "log", "svg"}
+
+
+@dataclass
+class IndexEntry:
+    digest: str
+    blob: str
+    kind: str
+    size: int
+    stored_size: int
+    test: Optional[str]
+    step: Optional[str]
+    ts: float
+
+
+def _current_test() -> Optional[str]:
+    """nodeid of the running pytest test (PYTEST_CURRENT_TEST is 'nodeid (phase)')"""
+    current = os.environ.get("PYTEST_CURRENT_TEST")
+    return current.rsplit(" ", 1)[0] if current else None
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for screenshots / HTML dumps.
+    Each blob is stored once under blobs/<aa>/<sha256>.<kind>[.gz|.zst] (text kinds compressed);
+    index.jsonl maps test/step/timestamp to the blob. evict() applies the size/age policy.
+    """
+
+    def __init__(self, root: Path = ARTIFACTS_DIR, compression: Optional[str] = "auto",
+                 max_bytes: Optional[int] = None, max_age: Optional[float] = None):
+        self.root = Path(root)
+        if compression == "auto":
+            compression = "zstd" if zstandard is not None else "gzip"
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression needs the 'zstandard' package")
+        if compression not in (None, "gzip", "zstd"):
+            raise ValueError(f"unknown compression {compression!r}")
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.dedup_hits = 0
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / "index.jsonl"
+
+    # addressing
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _suffix(self, kind: str) -> str:
+        if kind in _COMPRESSIBLE and self.compression:
+            return f".{kind}" + (".zst" if self.compression == "zstd" else ".gz")
+        return f".{kind}"
+
+    def blob_path(self, digest: str, kind: str) -> Path:
+        return self.root / "blobs" / digest[:2] / f"{digest}{self._suffix(kind)}"
+
+    # write / read
+    def put(self, data, kind: str, step: Optional[str] = None, test: Optional[str] = None,
+            ts: Optional[float] = None, digest: Optional[str] = None) -> IndexEntry:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = digest or self.digest(data)
+        path = self.blob_path(digest, kind)
+        stored_size = path.stat().st_size if path.exists() else None
+        deduped = stored_size is not None
+        if not deduped:
+            payload = self._compress(data, path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(payload)
+            tmp.replace(path)
+            stored_size = len(payload)
+        entry = IndexEntry(digest=digest, blob=str(path.relative_to(self.root)), kind=kind, size=len(data),
+                           stored_size=stored_size, test=test if test is not None else _current_test(),
+                           step=step, ts=ts if ts is not None else time.time())
+        with self._lock:
+            self.dedup_hits += deduped
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(entry)) + "\n")
+        return entry
+
+    def _compress(self, data: bytes, path: Path) -> bytes:
+        if path.suffix == ".gz":
+            return gzip.compress(data, compresslevel=6)
+        if path.suffix == ".zst":
+            return zstandard.ZstdCompressor(level=6).compress(data)
+        return data
+
+    def read(self, entry_or_blob) -> bytes:
+        blob = entry_or_blob.blob if isinstance(entry_or_blob, IndexEntry) else str(entry_or_blob)
+        path = self.root / blob
+        raw = path.read_bytes()
+        if path.suffix == ".gz":
+            return gzip.decompress(raw)
+        if path.suffix == ".zst":
+            return zstandard.ZstdDecompressor().decompress(raw)
+        return raw
+
+    def entries(self, test: Optional[str] = None, step: Optional[str] = None) -> list:
+        if not self.index_path.exists():
+            return []
+        out = []
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                e = IndexEntry(**json.loads(line))
+                if (test is None or e.test == test) and (step is None or e.step == step):
+                    out.append(e)
+        return out
+
+    # eviction
+    def evict(self, now: Optional[float] = None) -> dict:
+        """Drop index entries older than max_age, then oldest entries until blobs fit in max_bytes."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            entries = sorted(self.entries(), key=lambda e: e.ts)
+            before = len(entries)
+            if self.max_age is not None:
+                entries = [e for e in entries if now - e.ts <= self.max_age]
+            if self.max_bytes is not None:
+                entries = self._fit(entries, self.max_bytes)
+            keep = {e.blob for e in entries}
+            removed_bytes = 0
+            blobs_dir = self.root / "blobs"
+            for path in blobs_dir.glob("*/*") if blobs_dir.exists() else []:
+                if str(path.relative_to(self.root)) not in keep:
+                    removed_bytes += path.stat().st_size
+                    path.unlink()
+            tmp = self.index_path.with_suffix(".jsonl.tmp")
+            tmp.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text("".join(json.dumps(asdict(e)) + "\n" for e in entries), encoding="utf-8")
+            tmp.replace(self.index_path)
+        return {"entries_removed": before - len(entries), "bytes_removed": removed_bytes}
+
+    @staticmethod
+    def _fit(entries, max_bytes: int) -> list:
+        """Oldest-first pops until the blobs still referenced fit `max_bytes`; one pass over `entries`."""
+        queue = OrderedDict(enumerate(entries))
+        refs = Counter(e.blob for e in entries)
+        total = ArtifactStore._blob_bytes(entries)
+        while queue and total > max_bytes:
+            _, oldest = queue.popitem(last=False)
+            refs[oldest.blob] -= 1
+            if not refs[oldest.blob]:
+                total -= oldest.stored_size
+        return list(queue.values())
+
+    @staticmethod
+    def _blob_bytes(entries) -> int:
+        return sum({e.blob: e.stored_size for e in entries}.values())
+
+    def report_lines(self) -> list:
+        entries = self.entries()
+        return [
+            f"artifact store {self.root}: entries={len(entries)} unique_blobs={len({e.blob for e in entries})} "
+            f"stored_bytes={self._blob_bytes(entries)} logical_bytes={sum(e.size for e in entries)} "
+            f"dedup_hits={self.dedup_hits} compression={self.compression or 'none'}"
+        ]
+
+
+# process-wide store under reports/artifacts (eviction limits are set from pytest options)
+STORE = ArtifactStore()
@@ -0,0 +1,230 @@
+# utils/artifacts.py
+import itertools
+import os
+import queue
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from utils.artifact_store import STORE, ArtifactStore, _current_test
+
+try:
+    import allure
+    from allure_commons import hookimpl as _allure_hookimpl, plugin_manager as _allure_plugins
+except ImportError:  # allure is optional for this module
+    allure = None
+
+
+@dataclass
+class WriterStats:
+    submitted: int = 0
+    written: int = 0
+    bytes_written: int = 0  # disk / store writes
+    attachments: int = 0
+    attachment_bytes: int = 0  # Allure attachment bodies, counted apart from bytes_written
+    errors: int = 0
+    max_queue_depth: int = 0
+
+
+class _AttachmentSlots:
+    """
+    allure_commons plugin (report_attached_file hookspec): when allure.attach.file() is given the
+    placeholder, remembers the results-dir file name Allure registered for it, so a worker can write
+    the real body there later.
+    """
+
+    def __init__(self):
+        self.placeholder = Path(tempfile.gettempdir()) / f"qa-allure-pending-{os.getpid()}"
+        self._local = threading.local()
+
+    def register(self, name: str, attachment_type) -> Optional[str]:
+        """Attach the empty placeholder on this (test) thread; returns the file name Allure chose."""
+        if not self.placeholder.exists():
+            self.placeholder.touch()
+        self._local.file_name = None
+        allure.attach.file(str(self.placeholder), name=name, attachment_type=attachment_type)
+        return self._local.file_name
+
+    if allure is not None:
+        @_allure_hookimpl
+        def report_attached_file(self, source, file_name):
+            if str(source) == str(self.placeholder):
+                self._local.file_name = file_name
+
+
+_SLOTS = _AttachmentSlots() if allure is not None else None
+if _SLOTS is not None:
+    _allure_plugins.register(_SLOTS)
+
+
+class ArtifactWriter:
+    """
+    Background writer for screenshots, HTML dumps and other debug artifacts.
+    The test thread only captures bytes from the browser and calls submit(); disk writes are done
+    by worker threads from a bounded queue (a full queue blocks the submitter, which is the
+    back-pressure). An Allure attachment is registered on the submitting thread, so it lands on the
+    right test, with an empty placeholder body (public allure.attach.file); the worker then writes
+    the real body into `allure_dir` (--alluredir). Without `allure_dir` the body is attached inline.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 64, store: Optional[ArtifactStore] = None,
+                 allure_dir: Optional[Path] = None):
+        self.workers = max(1, int(workers))
+        self.store = store
+        self.allure_dir = Path(allure_dir) if allure_dir else None
+        self.stats = WriterStats()
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._lock = threading.Lock()
+        self._threads: list = []
+        self._pending: dict = {}  # path -> {submission token: done event}
+        self._submitted_paths: set = set()
+        self._tokens = itertools.count()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"artifact-writer-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _attach(self, data: bytes, attach_name: Optional[str], attachment_type) -> Optional[Path]:
+        """Register the attachment on this thread; the results-dir file the worker must fill, if any."""
+        if not attach_name or allure is None:
+            return None
+        try:
+            if self.allure_dir is None:
+                allure.attach(data, name=attach_name, attachment_type=attachment_type)
+                with self._lock:
+                    self.stats.attachments += 1
+                    self.stats.attachment_bytes += len(data)
+                return None
+            file_name = _SLOTS.register(attach_name, attachment_type)
+        except Exception:
+            return None
+        return self.allure_dir / file_name if file_name else None
+
+    def _enqueue(self, job, path: Optional[Path], attachment: Optional[Path] = None, data: bytes = b""):
+        token = next(self._tokens)
+        done = threading.Event()
+        if path is not None:
+            with self._lock:
+                self._submitted_paths.add(str(path))
+                self._pending.setdefault(str(path), {})[token] = done
+        self._ensure_started()
+        self._queue.put((job, path, token, done, attachment, data))
+        with self._lock:
+            self.stats.submitted += 1
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, self._queue.qsize())
+
+    def submit(self, data: Union[bytes, str], path: Optional[Path] = None,
+               attach_name: Optional[str] = None, attachment_type=None) -> Optional[Path]:
+        """Queue `data` for `path` and/or an Allure attachment. Returns the path it will be written to."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        path = Path(path) if path is not None else None
+
+        def job():
+            if path is None:
+                return 0
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")  # two submits may share `path`
+            tmp.write_bytes(data)
+            tmp.replace(path)
+            return len(data)
+
+        self._enqueue(job, path, self._attach(data, attach_name, attachment_type), data)
+        return path
+
+    def submit_blob(self, data: Union[bytes, str], kind: str, step: Optional[str] = None,
+                    test: Optional[str] = None, store: Optional[ArtifactStore] = None, attach_name: Optional[str] = None,
+                    attachment_type=None) -> Path:
+        """
+        Content-addressed submit(): the blob is hashed here (cheap) so its final path is known
+        immediately; the write and index append go through `store` on a worker thread.
+        """
+        store = store or self.store or STORE
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = store.digest(data)
+        path = store.blob_path(digest, kind)
+        test = test if test is not None else _current_test()
+        ts = time.time()
+
+        def job():
+            entry = store.put(data, kind, step=step, test=test, ts=ts, digest=digest)
+            return entry.stored_size
+
+        self._enqueue(job, path, self._attach(data, attach_name, attachment_type), data)
+        return path
+
+    def _work(self):
+        while True:
+            job, path, token, done, attachment, data = self._queue.get()
+            try:
+                written = job()
+                if attachment is not None:
+                    tmp = attachment.with_name(attachment.name + ".tmp")
+                    tmp.write_bytes(data)
+                    tmp.replace(attachment)
+                    with self._lock:
+                        self.stats.attachments += 1
+                        self.stats.attachment_bytes += len(data)
+                with self._lock:
+                    self.stats.written += 1
+                    self.stats.bytes_written += written
+            except Exception:
+                with self._lock:
+                    self.stats.errors += 1
+            finally:
+                if path is not None:
+                    with self._lock:
+                        pending = self._pending.get(str(path), {})
+                        pending.pop(token, None)
+                        if not pending:
+                            self._pending.pop(str(path), None)
+                done.set()
+                self._queue.task_done()
+
+    def wait_for(self, path, timeout: Optional[float] = 10) -> bool:
+        """
+        Block until every submission to `path` so far has been written (for callers that read it
+        back). False on timeout, for a path that was never submitted, or when the write failed.
+        """
+        key = str(Path(path))
+        with self._lock:
+            if key not in self._submitted_paths:
+                return False
+            events = list(self._pending.get(key, {}).values())
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for done in events:
+            if not done.wait(None if deadline is None else max(0.0, deadline - time.monotonic())):
+                return False
+        return Path(path).exists()
+
+    def flush(self):
+        """Block until every queued artifact is on disk (session end)."""
+        if self._threads:
+            self._queue.join()
+
+    def report_lines(self) -> list:
+        s = self.stats
+        return [
+            f"artifacts submitted={s.submitted} written={s.written} errors={s.errors} "
+            f"bytes_written={s.bytes_written} attachments={s.attachments} attachment_bytes={s.attachment_bytes} "
+            f"queue_depth={self.queue_depth} max_queue_depth={s.max_queue_depth}"
+        ]
+
+
+# process-wide writer shared by page objects, tests and conftest hooks
+ARTIFACTS = ArtifactWriter(store=STORE)
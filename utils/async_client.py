@@ -0,0 +1,89 @@
+# utils/async_client.py
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+import requests
+
+
+class AsyncClientWrapper:
+    """
+    asyncio flavour of conftest.ClientWrapper: same get/post/put/delete surface and
+    last_response tracking, but calls are awaitable and bounded by `max_in_flight`.
+    The blocking requests.Session calls run on a dedicated thread pool sized to the limit;
+    an optional HostScheduler applies per-host budgets inside those worker threads.
+    """
+
+    def __init__(self, session: requests.Session, timeout: int = 10, max_in_flight: int = 8, scheduler=None):
+        self.session = session
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.last_response = None
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="api-async")
+        self._limiters = weakref.WeakKeyDictionary()
+
+    def _limiter(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._limiters.get(loop)
+        if sem is None:
+            sem = asyncio.Semaphore(self.max_in_flight)
+            self._limiters[loop] = sem
+        return sem
+
+    async def _request(self, method, url, **kwargs):
+        """request method"""
+        kwargs.setdefault("timeout", self.timeout)
+        fn = getattr(self.session, method)
+        if self.scheduler is not None:
+            fn = self.scheduler.wrap(fn)
+        loop = asyncio.get_running_loop()
+        async with self._limiter():
+            r = await loop.run_in_executor(self._executor, lambda: fn(url, **kwargs))
+        self.last_response = r
+        return r
+
+    async def get(self, url, **kwargs):
+        """GET METHOD"""
+        return await self._request("get", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        """POST METHOD"""
+        return await self._request("post", url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        """PUT METHOD"""
+        return await self._request("put", url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        """DELETE METHOD"""
+        return await self._request("delete", url, **kwargs)
+
+    # batches
+    async def gather(self, calls: Iterable, limit: Optional[int] = None, return_exceptions: bool = False) -> list:
+        """
+        Fire a batch of (method, url) / (method, url, kwargs) calls concurrently.
+        `limit` narrows the in-flight cap for this batch only; results keep input order.
+        """
+        batch_sem = asyncio.Semaphore(limit) if limit else None
+
+        async def one(call):
+            method, url, kwargs = (tuple(call) + ({},))[:3]
+            if batch_sem is None:
+                return await self._request(method.lower(), url, **dict(kwargs))
+            async with batch_sem:
+                return await self._request(method.lower(), url, **dict(kwargs))
+
+        return await asyncio.gather(*(one(c) for c in calls), return_exceptions=return_exceptions)
+
+    def run_batch(self, calls: Iterable, limit: Optional[int] = None, return_exceptions: bool = False) -> list:
+        """Synchronous entry point for tests: run gather() on a fresh event loop."""
+        return asyncio.run(self.gather(list(calls), limit=limit, return_exceptions=return_exceptions))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        try:
+            self.session.close()
+        except Exception:
+            pass
@@ -0,0 +1,235 @@
+# utils/capture.py
+import base64
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from utils.artifacts import ARTIFACTS
+from utils.json_stream import BODY_EXCERPT_BYTES, body_excerpt
+from utils.locator_scripts import DOM_SNAPSHOT_JS, js_locators
+
+try:
+    import allure
+except ImportError:  # allure is optional for this module
+    allure = None
+
+LEVELS = ("minimal", "standard", "full")
+DEFAULT_LEVEL = "standard"
+DEFAULT_BUDGET_MB = 100.0
+# share of the session budget already spent at which a level steps down one notch (full -> standard -> minimal)
+DEGRADE_AT = {"full": 0.5, "standard": 0.8}
+# ancestors above the failing locator's first match that the trimmed DOM snapshot keeps
+DOM_LEVELS_UP = 3
+
+VIEWPORT_JS = "return [window.innerWidth, window.innerHeight, window.scrollX, window.scrollY];"
+# NoSuchElementException text carries the locator as {"method":"css selector","selector":"..."}
+_NO_SUCH_ELEMENT = re.compile(r'"method"\s*:\s*"([^"]+)"\s*,\s*"selector"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+@dataclass(frozen=True)
+class CapturePolicy:
+    name: str
+    body_max_bytes: Optional[int] = None  # None: the caller's limit (--attach-body-max-kb)
+    screenshot: Optional[str] = None  # "jpeg" (scaled + encoded by Chrome) | "png" (full size) | None
+    max_width: Optional[int] = None
+    jpeg_quality: int = 60
+    dom: Optional[str] = None  # "trimmed" (around the failing locator) | "full" (page_source) | None
+    dom_max_chars: Optional[int] = None
+
+
+POLICIES = {
+    "minimal": CapturePolicy("minimal", body_max_bytes=4 * 1024),
+    "standard": CapturePolicy("standard", screenshot="jpeg", max_width=800, jpeg_quality=60,
+                              dom="trimmed", dom_max_chars=32 * 1024),
+    "full": CapturePolicy("full", screenshot="png", dom="full"),
+}
+
+
+@dataclass
+class CaptureStats:
+    pages: int = 0
+    bodies: int = 0
+    bytes: int = 0
+    degraded: int = 0  # captures taken below the configured level because of the budget
+    skipped: int = 0  # artifacts dropped because they did not fit the remaining budget
+    by_kind: dict = field(default_factory=dict)
+
+
+def note_locators(driver, locators) -> None:
+    """Remember what a step is looking for, so a failure snapshot can be trimmed around it."""
+    try:
+        driver._qa_locators = list(locators)
+    except Exception:
+        pass
+
+
+def locators_from_error(exc) -> list:
+    """[(method, selector)] named by a NoSuchElementException-style message, else []."""
+    m = _NO_SUCH_ELEMENT.search(str(exc or ""))
+    if not m:
+        return []
+    try:
+        return [(m.group(1), json.loads(f'"{m.group(2)}"'))]
+    except ValueError:
+        return []
+
+
+def _in_page(locators) -> list:
+    out = []
+    for loc in locators or []:
+        try:
+            out.extend(js_locators([loc]))
+        except (ValueError, TypeError):
+            continue  # link text etc. cannot anchor an in-page snapshot
+    return out
+
+
+def screenshot(driver, policy: CapturePolicy) -> tuple:
+    """
+    (bytes, kind) for the policy: "jpeg" asks Chrome (CDP Page.captureScreenshot) for a JPEG of the
+    viewport scaled down to max_width, so only the small image crosses the wire; without CDP it falls
+    back to the WebDriver PNG.
+    """
+    if policy.screenshot == "jpeg":
+        try:
+            params = {"format": "jpeg", "quality": int(policy.jpeg_quality)}
+            if policy.max_width:
+                width, height, x, y = driver.execute_script(VIEWPORT_JS)
+                if width > policy.max_width:
+                    params["clip"] = {"x": x, "y": y, "width": width, "height": height,
+                                      "scale": policy.max_width / width}
+            return base64.b64decode(driver.execute_cdp_cmd("Page.captureScreenshot", params)["data"]), "jpg"
+        except Exception:
+            pass
+    return driver.get_screenshot_as_png(), "png"
+
+
+def dom_snapshot(driver, policy: CapturePolicy, locators=None) -> str:
+    """page_source for "full"; for "trimmed" the region around the first matching locator, cut in-page."""
+    if policy.dom == "full":
+        return driver.page_source
+    in_page = _in_page(locators)
+    res = driver.execute_script(DOM_SNAPSHOT_JS, in_page, policy.dom_max_chars, DOM_LEVELS_UP) or {}
+    if res.get("matched") is not None:
+        kind, value = in_page[res["matched"]]
+        anchor = f"{kind} {value!r}, {DOM_LEVELS_UP} levels up"
+    else:
+        anchor = "no locator matched, document body"
+    size = f"{res.get('html_chars', 0)} chars" + (f", truncated to {policy.dom_max_chars}" if res.get("truncated") else "")
+    header = f"<!-- dom snapshot: {anchor} <{res.get('tag')}>; {size}; page has {res.get('page_nodes')} elements -->\n"
+    return header + (res.get("html") or "")
+
+
+class Capturer:
+    """
+    What a failure captures, and how big it may get. `level` is the ceiling: once the session's
+    captured bytes pass DEGRADE_AT of `budget_bytes` the effective level steps down, and an artifact
+    that would overrun the budget is dropped (counted) instead of written. Only what the effective
+    policy keeps is generated — the DOM is trimmed and the screenshot scaled inside the browser.
+    """
+
+    def __init__(self, level: str = DEFAULT_LEVEL, budget_bytes: Optional[int] = None, writer=None):
+        self.writer = writer or ARTIFACTS
+        self.stats = CaptureStats()
+        self._lock = threading.Lock()
+        self.configure(level, budget_bytes)
+
+    def configure(self, level: str = DEFAULT_LEVEL, budget_bytes: Optional[int] = None) -> "Capturer":
+        if level not in POLICIES:
+            raise ValueError(f"capture level must be one of {', '.join(LEVELS)}, got {level!r}")
+        self.level = level
+        self.budget_bytes = budget_bytes
+        return self
+
+    def reset(self):
+        with self._lock:
+            self.stats = CaptureStats()
+
+    def policy(self) -> CapturePolicy:
+        level = self.level
+        if self.budget_bytes:
+            used = self.stats.bytes / self.budget_bytes
+            while level in DEGRADE_AT and used >= DEGRADE_AT[level]:
+                level = LEVELS[LEVELS.index(level) - 1]
+        return POLICIES[level]
+
+    def _begin(self, what: str) -> CapturePolicy:
+        policy = self.policy()
+        with self._lock:
+            setattr(self.stats, what, getattr(self.stats, what) + 1)
+            if policy.name != self.level:
+                self.stats.degraded += 1
+        return policy
+
+    def _admit(self, kind: str, size: int) -> bool:
+        with self._lock:
+            if self.budget_bytes is not None and self.stats.bytes + size > self.budget_bytes:
+                self.stats.skipped += 1
+                return False
+            self.stats.bytes += size
+            self.stats.by_kind[kind] = self.stats.by_kind.get(kind, 0) + size
+            return True
+
+    def submit(self, data, kind: str, step: str, store=None, attach_name: Optional[str] = None,
+               attachment_type=None):
+        """ARTIFACTS.submit_blob() within the budget; None when the artifact was dropped."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not self._admit(kind, len(data)):
+            return None
+        return self.writer.submit_blob(data, kind, step=step, store=store, attach_name=attach_name,
+                                       attachment_type=attachment_type)
+
+    def capture_body(self, response, limit: int = BODY_EXCERPT_BYTES, step: str = "last_response_body",
+                     attach: bool = True):
+        """The failing API response body, cut to the smaller of `limit` and the policy's cap."""
+        policy = self._begin("bodies")
+        if policy.body_max_bytes is not None:
+            limit = min(limit, policy.body_max_bytes)
+        return self.submit(body_excerpt(response, int(limit)), "txt", step, attach_name=step if attach else None,
+                           attachment_type=allure.attachment_type.TEXT if allure else None)
+
+    def capture_page(self, driver, step: str, store=None, locators=None, attach: bool = False) -> list:
+        """
+        Screenshot + DOM snapshot of the browser per the effective policy; `locators`, then the ones
+        last passed to note_locators, anchor the trimmed snapshot. Best-effort: returns the blob
+        paths that were submitted.
+        """
+        policy = self._begin("pages")
+        locators = list(locators or []) + list(getattr(driver, "_qa_locators", None) or [])
+        paths = []
+        if policy.screenshot:
+            try:
+                data, kind = screenshot(driver, policy)
+                a_type = None
+                if allure and attach:
+                    a_type = allure.attachment_type.JPG if kind == "jpg" else allure.attachment_type.PNG
+                paths.append(self.submit(data, kind, step, store, "ui_screenshot" if attach else None, a_type))
+            except Exception:
+                pass
+        if policy.dom:
+            try:
+                html = dom_snapshot(driver, policy, locators)
+                paths.append(self.submit(html, "html", step, store, "dom_snapshot" if attach else None,
+                                         allure.attachment_type.HTML if allure and attach else None))
+            except Exception:
+                pass
+        return [p for p in paths if p is not None]
+
+    def report_lines(self) -> list:
+        s = self.stats
+        budget = "unlimited"
+        if self.budget_bytes:
+            budget = f"{self.budget_bytes / 2**20:.1f}MB ({100 * s.bytes / self.budget_bytes:.1f}% used)"
+        kinds = " ".join(f"{k}={v / 1024:.1f}KB" for k, v in sorted(s.by_kind.items())) or "none"
+        return [
+            f"capture level={self.level} now={self.policy().name} budget={budget}",
+            f"pages={s.pages} bodies={s.bodies} degraded={s.degraded} skipped={s.skipped} "
+            f"captured={s.bytes / 1024:.1f}KB ({kinds})",
+        ]
+
+
+# process-wide policy shared by the conftest failure hook and page-object debug dumps
+CAPTURE = Capturer()
@@ -0,0 +1,166 @@
+# utils/cassette.py
+import base64
+import hashlib
+import json
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+MODES = ("off", "record", "replay")
+
+
+class CassetteMiss(LookupError):
+    """Replay mode was asked for a request that was never recorded."""
+
+
+def _normalized_url(method: str, url: str, params=None) -> str:
+    prepared = requests.Request(method.upper(), url, params=params).prepare()
+    parts = urllib.parse.urlsplit(prepared.url)
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+    return urllib.parse.urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+def _normalized_body(json_body=None, data=None) -> bytes:
+    if json_body is not None:
+        return json.dumps(json_body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    if data is None:
+        return b""
+    if isinstance(data, dict):
+        return urllib.parse.urlencode(sorted(data.items())).encode("utf-8")
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    return bytes(data)
+
+
+def request_key(method: str, url: str, params=None, json=None, data=None) -> str:
+    """Stable hash of method + URL + sorted params + canonical body."""
+    h = hashlib.sha256()
+    h.update(method.upper().encode("ascii"))
+    h.update(b"\n")
+    h.update(_normalized_url(method, url, params).encode("utf-8"))
+    h.update(b"\n")
+    h.update(_normalized_body(json, data))
+    return h.hexdigest()
+
+
+class Cassette:
+    """
+    Record/replay store for HTTP request/response pairs.
+    On disk it is a JSON-lines file, one record per line keyed by request_key();
+    on load every record goes into a dict so replay lookups are O(1) and never touch the network.
+    """
+
+    def __init__(self, path, mode: str = "replay"):
+        if mode not in MODES:
+            raise ValueError(f"cassette mode must be one of {MODES}, got {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._index: dict = {}
+        self._lock = threading.Lock()
+        self._fh = None
+        if mode == "replay":
+            self.load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def __len__(self):
+        return len(self._index)
+
+    # disk
+    def load(self):
+        self._index.clear()
+        if not self.path.exists():
+            return self
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                rec = json.loads(line)
+                self._index[rec["key"]] = rec
+        return self
+
+    def _append(self, rec: dict):
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        self._fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._fh.flush()
+
+    def close(self):
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+            self._fh = None
+
+    # record / replay
+    def record(self, method: str, url: str, response: requests.Response, **kwargs) -> str:
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+        rec = {
+            "key": key,
+            "method": method.upper(),
+            "url": _normalized_url(method, url, kwargs.get("params")),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "body_b64": base64.b64encode(response.content or b"").decode("ascii"),
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            self._index[key] = rec
+            self._append(rec)
+            self.recorded += 1
+        return key
+
+    def play(self, method: str, url: str, **kwargs) -> requests.Response:
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+        rec = self._index.get(key)
+        if rec is None:
+            self.misses += 1
+            raise CassetteMiss(f"no recorded response for {method.upper()} {_normalized_url(method, url, kwargs.get('params'))}")
+        self.hits += 1
+        return self._to_response(rec)
+
+    def fetch(self, method: str, url: str, send: Callable[..., requests.Response], **kwargs) -> requests.Response:
+        """Serve from the cassette (replay), or call `send` and store the result (record)."""
+        if self.replaying:
+            return self.play(method, url, **kwargs)
+        r = send(url, **kwargs)
+        if self.recording:
+            self.record(method, url, r, **kwargs)
+        return r
+
+    @staticmethod
+    def _to_response(rec: dict) -> requests.Response:
+        r = requests.Response()
+        r.status_code = rec["status"]
+        r.reason = rec.get("reason") or ""
+        r.headers = CaseInsensitiveDict(rec.get("headers") or {})
+        r._content = base64.b64decode(rec["body_b64"])
+        r.url = rec["url"]
+        r.encoding = requests.utils.get_encoding_from_headers(r.headers) or "utf-8"
+        r.request = requests.Request(rec["method"], rec["url"]).prepare()
+        return r
+
+
+def open_cassette(path, mode: Optional[str]) -> Optional[Cassette]:
+    """None for mode 'off' (or unset) so callers can keep a plain `if cassette` check."""
+    if not mode or mode == "off":
+        return None
+    return Cassette(path, mode)
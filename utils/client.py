@@ -2,11 +2,18 @@
 import requests
 from typing import Optional
 
+from utils.transport import TRANSPORT
+
+
 class SimpleClient:
-    def __init__(self, base_url: str = "", timeout: int = 10, default_headers: Optional[dict] = None):
+    def __init__(self, base_url: str = "", timeout: int = 10, default_headers: Optional[dict] = None, cassette=None,
+                 http_cache=None, transport=None):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
-        self.session = requests.Session()
+        self.cassette = cassette
+        self.http_cache = http_cache
+        # pooled connections shared with every other client on the same transport
+        self.session = (transport or TRANSPORT).mount(requests.Session())
         if default_headers:
             self.session.headers.update(default_headers)
 
@@ -15,20 +22,31 @@ class SimpleClient:
             return path
         return f"{self.base_url}/{path.lstrip('/')}"
 
+    def _request(self, method: str, path: str, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        fn = getattr(self.session, method)
+        if self.http_cache is not None:
+            fn = self.http_cache.wrap(method, fn)
+        if self.cassette is not None:
+            return self.cassette.fetch(method, self._url(path), fn, **kwargs)
+        return fn(self._url(path), **kwargs)
+
     def get(self, path: str, params: dict = None, **kwargs):
-        return self.session.get(self._url(path), params=params, timeout=self.timeout, **kwargs)
+        return self._request("get", path, params=params, **kwargs)
 
     def post(self, path: str, json: dict = None, data: dict = None, **kwargs):
-        return self.session.post(self._url(path), json=json, data=data, timeout=self.timeout, **kwargs)
+        return self._request("post", path, json=json, data=data, **kwargs)
 
     def put(self, path: str, json: dict = None, **kwargs):
-        return self.session.put(self._url(path), json=json, timeout=self.timeout, **kwargs)
+        return self._request("put", path, json=json, **kwargs)
 
     def delete(self, path: str, **kwargs):
-        return self.session.delete(self._url(path), timeout=self.timeout, **kwargs)
+        return self._request("delete", path, **kwargs)
 
     def close(self):
         try:
             self.session.close()
         except Exception:
             pass
+        if self.cassette is not None:
+            self.cassette.close()
@@ -0,0 +1,98 @@
+# utils/command_budget.py
+import threading
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+
+from utils import step_timing
+
+# budget key meaning "every command the test issued"
+TOTAL = "total"
+
+
+class CommandBudgetExceeded(AssertionError):
+    """a test or step issued more WebDriver commands than its budget allows"""
+
+
+class CommandBudgetWarning(RuntimeWarning):
+    """same as CommandBudgetExceeded, reported as a warning (--command-budget warn)"""
+
+
+@dataclass
+class BudgetResult:
+    scope: str
+    limit: int
+    used: int = 0
+    commands: Counter = field(default_factory=Counter)
+
+    @property
+    def exceeded(self) -> bool:
+        return self.used > self.limit
+
+    def message(self) -> str:
+        top = ", ".join(f"{name}={n}" for name, n in self.commands.most_common(5))
+        return f"{self.scope} used {self.used} WebDriver commands (budget {self.limit}): {top}"
+
+
+# every exceeded budget of this session, for the terminal summary
+VIOLATIONS: list = []
+
+
+def count_commands(since: int = 0, step: Optional[str] = None, thread: Optional[int] = None,
+                   timer=None) -> Counter:
+    """Commands recorded after sample index `since`, optionally only inside `step` and on `thread`."""
+    timer = timer if timer is not None else step_timing.TIMINGS
+    counts = Counter()
+    for s in timer.samples("command", since=since):
+        if thread is not None and s.thread != thread:
+            continue
+        if step is not None and step not in s.path:
+            continue
+        counts[s.name] += 1
+    return counts
+
+
+def evaluate(budgets: dict, since: int = 0, thread: Optional[int] = None, timer=None) -> list:
+    """{step_or_'total': limit} -> BudgetResult per entry"""
+    results = []
+    for scope, limit in budgets.items():
+        counts = count_commands(since, step=None if scope == TOTAL else scope, thread=thread, timer=timer)
+        results.append(BudgetResult(scope, int(limit), sum(counts.values()), counts))
+    return results
+
+
+def enforce(results, strict: bool = True, where: str = ""):
+    """Raise CommandBudgetExceeded (strict) or warn for every exceeded budget."""
+    exceeded = [r for r in results if r.exceeded]
+    if not exceeded:
+        return
+    VIOLATIONS.extend((where, r) for r in exceeded)
+    message = "; ".join(r.message() for r in exceeded)
+    if where:
+        message = f"{where}: {message}"
+    if strict:
+        raise CommandBudgetExceeded(message)
+    warnings.warn(message, CommandBudgetWarning, stacklevel=3)
+
+
+@contextmanager
+def command_budget(limit: int, step: Optional[str] = None, strict: bool = True, timer=None):
+    """
+    with command_budget(10, step="click_first_streamer"):
+        home.click_first_streamer()
+    Counts the WebDriver commands issued on this thread inside the block (only those made
+    within `step` when given) and fails or warns when they exceed `limit`.
+    """
+    timer = timer if timer is not None else step_timing.TIMINGS
+    since, thread = len(timer), threading.get_ident()
+    result = BudgetResult(step or TOTAL, int(limit))
+    yield result
+    counts = count_commands(since, step=step, thread=thread, timer=timer)
+    result.used, result.commands = sum(counts.values()), counts
+    enforce([result], strict=strict)
+
+
+def report_lines() -> list:
+    return [f"{where or '-'}: {r.message()}" for where, r in VIOLATIONS]
@@ -0,0 +1,143 @@
+# utils/driver_factory.py
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+DEFAULT_DEVICE = "iPhone X"
+DEFAULT_WINDOW_SIZE = (375, 812)
+
+CACHE_ROOT = Path("reports") / ".chrome-cache"
+
+# Network.setBlockedURLs matches URL patterns only, so resource types are blocked by extension
+IMAGE_PATTERNS = ("*.png", "*.png?*", "*.jpg", "*.jpg?*", "*.jpeg", "*.jpeg?*", "*.gif", "*.gif?*",
+                  "*.webp", "*.webp?*", "*.avif", "*.avif?*")
+FONT_PATTERNS = ("*.woff", "*.woff?*", "*.woff2", "*.woff2?*", "*.ttf", "*.ttf?*", "*.otf", "*.otf?*")
+TRACKER_PATTERNS = (
+    "*doubleclick.net*", "*googlesyndication.com*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*amazon-adsystem.com*", "*scorecardresearch.com*", "*imasdk.googleapis.com*", "*branch.io*",
+    "*spade.twitch.tv*", "*countess.twitch.tv*",
+)
+
+
+@dataclass(frozen=True)
+class DriverProfile:
+    """How a browser is launched: headless, what to block through CDP, and where its disk cache lives."""
+    name: str
+    headless: bool = False
+    blocked_urls: tuple = ()
+    disable_images: bool = False
+    disk_cache: bool = False  # reuse CACHE_ROOT/<name>/slot-N across sessions
+
+
+PROFILES = {
+    "default": DriverProfile("default"),
+    "headless": DriverProfile("headless", headless=True),
+    "fast": DriverProfile("fast", headless=True, blocked_urls=IMAGE_PATTERNS + FONT_PATTERNS + TRACKER_PATTERNS,
+                          disable_images=True, disk_cache=True),
+}
+DEFAULT_PROFILE = "default"
+
+
+def get_profile(profile) -> DriverProfile:
+    """a DriverProfile, a PROFILES key, or None (-> default)"""
+    if isinstance(profile, DriverProfile):
+        return profile
+    try:
+        return PROFILES[profile or DEFAULT_PROFILE]
+    except KeyError:
+        raise ValueError(f"unknown driver profile {profile!r}; known: {', '.join(PROFILES)}") from None
+
+
+class _CacheSlots:
+    """
+    Chrome cannot share one disk cache between running instances, so every live browser of a
+    profile gets its own slot directory; slots are reused by later browsers and later sessions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_use = set()
+
+    def acquire(self, profile: str) -> Path:
+        with self._lock:
+            n = 0
+            while (profile, n) in self._in_use:
+                n += 1
+            self._in_use.add((profile, n))
+        path = CACHE_ROOT / profile / f"slot-{n}"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def release(self, path: Path):
+        with self._lock:
+            self._in_use.discard((path.parent.name, int(path.name.split("-")[-1])))
+
+
+CACHE_SLOTS = _CacheSlots()
+
+
+def chrome_options(device_name: str = DEFAULT_DEVICE, headless: bool = False,
+                   profile: Optional[DriverProfile] = None, cache_dir: Optional[Path] = None) -> Options:
+    """Chrome with mobile emulation — the setup every UI test shares"""
+    options = Options()
+    if headless or (profile is not None and profile.headless):
+        options.add_argument("--headless=new")
+    options.add_experimental_option("mobileEmulation", {"deviceName": device_name})
+    options.add_argument("--disable-notifications")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    # Network.* events in driver.get_log("performance") — read by pages.network_monitor, drained by DriverPool.reset
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    if profile is not None and profile.disable_images:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    if cache_dir is not None:
+        options.add_argument(f"--disk-cache-dir={Path(cache_dir).resolve()}")
+    return options
+
+
+def create_driver(device_name: str = DEFAULT_DEVICE, implicit_wait: float = 3, headless: bool = False,
+                  profile=None):
+    """IMPORTANT — Selenium Manager auto-installs correct ChromeDriver version"""
+    profile = get_profile(profile)
+    cache_dir = CACHE_SLOTS.acquire(profile.name) if profile.disk_cache else None
+    try:
+        driver = webdriver.Chrome(options=chrome_options(device_name, headless=headless, profile=profile,
+                                                         cache_dir=cache_dir))
+    except Exception:
+        if cache_dir is not None:
+            CACHE_SLOTS.release(cache_dir)
+        raise
+    try:
+        driver.set_window_size(*DEFAULT_WINDOW_SIZE)
+    except Exception:
+        pass
+    if profile.blocked_urls:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(profile.blocked_urls)})
+        except Exception:
+            pass
+    if cache_dir is not None:
+        _release_on_quit(driver, cache_dir)
+    driver._qa_profile = profile.name
+    driver.implicitly_wait(implicit_wait)
+    return driver
+
+
+def _release_on_quit(driver, cache_dir: Path):
+    original = driver.quit
+
+    def quit():
+        try:
+            original()
+        finally:
+            CACHE_SLOTS.release(cache_dir)
+
+    driver.quit = quit
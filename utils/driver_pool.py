@@ -0,0 +1,294 @@
+# utils/driver_pool.py
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.capture import note_locators
+from utils.driver_factory import create_driver
+from utils.session_state import SessionStateCache
+
+RESET_STORAGE_JS = "try { window.localStorage.clear(); } catch(e){} try { window.sessionStorage.clear(); } catch(e){}"
+
+
+def _web_origin(url: str) -> Optional[str]:
+    parts = urlsplit(url or "")
+    if parts.scheme in ("http", "https") and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}"
+    return None
+
+
+def seen_origins(driver) -> list:
+    """http(s) origins the tab has visited (navigation history) or has loaded frames from (CDP)."""
+    urls = []
+    try:
+        history = driver.execute_cdp_cmd("Page.getNavigationHistory", {}) or {}
+        urls.extend(entry.get("url") for entry in history.get("entries", []))
+        frames = [(driver.execute_cdp_cmd("Page.getFrameTree", {}) or {}).get("frameTree")]
+        while frames:
+            node = frames.pop() or {}
+            frame = node.get("frame") or {}
+            urls.extend([frame.get("securityOrigin"), frame.get("url")])
+            frames.extend(node.get("childFrames") or [])
+    except Exception:
+        pass
+    origins = []
+    for url in urls:
+        origin = _web_origin(url)
+        if origin and origin not in origins:
+            origins.append(origin)
+    return origins
+
+
+def remove_new_document_script(driver, attr: str):
+    """Unregister the CDP new-document script whose identifier is kept in `driver.<attr>`."""
+    identifier = getattr(driver, attr, None)
+    if not identifier:
+        return
+    try:
+        driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": identifier})
+    except Exception:
+        pass
+    setattr(driver, attr, None)
+
+
+class DriverPoolTimeout(TimeoutError):
+    """No pooled browser became free within the lease timeout."""
+
+
+@dataclass
+class _Slot:
+    driver: object
+    uses: int = 0
+    launched_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class PoolStats:
+    launches: int = 0
+    leases: int = 0
+    recycled_max_uses: int = 0
+    recycled_crashed: int = 0
+    lease_wait_total: float = 0.0
+    lease_wait_max: float = 0.0
+    reuse_counts: list = field(default_factory=list)  # uses per retired browser
+
+
+class DriverPool:
+    """
+    Pre-warmed pool of WebDriver instances.
+    Browsers are launched up front, leased to tests, reset between leases
+    (cookies, storage, about:blank) and recycled after `max_uses` leases or a crash.
+    """
+
+    def __init__(self, size: int = 1, max_uses: int = 20, factory: Callable = create_driver,
+                 implicit_wait: float = 3):
+        self.size = max(1, int(size))
+        self.max_uses = max(1, int(max_uses))
+        self.factory = factory
+        self.implicit_wait = implicit_wait
+        self.stats = PoolStats()
+        self._idle: queue.Queue = queue.Queue()
+        self._slots: dict = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._launch_error: Optional[BaseException] = None
+
+    # lifecycle
+    def start(self):
+        """Launch all browsers in parallel so Chrome cold start is paid once, at session start."""
+        threads = [threading.Thread(target=self._launch_into_pool, daemon=True) for _ in range(self.size)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return self
+
+    def _launch(self) -> _Slot:
+        slot = _Slot(self.factory())
+        with self._lock:
+            self.stats.launches += 1
+            self._slots[id(slot.driver)] = slot
+        return slot
+
+    def _launch_into_pool(self):
+        try:
+            slot = self._launch()
+        except Exception as exc:
+            self._launch_error = exc
+            return
+        self._idle.put(slot)
+
+    def _retire(self, slot: _Slot, crashed: bool):
+        with self._lock:
+            self._slots.pop(id(slot.driver), None)
+            self.stats.reuse_counts.append(slot.uses)
+            if crashed:
+                self.stats.recycled_crashed += 1
+            else:
+                self.stats.recycled_max_uses += 1
+        try:
+            slot.driver.quit()
+        except Exception:
+            pass
+        if not self._closed:
+            # keep the pool warm without blocking the releasing test
+            threading.Thread(target=self._launch_into_pool, daemon=True).start()
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            slots = list(self._slots.values())
+            self._slots.clear()
+        for slot in slots:
+            self.stats.reuse_counts.append(slot.uses)
+            try:
+                slot.driver.quit()
+            except Exception:
+                pass
+
+    # leasing
+    def acquire(self, timeout: Optional[float] = 120):
+        started = time.perf_counter()
+        deadline = None if timeout is None else started + timeout
+        while True:
+            try:
+                slot = self._idle.get(timeout=0.5)
+            except queue.Empty:
+                if self._launch_error is not None and not self._slots:
+                    raise self._launch_error
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise DriverPoolTimeout(f"no pooled browser free after {timeout}s") from None
+                continue
+            if self.is_alive(slot.driver):
+                break
+            self._retire(slot, crashed=True)
+        waited = time.perf_counter() - started
+        with self._lock:
+            slot.uses += 1
+            self.stats.leases += 1
+            self.stats.lease_wait_total += waited
+            self.stats.lease_wait_max = max(self.stats.lease_wait_max, waited)
+        return slot.driver
+
+    def release(self, driver, broken: bool = False):
+        slot = self._slots.get(id(driver))
+        if slot is None:
+            return
+        if broken or not self.is_alive(driver):
+            self._retire(slot, crashed=True)
+            return
+        if slot.uses >= self.max_uses:
+            self._retire(slot, crashed=False)
+            return
+        try:
+            self.reset(driver)
+        except WebDriverException:
+            self._retire(slot, crashed=True)
+            return
+        self._idle.put(slot)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = 120):
+        driver = self.acquire(timeout=timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    # browser state
+    @staticmethod
+    def is_alive(driver) -> bool:
+        try:
+            _ = driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def reset(self, driver):
+        """
+        Clear cookies and storage (and any restored-state seed, playback hooks or noted locators),
+        then park the browser on about:blank.
+        The performance log (goog:loggingPrefs) is drained and the driver's NetworkMonitor dropped,
+        so a lease that never reads the log does not leave its Network.* events buffered in the browser.
+        Storage of every origin the lease touched is dropped through CDP Storage.clearDataForOrigin;
+        the in-page clear covers the current origin on drivers without CDP.
+        """
+        SessionStateCache.forget(driver)
+        remove_new_document_script(driver, "_qa_playback_hooks")  # TwitchStreamerPage.install_playback_monitor
+        note_locators(driver, [])  # a failure in the next lease must not be anchored on this lease's locators
+        try:
+            driver.execute_script(RESET_STORAGE_JS)
+        except WebDriverException:
+            pass
+        try:
+            for origin in seen_origins(driver):
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            driver.execute_cdp_cmd("Page.resetNavigationHistory", {})
+        except Exception:
+            pass
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        except Exception:
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+        driver.implicitly_wait(self.implicit_wait)
+        try:
+            driver.get_log("performance")  # discard: only pages.network_monitor reads it
+        except Exception:
+            pass
+        if getattr(driver, "_qa_network_monitor", None) is not None:
+            driver._qa_network_monitor = None
+
+    # reporting
+    def report_lines(self) -> list:
+        s = self.stats
+        avg_wait = s.lease_wait_total / s.leases if s.leases else 0.0
+        with self._lock:
+            live_uses = [slot.uses for slot in self._slots.values()]
+        uses = s.reuse_counts + live_uses
+        return [
+            f"browsers launched={s.launches} leases={s.leases} pool_size={self.size} max_uses={self.max_uses}",
+            f"lease wait avg={avg_wait:.3f}s max={s.lease_wait_max:.3f}s",
+            f"reuse per browser={uses} recycled(max_uses)={s.recycled_max_uses} recycled(crash)={s.recycled_crashed}",
+        ]
+
+
+class DriverPools:
+    """One DriverPool per driver profile (utils.driver_factory.PROFILES), launched on first use."""
+
+    def __init__(self, size: int = 1, max_uses: int = 20, factory: Callable = create_driver):
+        self.size = size
+        self.max_uses = max_uses
+        self.factory = factory
+        self._pools: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, profile: str) -> DriverPool:
+        with self._lock:
+            pool = self._pools.get(profile)
+            if pool is None:
+                pool = DriverPool(size=self.size, max_uses=self.max_uses,
+                                  factory=lambda: self.factory(profile=profile)).start()
+                self._pools[profile] = pool
+            return pool
+
+    def close(self):
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.close()
+
+    def report_lines(self) -> list:
+        with self._lock:
+            pools = sorted(self._pools.items())
+        return [f"[{profile}] {line}" for profile, pool in pools for line in pool.report_lines()]
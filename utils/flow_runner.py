@@ -0,0 +1,180 @@
+# utils/flow_runner.py
+import itertools
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from pages.twitch_home_page import TwitchHomePage
+from pages.twitch_streamer_page import TwitchStreamerPage
+from utils.artifact_store import ArtifactStore
+from utils.artifacts import ARTIFACTS
+from utils.driver_factory import DEFAULT_DEVICE, create_driver
+
+FLOWS_DIR = Path("reports") / "flows"
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_") or "empty"
+
+
+@dataclass(frozen=True)
+class FlowCase:
+    query: str
+    device: str = DEFAULT_DEVICE
+
+    @property
+    def namespace(self) -> str:
+        """filesystem-safe artifact namespace, e.g. 'iphone_x__starcraft_ii'"""
+        return f"{_slug(self.device)}__{_slug(self.query)}"
+
+
+@dataclass
+class StepTiming:
+    name: str
+    seconds: float
+    ok: bool
+    error: Optional[str] = None
+
+
+@dataclass
+class FlowResult:
+    case: FlowCase
+    ok: bool = False
+    steps: list = field(default_factory=list)
+    artifacts: list = field(default_factory=list)
+    playback: Optional[dict] = None  # PlaybackMetrics of the playback step
+    error: Optional[str] = None
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(s.seconds for s in self.steps)
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["namespace"] = self.case.namespace
+        d["total_seconds"] = self.total_seconds
+        return d
+
+
+def matrix(queries: Iterable[str], devices: Iterable[str] = (DEFAULT_DEVICE,)) -> list:
+    """Cartesian (query, deviceName) matrix as FlowCase list."""
+    return [FlowCase(q, d) for q, d in itertools.product(queries, devices)]
+
+
+class FlowRunner:
+    """
+    Runs the TwitchHomePage -> TwitchStreamerPage flow for many (query, device) cases at once,
+    one headless browser per worker. Every case gets its own artifact store under
+    `artifacts_root/<namespace>/` (blobs + index.jsonl) plus a result.json with per-step timings.
+    """
+
+    def __init__(self, base_url: str = TwitchHomePage.BASE_URL, workers: int = 4,
+                 driver_factory: Callable = None, artifacts_root: Path = FLOWS_DIR,
+                 playback_seconds: float = 3.0, playback_timeout: int = 20):
+        self.base_url = base_url.rstrip("/")
+        self.workers = max(1, int(workers))
+        self.driver_factory = driver_factory or (lambda device: create_driver(device_name=device, headless=True))
+        self.artifacts_root = Path(artifacts_root)
+        self.playback_seconds = playback_seconds
+        self.playback_timeout = playback_timeout
+
+    def run(self, cases: Iterable[FlowCase]) -> list:
+        cases = list(cases)
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(cases) or 1), thread_name_prefix="ui-flow") as pool:
+            results = list(pool.map(self.run_one, cases))
+        ARTIFACTS.flush()
+        for r in results:
+            store = ArtifactStore(self.artifacts_root / r.case.namespace)
+            known = set(r.artifacts)
+            r.artifacts.extend(str(store.root / e.blob) for e in store.entries()
+                               if str(store.root / e.blob) not in known)
+        self.artifacts_root.mkdir(parents=True, exist_ok=True)
+        summary = self.artifacts_root / "summary.json"
+        summary.write_text(json.dumps([r.to_dict() for r in results], indent=2), encoding="utf-8")
+        return results
+
+    def run_one(self, case: FlowCase) -> FlowResult:
+        result = FlowResult(case=case)
+        ns_dir = self.artifacts_root / case.namespace
+        ns_dir.mkdir(parents=True, exist_ok=True)
+        store = ArtifactStore(ns_dir)
+        driver = streamer = None
+        try:
+            driver = self._timed(result, "launch_browser", lambda: self.driver_factory(case.device))
+            home = TwitchHomePage(driver, base_url=self.base_url, artifacts=store)
+            streamer = TwitchStreamerPage(driver, artifacts=store)
+
+            self._timed(result, "go_to_twitch", home.go_to_twitch)
+            self._timed(result, "handle_cookies", home.handle_cookies)
+            self._timed(result, "handle_app_modal", home.handle_app_modal)
+            self._timed(result, "search_for_game", lambda: home.search_for_game(case.query), must=True)
+            self._timed(result, "scroll_fixed", lambda: home.scroll_fixed(times=2, pause=0.3))
+            self._timed(result, "click_first_streamer", home.click_first_streamer, must=True)
+            self._timed(result, "wait_for_full_load", streamer.wait_for_full_load, must=True)
+            self._timed(result, "wait_for_video_playback",
+                        lambda: streamer.wait_for_video_playback(seconds=self.playback_seconds,
+                                                                 timeout=self.playback_timeout), must=True)
+            shot = self._timed(result, "screenshot",
+                               lambda: streamer.take_screenshot_after_playback(
+                                   filename_prefix="streamer", playback_seconds=0.0, timeout=5), must=True)
+            result.artifacts.append(str(shot))
+            result.ok = True
+        except Exception as exc:
+            result.error = f"{type(exc).__name__}: {exc}"
+            if driver is not None:
+                try:
+                    png = ARTIFACTS.submit_blob(driver.get_screenshot_as_png(), "png", step="failure", store=store)
+                    result.artifacts.append(str(png))
+                except Exception:
+                    pass
+        finally:
+            if streamer is not None and streamer.last_playback is not None:
+                result.playback = streamer.last_playback.to_dict()
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            (ns_dir / "result.json").write_text(json.dumps(result.to_dict(), indent=2), encoding="utf-8")
+        return result
+
+    @staticmethod
+    def _timed(result: FlowResult, name: str, fn: Callable, must: bool = False):
+        """time one step; `must` steps that return falsy abort the flow"""
+        started = time.perf_counter()
+        try:
+            value = fn()
+        except Exception as exc:
+            result.steps.append(StepTiming(name, time.perf_counter() - started, False, f"{type(exc).__name__}: {exc}"))
+            raise
+        ok = bool(value) or not must
+        result.steps.append(StepTiming(name, time.perf_counter() - started, ok))
+        if not ok:
+            raise AssertionError(f"step {name} returned {value!r}")
+        return value
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the Twitch search -> streamer flow for a (query, device) matrix")
+    parser.add_argument("--query", action="append", required=True, help="search term (repeatable)")
+    parser.add_argument("--device", action="append", default=None, help="Chrome deviceName (repeatable)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--base-url", default=TwitchHomePage.BASE_URL)
+    parser.add_argument("--artifacts", default=str(FLOWS_DIR))
+    args = parser.parse_args(argv)
+
+    runner = FlowRunner(base_url=args.base_url, workers=args.workers, artifacts_root=Path(args.artifacts))
+    results = runner.run(matrix(args.query, args.device or [DEFAULT_DEVICE]))
+    for r in results:
+        status = "ok" if r.ok else f"FAILED ({r.error})"
+        print(f"{r.case.namespace}: {status} total={r.total_seconds:.2f}s")
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
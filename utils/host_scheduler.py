@@ -0,0 +1,177 @@
+# utils/host_scheduler.py
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Callable, Iterable, Optional
+
+
+@dataclass(frozen=True)
+class HostBudget:
+    max_concurrent: Optional[int] = None
+    rps: Optional[float] = None
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    in_flight: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    throttle_wait: float = 0.0
+
+
+class _HostState:
+    def __init__(self, budget: HostBudget):
+        self.budget = budget
+        self.sem = threading.BoundedSemaphore(budget.max_concurrent) if budget.max_concurrent else None
+        self.interval = 1.0 / budget.rps if budget.rps else 0.0
+        self.next_start = 0.0
+        self.stats = HostStats()
+
+
+def parse_budget(spec: str) -> tuple:
+    """'pokeapi.co:rps=5,concurrency=2' -> ('pokeapi.co', HostBudget(max_concurrent=2, rps=5.0))"""
+    host, _, rest = spec.partition(":")
+    if not host or not rest:
+        raise ValueError(f"host budget must look like HOST:rps=N,concurrency=M, got {spec!r}")
+    fields = {}
+    for part in rest.split(","):
+        k, _, v = part.partition("=")
+        k = k.strip().lower()
+        if k == "rps":
+            fields["rps"] = float(v)
+        elif k in ("concurrency", "max_concurrent"):
+            fields["max_concurrent"] = int(v)
+        else:
+            raise ValueError(f"unknown budget field {k!r} in {spec!r}")
+    return host.strip().lower(), HostBudget(**fields)
+
+
+class HostScheduler:
+    """
+    Per-host concurrency and requests-per-second budgets shared by every client thread.
+    Budgets match the host and its subdomains (`agify.io` covers `api.agify.io`);
+    hosts without a budget pass straight through but are still counted.
+    """
+
+    def __init__(self, budgets: Optional[dict] = None, default: Optional[HostBudget] = None):
+        self.budgets = {h.lower(): b for h, b in (budgets or {}).items()}
+        self.default = default or HostBudget()
+        self._hosts: dict = {}
+        self._lock = threading.Lock()
+
+    def _budget_for(self, host: str) -> HostBudget:
+        parts = host.split(".")
+        for i in range(len(parts)):
+            budget = self.budgets.get(".".join(parts[i:]))
+            if budget is not None:
+                return budget
+        return self.default
+
+    def _state(self, url: str) -> _HostState:
+        host = (urllib.parse.urlsplit(url).hostname or "").lower()
+        with self._lock:
+            st = self._hosts.get(host)
+            if st is None:
+                st = self._hosts[host] = _HostState(self._budget_for(host))
+            return st
+
+    @contextmanager
+    def slot(self, url: str):
+        """Block until the host has a free concurrency slot and its rps spacing allows a start."""
+        st = self._state(url)
+        started = time.perf_counter()
+        acquired = admitted = False
+        with self._lock:
+            st.stats.queue_depth += 1
+            st.stats.max_queue_depth = max(st.stats.max_queue_depth, st.stats.queue_depth)
+        try:
+            if st.sem is not None:
+                st.sem.acquire()
+                acquired = True
+            if st.interval:
+                with self._lock:
+                    now = time.monotonic()
+                    start_at = max(now, st.next_start)
+                    st.next_start = start_at + st.interval
+                delay = start_at - now
+                if delay > 0:
+                    time.sleep(delay)
+            with self._lock:
+                st.stats.queue_depth -= 1
+                st.stats.throttle_wait += time.perf_counter() - started
+                st.stats.requests += 1
+                st.stats.in_flight += 1
+                admitted = True
+            yield
+        finally:
+            # whatever raised (while queued, throttled or in the request), the slot and the counters are given back
+            with self._lock:
+                if admitted:
+                    st.stats.in_flight -= 1
+                else:
+                    st.stats.queue_depth -= 1
+            if acquired:
+                st.sem.release()
+
+    def wrap(self, send: Callable) -> Callable:
+        """Wrap a session verb so every `send(url, **kwargs)` call waits for its host slot."""
+        def throttled(url, **kwargs):
+            with self.slot(url):
+                return send(url, **kwargs)
+        return throttled
+
+    def run_parallel(self, fn: Callable, items: Iterable, workers: int = 8) -> list:
+        """Run fn(item) on a thread pool; budgets apply through the clients that use this scheduler."""
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="api-worker") as pool:
+            return list(pool.map(fn, items))
+
+    # reporting
+    def stats(self) -> dict:
+        with self._lock:
+            return {host: asdict(st.stats) for host, st in self._hosts.items()}
+
+    def report_lines(self) -> list:
+        lines = []
+        for host, s in sorted(self.stats().items()):
+            budget = self._budget_for(host)
+            lines.append(
+                f"{host}: requests={s['requests']} max_queue_depth={s['max_queue_depth']} "
+                f"throttle_wait={s['throttle_wait']:.3f}s "
+                f"(budget rps={budget.rps or '-'} concurrency={budget.max_concurrent or '-'})"
+            )
+        return lines
+
+class CasePool:
+    """
+    Runs test cases ahead of time on a thread pool: submit() every selected case up front, then each
+    test calls result() for its own case, which waits for it and returns or re-raises its outcome
+    (assertion, skip). A case that was never submitted runs inline. Host budgets still apply through
+    the clients the cases use.
+    """
+
+    def __init__(self, workers: int = 4):
+        self.workers = max(1, int(workers))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: dict = {}
+
+    def submit(self, fn: Callable, *args):
+        key = (fn, args)
+        if key in self._futures:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="api-case")
+        self._futures[key] = self._executor.submit(fn, *args)
+
+    def result(self, fn: Callable, *args):
+        future = self._futures.pop((fn, args), None)
+        return fn(*args) if future is None else future.result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._futures.clear()
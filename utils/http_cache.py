@@ -0,0 +1,298 @@
+# utils/http_cache.py
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from utils.cassette import request_key
+
+MODES = ("off", "memory", "disk")
+CACHE_DIR = Path("reports") / "http_cache"
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+CACHEABLE_STATUS = (200, 203, 300, 301, 308, 404, 410)
+
+
+def parse_cache_control(value: Optional[str]) -> dict:
+    """'public, max-age=300, no-cache' -> {'public': True, 'max-age': '300', 'no-cache': True}"""
+    out = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            out[name.lower()] = arg.strip('"') if arg else True
+    return out
+
+
+def _age(headers) -> float:
+    """Age header in seconds; a missing, malformed or negative value counts as 0"""
+    try:
+        return max(0.0, float(headers.get("Age") or 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _freshness(headers) -> Optional[float]:
+    """seconds the response may be served without revalidation (None = only with a validator)"""
+    cc = parse_cache_control(headers.get("Cache-Control"))
+    if "no-cache" in cc:
+        return 0.0
+    age = _age(headers)
+    for directive in ("s-maxage", "max-age"):
+        if directive in cc:
+            try:
+                return max(0.0, float(cc[directive]) - age)
+            except ValueError:
+                return 0.0
+    if headers.get("Expires") and headers.get("Date"):
+        try:
+            return max(0.0, (parsedate_to_datetime(headers["Expires"]) - parsedate_to_datetime(headers["Date"]))
+                       .total_seconds() - age)
+        except (TypeError, ValueError):
+            return 0.0
+    return None
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    method: str
+    url: str
+    status: int
+    reason: str
+    headers: dict
+    body: bytes = field(repr=False, default=b"")
+    stored_at: float = 0.0
+    max_age: Optional[float] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    @property
+    def etag(self) -> Optional[str]:
+        return CaseInsensitiveDict(self.headers).get("ETag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return CaseInsensitiveDict(self.headers).get("Last-Modified")
+
+    def fresh(self, now: float) -> bool:
+        return self.max_age is not None and now - self.stored_at < self.max_age
+
+    def validators(self) -> dict:
+        out = {}
+        if self.etag:
+            out["If-None-Match"] = self.etag
+        if self.last_modified:
+            out["If-Modified-Since"] = self.last_modified
+        return out
+
+    def to_response(self, state: str) -> requests.Response:
+        r = requests.Response()
+        r.status_code = self.status
+        r.reason = self.reason
+        r.headers = CaseInsensitiveDict(self.headers)
+        r._content = self.body
+        r.url = self.url
+        r.encoding = requests.utils.get_encoding_from_headers(r.headers) or "utf-8"
+        r.request = requests.Request(self.method, self.url).prepare()
+        r.qa_cache = state
+        return r
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0           # served fresh, no request sent
+    misses: int = 0         # nothing usable cached
+    revalidated: int = 0    # conditional GET answered 304: body served from cache
+    refreshed: int = 0      # conditional GET answered with a new body
+    stored: int = 0
+    evictions: int = 0
+    disk_hits: int = 0      # entries loaded from the disk tier (earlier sessions)
+    bytes_saved: int = 0    # body bytes not transferred thanks to hits + 304s
+
+
+class HttpCache:
+    """
+    Private HTTP cache for GET requests: fresh entries (Cache-Control max-age / Expires) are served
+    without a request; stale ones with an ETag or Last-Modified are revalidated with a conditional
+    GET and served from cache on 304. Memory tier is an LRU capped at `max_bytes` of bodies;
+    with `disk_dir` entries are also written there and shared by later pytest sessions.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, disk_dir: Optional[Path] = None,
+                 clock: Callable[[], float] = time.time):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    # tiers
+    def _disk_paths(self, key: str) -> tuple:
+        base = self.disk_dir / key[:2] / key
+        return base.with_suffix(".json"), base.with_suffix(".body")
+
+    def _load_disk(self, key: str) -> Optional[CacheEntry]:
+        if self.disk_dir is None:
+            return None
+        meta_path, body_path = self._disk_paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            return CacheEntry(body=body_path.read_bytes(), **meta)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _save_disk(self, entry: CacheEntry):
+        if self.disk_dir is None:
+            return
+        meta_path, body_path = self._disk_paths(entry.key)
+        try:
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            for path, data in ((body_path, entry.body),
+                               (meta_path, json.dumps({k: v for k, v in asdict(entry).items() if k != "body"}).encode())):
+                tmp = path.with_name(path.name + ".tmp")
+                tmp.write_bytes(data)
+                tmp.replace(path)
+        except OSError:
+            pass
+
+    def _put_memory(self, entry: CacheEntry):
+        with self._lock:
+            old = self._entries.pop(entry.key, None)
+            if old is not None:
+                self._bytes -= old.size
+            if entry.size > self.max_bytes:
+                return
+            self._entries[entry.key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.stats.evictions += 1
+
+    def evict(self, key: str):
+        """Drop `key` from both tiers (its last response may no longer be cached)."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+        if self.disk_dir is not None:
+            for path in self._disk_paths(key):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self._load_disk(key)
+        if entry is not None:
+            self.stats.disk_hits += 1
+            self._put_memory(entry)
+        return entry
+
+    def store(self, key: str, response: requests.Response, method: str = "GET") -> Optional[CacheEntry]:
+        """Keep a response that is allowed to be cached and can be reused (freshness or a validator)."""
+        cc = parse_cache_control(response.headers.get("Cache-Control"))
+        if response.status_code not in CACHEABLE_STATUS or "no-store" in cc:
+            return None
+        max_age = _freshness(response.headers)
+        if not max_age and not (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+            return None
+        entry = CacheEntry(key=key, method=method.upper(), url=response.url, status=response.status_code,
+                           reason=response.reason or "", headers=dict(response.headers), body=response.content or b"",
+                           stored_at=self.clock(), max_age=max_age)
+        self._put_memory(entry)
+        self._save_disk(entry)
+        self.stats.stored += 1
+        return entry
+
+    # request path
+    def fetch(self, method: str, url: str, send: Callable[..., requests.Response], **kwargs) -> requests.Response:
+        """Serve from cache, revalidate, or call `send(url, **kwargs)` and store the result."""
+        if method.lower() != "get":
+            return send(url, **kwargs)
+        key = request_key("GET", url, kwargs.get("params"))
+        entry = self.lookup(key)
+        if entry is not None and entry.fresh(self.clock()):
+            self.stats.hits += 1
+            self.stats.bytes_saved += entry.size
+            return entry.to_response("hit")
+        if entry is not None and entry.validators():
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), **entry.validators()}
+        r = send(url, **kwargs)
+        if entry is not None and r.status_code == 304:
+            self.stats.revalidated += 1
+            self.stats.bytes_saved += entry.size
+            # a 304 carries updated freshness / validators for the stored body
+            merged = {**entry.headers, **{k: v for k, v in r.headers.items()
+                                          if k.lower() not in ("content-length", "content-encoding", "transfer-encoding")}}
+            entry = CacheEntry(key=key, method="GET", url=entry.url, status=entry.status, reason=entry.reason,
+                               headers=merged, body=entry.body, stored_at=self.clock(),
+                               max_age=_freshness(CaseInsensitiveDict(merged)))
+            self._put_memory(entry)
+            self._save_disk(entry)
+            return entry.to_response("revalidated")
+        if entry is not None:
+            self.stats.refreshed += 1
+        else:
+            self.stats.misses += 1
+        stored = None
+        if not kwargs.get("stream"):  # a streamed body is left unread, so it is not stored
+            stored = self.store(key, r)
+        if entry is not None and stored is None:
+            self.evict(key)  # the refreshed response replaces the stale body, even when it is not kept
+        r.qa_cache = "miss"
+        return r
+
+    def wrap(self, method: str, send: Callable) -> Callable:
+        """Wrap a session verb like HostScheduler.wrap: `send(url, **kwargs)` goes through the cache."""
+        def cached(url, **kwargs):
+            return self.fetch(method, url, send, **kwargs)
+        return cached
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def report_lines(self) -> list:
+        s = self.stats
+        lookups = s.hits + s.misses + s.revalidated + s.refreshed
+        if not lookups:
+            return []
+        tier = f" disk={self.disk_dir} disk_hits={s.disk_hits}" if self.disk_dir else ""
+        return [f"http cache hits={s.hits} revalidated={s.revalidated} refreshed={s.refreshed} misses={s.misses} "
+                f"hit_rate={100.0 * (s.hits + s.revalidated) / lookups:.0f}% saved={s.bytes_saved / 1024:.0f}KB",
+                f"http cache entries={len(self)} bytes={self._bytes / 1024:.0f}KB/{self.max_bytes / 1024:.0f}KB "
+                f"stored={s.stored} evictions={s.evictions}{tier}"]
+
+
+def open_http_cache(mode: Optional[str], max_bytes: int = DEFAULT_MAX_BYTES,
+                    disk_dir: Path = CACHE_DIR) -> Optional[HttpCache]:
+    """None for mode 'off' (or unset), like open_cassette."""
+    if not mode or mode == "off":
+        return None
+    if mode not in MODES:
+        raise ValueError(f"http cache mode must be one of {MODES}, got {mode!r}")
+    return HttpCache(max_bytes=max_bytes, disk_dir=disk_dir if mode == "disk" else None)
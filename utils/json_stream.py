@@ -0,0 +1,330 @@
+# utils/json_stream.py
+import codecs
+import json
+import re
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+CHUNK_SIZE = 16 * 1024
+BODY_EXCERPT_BYTES = 64 * 1024
+# a stream that never closes a key string within this much text is not JSON worth waiting for
+MAX_PENDING = 1024 * 1024
+
+_WS = re.compile(r"\s*")
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_KEY = re.compile(r'"([^"\\]*(?:\\.[^"\\]*)*)"\s*:')
+# a whole string is one token; a lone quote means the string runs past the buffer
+_VALUE_TOKEN = re.compile(_STRING + r'|[\[\]{},"]')   # at depth 0 a ',' ends a scalar
+_NESTED_TOKEN = re.compile(_STRING + r'|[\[\]{}"]')
+
+
+class _Scan:
+    """resumable end-of-value scan: survives the value being split across chunks"""
+    __slots__ = ("pos", "depth")
+
+    def __init__(self, pos: int):
+        self.pos = pos
+        self.depth = 0
+
+
+def _scan_value(buf: str, scan: _Scan) -> Optional[int]:
+    """Index just past the JSON value being scanned, or None when `buf` ends first."""
+    i = scan.pos
+    while True:
+        m = (_NESTED_TOKEN if scan.depth else _VALUE_TOKEN).search(buf, i)
+        if m is None:
+            scan.pos = len(buf)
+            return None
+        j, i = m.start(), m.end()
+        c = buf[j]
+        if c == '"':
+            if i - j == 1:
+                scan.pos = j  # rescan this string once more text has arrived
+                return None
+            if scan.depth == 0:
+                return i
+        elif c in "[{":
+            scan.depth += 1
+        elif c in "]}":
+            if scan.depth == 0:
+                return j  # a scalar ended at its parent's closing bracket
+            scan.depth -= 1
+            if scan.depth == 0:
+                return i
+        else:
+            return j  # ',' after a scalar
+
+
+@dataclass
+class ExtractStats:
+    bytes_read: int = 0
+    body_bytes: Optional[int] = None  # Content-Length, when known
+    peak_buffer: int = 0              # largest amount of text held at once
+    seconds: float = 0.0
+    complete: bool = False            # every requested path found
+
+    @property
+    def read_ratio(self) -> Optional[float]:
+        return self.bytes_read / self.body_bytes if self.body_bytes else None
+
+
+class JsonPathExtractor:
+    """
+    Push parser for object-key paths ("name", "types", "sprites.front_default"). Text is fed
+    chunk by chunk; values outside the requested paths are skipped by a bracket/string scan
+    (nothing is decoded and skipped text is dropped at once), requested values are decoded with
+    json.loads, and parsing stops as soon as the last requested path has been read.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.wanted = {tuple(p.split(".")): p for p in paths}
+        self.prefixes = {t[:i] for t in self.wanted for i in range(1, len(t))}
+        self.found: dict = {}
+        self.peak_buffer = 0
+        self._buf = ""
+        self._pos = 0
+        self._stack: list = []
+        self._state = "root"
+        self._path: tuple = ()
+        self._scan: Optional[_Scan] = None
+        self._value_start = 0
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done" or len(self.found) == len(self.wanted)
+
+    def _skip_ws(self) -> Optional[str]:
+        self._pos = _WS.match(self._buf, self._pos).end()
+        return self._buf[self._pos] if self._pos < len(self._buf) else None
+
+    def _trim(self, keep_from: int):
+        if keep_from > 0:
+            self._buf = self._buf[keep_from:]
+            self._pos -= keep_from
+            if self._scan is not None:
+                self._scan.pos -= keep_from
+            self._value_start -= keep_from
+
+    def feed(self, text: str) -> bool:
+        """Consume the next piece of the document; True once every requested path is found."""
+        self._buf += text
+        self.peak_buffer = max(self.peak_buffer, len(self._buf))
+        while not self.done:
+            state = self._state
+            if state in ("root", "member", "enter"):
+                c = self._skip_ws()
+                if c is None:
+                    break
+                if state == "root":
+                    if c != "{":
+                        self._state = "done"  # not an object: no key path can match
+                        break
+                    self._stack.append(())
+                    self._pos += 1
+                    self._state = "member"
+                elif state == "enter":
+                    if c == "{":
+                        self._stack.append(self._path)
+                        self._pos += 1
+                        self._state = "member"
+                    else:
+                        self._state, self._scan = "skip", _Scan(self._pos)
+                elif c == ",":
+                    self._pos += 1
+                elif c in "}]":
+                    self._pos += 1
+                    self._stack.pop()
+                    if not self._stack:
+                        self._state = "done"
+                else:
+                    m = _KEY.match(self._buf, self._pos)
+                    if m is None:
+                        if len(self._buf) - self._pos > MAX_PENDING:
+                            raise ValueError(f"not a JSON object key at offset {self._pos}")
+                        break
+                    key = json.loads(f'"{m.group(1)}"') if "\\" in m.group(1) else m.group(1)
+                    self._path = self._stack[-1] + (key,)
+                    self._pos = m.end()
+                    if self._path in self.wanted:
+                        self._skip_ws()
+                        self._state, self._value_start, self._scan = "capture", self._pos, _Scan(self._pos)
+                    elif self._path in self.prefixes:
+                        self._state = "enter"
+                    else:
+                        self._state, self._scan = "skip", _Scan(self._pos)
+            else:
+                end = _scan_value(self._buf, self._scan)
+                if end is None:
+                    if state == "skip":
+                        self._trim(self._scan.pos)  # skipped text is never needed again
+                    break
+                if state == "capture":
+                    self.found[self.wanted[self._path]] = json.loads(self._buf[self._value_start:end])
+                self._pos, self._scan, self._state = end, None, "member"
+            if self._state != "capture":
+                self._trim(self._pos)
+        return self.done
+
+
+def iter_body_chunks(response, chunk_size: int = CHUNK_SIZE):
+    """Bytes of a requests.Response in chunks: from memory when already loaded (cassette replay), else the socket."""
+    content = getattr(response, "_content", False)
+    if content is not False and content is not None:
+        for i in range(0, len(content), chunk_size):
+            yield content[i:i + chunk_size]
+        return
+    yield from response.iter_content(chunk_size)
+
+
+def extract_paths(response, paths: Iterable[str], chunk_size: int = CHUNK_SIZE,
+                  head_bytes: int = BODY_EXCERPT_BYTES) -> tuple:
+    """
+    ({path: value}, ExtractStats) from a (preferably stream=True) response; stops reading once
+    every path is found and closes the response. The first `head_bytes` read are kept on
+    `response.qa_stream_head` so failure reports can still show the start of the body.
+    """
+    started = time.perf_counter()
+    extractor = JsonPathExtractor(paths)
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    stats = ExtractStats()
+    try:
+        stats.body_bytes = int(response.headers.get("Content-Length"))
+    except (TypeError, ValueError):
+        stats.body_bytes = None
+    head = bytearray()
+    try:
+        for chunk in iter_body_chunks(response, chunk_size):
+            stats.bytes_read += len(chunk)
+            if len(head) < head_bytes:
+                head += chunk[:head_bytes - len(head)]
+            if extractor.feed(decoder.decode(chunk)):
+                break
+        else:
+            extractor.feed(decoder.decode(b"", final=True))
+    finally:
+        response.qa_stream_head = bytes(head)
+        response.qa_stream_read = stats.bytes_read
+        if getattr(response, "_content", False) is False:
+            response.close()
+    stats.peak_buffer = extractor.peak_buffer
+    stats.complete = extractor.done and len(extractor.found) == len(extractor.wanted)
+    stats.seconds = time.perf_counter() - started
+    return extractor.found, stats
+
+
+def body_excerpt(response, limit: int = BODY_EXCERPT_BYTES) -> str:
+    """
+    At most `limit` bytes of a response body for reports, with a truncation note. Never reads
+    the network: a streamed body that was not loaded is shown from its kept head.
+    """
+    content = getattr(response, "_content", False)
+    if content is False or content is None:
+        body = getattr(response, "qa_stream_head", b"")
+        total = getattr(response, "qa_stream_read", None)
+        note = f"streamed body, {total} bytes read" if total is not None else "streamed body, not read"
+    else:
+        body, total, note = content, len(content), None
+    text = body[:limit].decode(getattr(response, "encoding", None) or "utf-8", errors="replace")
+    if total is not None and total > limit:
+        note = f"truncated: first {limit} of {total} bytes" + (f"; {note}" if note else "")
+    return f"{text}\n... [{note}]" if note else text
+
+
+@dataclass
+class BenchResult:
+    name: str
+    payload_bytes: int
+    full_seconds: float
+    full_peak_bytes: int
+    stream_seconds: float
+    stream_peak_bytes: int
+    stream_bytes_read: int
+    extra: dict = field(default_factory=dict)
+
+
+def _measure(fn, iterations: int):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    seconds = (time.perf_counter() - started) / iterations
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def bench(payloads: dict, paths: Iterable[str] = ("name", "types"), iterations: int = 20,
+          chunk_size: int = CHUNK_SIZE) -> list:
+    """
+    Per payload (name -> body bytes): parse time and peak Python memory of json.loads on the full
+    text (what r.json() does) vs the streaming extractor fed `chunk_size` pieces.
+    """
+    paths = tuple(paths)
+    results = []
+    for name, body in payloads.items():
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        read = {}
+
+        def full():
+            return json.loads(body.decode("utf-8"))
+
+        def streamed():
+            extractor = JsonPathExtractor(paths)
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            n = 0
+            for chunk in chunks:
+                n += len(chunk)
+                if extractor.feed(decoder.decode(chunk)):
+                    break
+            read["bytes"] = n
+            return extractor.found
+
+        full_s, full_peak = _measure(full, iterations)
+        stream_s, stream_peak = _measure(streamed, iterations)
+        results.append(BenchResult(name, len(body), full_s, full_peak, stream_s, stream_peak, read["bytes"]))
+    return results
+
+
+def recorded_payloads(cassette_path, url_pattern: str = r"/pokemon/") -> dict:
+    """Large bodies recorded by `--cassette record` (url -> bytes) for the benchmark."""
+    import base64
+    payloads = {}
+    pattern = re.compile(url_pattern)
+    with open(cassette_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                if pattern.search(rec.get("url", "")) and rec.get("status") == 200:
+                    payloads[rec["url"]] = base64.b64decode(rec["body_b64"])
+    return payloads
+
+
+def main(argv=None) -> int:
+    import argparse
+    from utils.schemas import synthetic_pokemon
+    parser = argparse.ArgumentParser(description="Benchmark r.json() vs streaming path extraction on large payloads")
+    parser.add_argument("--cassette", default=None, help="cassette .jsonl with recorded PokeAPI responses")
+    parser.add_argument("--path", action="append", default=None, help="key path to extract (repeatable)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--chunk-kb", type=int, default=CHUNK_SIZE // 1024)
+    args = parser.parse_args(argv)
+    if args.cassette:
+        payloads = recorded_payloads(args.cassette)
+    else:
+        # live PokeAPI documents list keys alphabetically: moves (the bulk) precede name and types
+        payloads = {"synthetic pokemon": json.dumps(synthetic_pokemon(), sort_keys=True).encode("utf-8")}
+    for r in bench(payloads, args.path or ("name", "types"), args.iterations, args.chunk_kb * 1024):
+        print(f"{r.name}: {r.payload_bytes / 1024:.0f} KB")
+        print(f"  r.json()  {r.full_seconds * 1000:8.2f} ms  peak {r.full_peak_bytes / 1024:8.0f} KB")
+        print(f"  streamed  {r.stream_seconds * 1000:8.2f} ms  peak {r.stream_peak_bytes / 1024:8.0f} KB"
+              f"  read {r.stream_bytes_read / 1024:.0f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,425 @@
+# utils/load.py
+import asyncio
+import importlib
+import json
+import math
+import re
+import time
+import urllib.parse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from requests.exceptions import RequestException
+
+from utils.api_cases import ApiCase
+from utils.transport import Transport
+
+LOAD_DIR = Path("reports") / "load"
+DEFAULT_CASES = "utils.api_cases:API_CASES"
+PERCENTILES = (50, 90, 99, 99.9)
+CHECK_FAILED = "check_failed"  # expected status, but the body broke the test's invariants
+
+
+class LatencyHistogram:
+    """
+    HdrHistogram-style log-linear histogram: values (µs) share a bucket only within the precision
+    of `significant_digits`, so memory stays small for any run length and percentiles are exact to
+    about 1% (2 digits). Histograms merge, so per-process results can be combined.
+    """
+
+    def __init__(self, significant_digits: int = 2):
+        self.significant_digits = significant_digits
+        self._bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.counts: Counter = Counter()
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def _lowest(self, us: int) -> int:
+        shift = max(0, us.bit_length() - self._bits)
+        return (us >> shift) << shift
+
+    def _highest(self, lowest: int) -> int:
+        return lowest + (1 << max(0, lowest.bit_length() - self._bits)) - 1
+
+    def record(self, seconds: float):
+        us = max(0, int(round(seconds * 1_000_000)))
+        self.counts[self._lowest(us)] += 1
+        self.count += 1
+        self.total_us += us
+        self.min_us = us if self.min_us is None else min(self.min_us, us)
+        self.max_us = max(self.max_us, us)
+
+    def percentile(self, p: float) -> float:
+        """seconds at or below which `p`% of the values fall (bucket upper bound, capped at max)"""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(p / 100.0 * self.count))
+        seen = 0
+        for lowest in sorted(self.counts):
+            seen += self.counts[lowest]
+            if seen >= target:
+                return min(self._highest(lowest), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    @property
+    def mean(self) -> float:
+        return self.total_us / self.count / 1_000_000 if self.count else 0.0
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        for lowest, n in other.counts.items():
+            self.counts[self._lowest(lowest)] += n
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def to_dict(self) -> dict:
+        return {"significant_digits": self.significant_digits, "count": self.count, "total_us": self.total_us,
+                "min_us": self.min_us, "max_us": self.max_us, "counts": {str(k): n for k, n in sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "LatencyHistogram":
+        h = cls(d.get("significant_digits", 2))
+        h.counts = Counter({int(k): n for k, n in d.get("counts", {}).items()})
+        h.count, h.total_us, h.min_us, h.max_us = d["count"], d["total_us"], d["min_us"], d["max_us"]
+        return h
+
+    def summary_ms(self) -> str:
+        parts = [f"p{p:g}={self.percentile(p) * 1000:.1f}" for p in PERCENTILES]
+        return " ".join(parts + [f"max={self.max_us / 1000:.1f}", f"mean={self.mean * 1000:.1f}"])
+
+
+@dataclass
+class LoadConfig:
+    cases: object = DEFAULT_CASES          # "module:ATTR" or a list of ApiCase
+    targets: dict = field(default_factory=dict)   # host -> base URL of the stand-in serving it
+    rps: Optional[float] = None            # open model (fixed arrival rate); None = closed model
+    concurrency: int = 16                  # workers (closed) or max requests in flight (open)
+    duration: float = 10.0
+    processes: int = 1
+    timeout: float = 10.0
+    select: Optional[str] = None           # regex on case names
+    verify: object = True                  # requests `verify` (False / CA path for TLS stand-ins)
+
+
+@dataclass
+class CaseResult:
+    requests: int = 0
+    errors: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+@dataclass
+class LoadResult:
+    mode: str = ""
+    target_rps: Optional[float] = None
+    concurrency: int = 0
+    processes: int = 1
+    duration: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    connections: int = 0
+    statuses: Counter = field(default_factory=Counter)   # status code / error kind -> count
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)  # from intended start (open model)
+    service: LatencyHistogram = field(default_factory=LatencyHistogram)  # from actual send
+    cases: dict = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def record(self, case: str, outcome: str, ok: bool, latency: float, service: float):
+        self.requests += 1
+        self.errors += not ok
+        self.statuses[outcome] += 1
+        self.latency.record(latency)
+        self.service.record(service)
+        c = self.cases.setdefault(case, CaseResult())
+        c.requests += 1
+        c.errors += not ok
+        c.latency.record(latency)
+
+    def merge(self, other: "LoadResult") -> "LoadResult":
+        """combine the results of processes that ran side by side"""
+        self.duration = max(self.duration, other.duration)
+        self.requests += other.requests
+        self.errors += other.errors
+        self.connections += other.connections
+        self.statuses.update(other.statuses)
+        self.latency.merge(other.latency)
+        self.service.merge(other.service)
+        for name, c in other.cases.items():
+            mine = self.cases.setdefault(name, CaseResult())
+            mine.requests += c.requests
+            mine.errors += c.errors
+            mine.latency.merge(c.latency)
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "mode": self.mode, "target_rps": self.target_rps, "concurrency": self.concurrency,
+            "processes": self.processes, "duration": self.duration, "requests": self.requests,
+            "errors": self.errors, "connections": self.connections, "statuses": dict(self.statuses),
+            "throughput": self.throughput, "error_rate": self.error_rate,
+            "latency": self.latency.to_dict(), "service": self.service.to_dict(),
+            "cases": {n: {"requests": c.requests, "errors": c.errors, "latency": c.latency.to_dict()}
+                      for n, c in self.cases.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "LoadResult":
+        r = cls(mode=d.get("mode", ""), target_rps=d.get("target_rps"), concurrency=d.get("concurrency", 0),
+                processes=d.get("processes", 1), duration=d["duration"], requests=d["requests"], errors=d["errors"],
+                connections=d.get("connections", 0), statuses=Counter(d.get("statuses", {})),
+                latency=LatencyHistogram.from_dict(d["latency"]), service=LatencyHistogram.from_dict(d["service"]))
+        for name, c in d.get("cases", {}).items():
+            r.cases[name] = CaseResult(c["requests"], c["errors"], LatencyHistogram.from_dict(c["latency"]))
+        return r
+
+    def report_lines(self) -> list:
+        target = f" (target {self.target_rps:g} rps)" if self.target_rps else ""
+        lines = [
+            f"{self.mode} load: {self.requests} requests in {self.duration:.1f}s, concurrency={self.concurrency} "
+            f"processes={self.processes}, throughput={self.throughput:.1f} rps{target}",
+            f"errors={self.errors} ({100.0 * self.error_rate:.2f}%) connections={self.connections}",
+            "statuses " + " ".join(f"{k}={n}" for k, n in sorted(self.statuses.items())),
+            f"latency ms  {self.latency.summary_ms()}",
+        ]
+        if self.mode == "open":
+            lines.append(f"service ms  {self.service.summary_ms()}")
+        for name, c in sorted(self.cases.items()):
+            lines.append(f"  {name}: n={c.requests} errors={c.errors} p50={c.latency.percentile(50) * 1000:.1f}ms "
+                         f"p99={c.latency.percentile(99) * 1000:.1f}ms")
+        return lines
+
+
+# cases
+def retarget(url: str, targets: dict) -> str:
+    """point a case URL at its stand-in: {'agify.io': 'http://127.0.0.1:8001'} covers api.agify.io too"""
+    parts = urllib.parse.urlsplit(url)
+    labels = (parts.hostname or "").lower().split(".")
+    for i in range(len(labels)):
+        base = targets.get(".".join(labels[i:]))
+        if base is not None:
+            b = urllib.parse.urlsplit(base)
+            return urllib.parse.urlunsplit((b.scheme, b.netloc, b.path.rstrip("/") + parts.path,
+                                            parts.query, parts.fragment))
+    return url
+
+
+def load_cases(spec, targets: Optional[dict] = None, select: Optional[str] = None) -> list:
+    """ApiCases from a list or a "module:ATTR" path, re-pointed at `targets` and filtered by `select`"""
+    if isinstance(spec, str):
+        module, _, attr = spec.partition(":")
+        spec = getattr(importlib.import_module(module), attr or "API_CASES")
+    cases = list(spec() if callable(spec) else spec)
+    if select:
+        pattern = re.compile(select)
+        cases = [c for c in cases if pattern.search(c.name)]
+    if not cases:
+        raise ValueError(f"no load cases selected (select={select!r})")
+    targets = {h.lower(): u for h, u in (targets or {}).items()}
+    return [ApiCase(c.name, c.method, retarget(c.url, targets), c.check, dict(c.kwargs), tuple(c.status))
+            for c in cases]
+
+
+# engine
+def _call(session, case: ApiCase, timeout: float, verify) -> tuple:
+    """(outcome, ok) of one request: the status code, CHECK_FAILED, or the exception name"""
+    try:
+        r = session.request(case.method.upper(), case.url, timeout=timeout, verify=verify, **case.kwargs)
+    except RequestException as exc:
+        return type(exc).__name__, False
+    if r.status_code not in case.status:
+        return str(r.status_code), False
+    if case.check is not None:
+        try:
+            case.check(r.json())
+        except (AssertionError, ValueError, KeyError, TypeError):
+            return CHECK_FAILED, False
+    return str(r.status_code), True
+
+
+async def _drive(config: LoadConfig, cases: list, transport: Transport) -> LoadResult:
+    session = transport.session({"User-Agent": "qa-tests-load", "Accept": "application/json"})
+    loop = asyncio.get_running_loop()
+    result = LoadResult(mode="open" if config.rps else "closed", target_rps=config.rps,
+                        concurrency=config.concurrency, processes=config.processes)
+    executor = ThreadPoolExecutor(max_workers=config.concurrency, thread_name_prefix="api-load")
+    in_flight = asyncio.Semaphore(config.concurrency)
+    started = time.perf_counter()
+    deadline = started + config.duration
+
+    async def one(case: ApiCase, intended: float):
+        async with in_flight:
+            sent = time.perf_counter()
+            outcome, ok = await loop.run_in_executor(executor, _call, session, case, config.timeout, config.verify)
+        done = time.perf_counter()
+        # open model: latency counts from the intended start, so queueing behind a slow server is not hidden
+        result.record(case.name, outcome, ok, done - intended, done - sent)
+
+    try:
+        if config.rps:
+            interval = 1.0 / config.rps
+            tasks = []
+            i = 0
+            while True:
+                intended = started + i * interval
+                if intended >= deadline:
+                    break
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.ensure_future(one(cases[i % len(cases)], intended)))
+                i += 1
+            await asyncio.gather(*tasks)
+        else:
+            counter = iter(range(1 << 62))
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await one(cases[next(counter) % len(cases)], time.perf_counter())
+            await asyncio.gather(*(worker() for _ in range(config.concurrency)))
+    finally:
+        executor.shutdown(wait=True)
+        session.close()
+    result.duration = time.perf_counter() - started
+    result.connections = transport.totals().opened
+    return result
+
+
+def _run_process(config: LoadConfig) -> dict:
+    cases = load_cases(config.cases, config.targets, config.select)
+    transport = Transport(pool_size=config.concurrency)
+    try:
+        return asyncio.run(_drive(config, cases, transport)).to_dict()
+    finally:
+        transport.close()
+
+
+def run(config: LoadConfig) -> LoadResult:
+    """Drive the cases for `config.duration`; with processes > 1 the rate and concurrency are split across them."""
+    if config.processes <= 1:
+        return LoadResult.from_dict(_run_process(config))
+    n = config.processes
+    parts = [LoadConfig(**{**config.__dict__, "rps": config.rps / n if config.rps else None,
+                           "concurrency": max(1, config.concurrency // n), "processes": n})
+             for _ in range(n)]
+    with ProcessPoolExecutor(max_workers=n) as pool:
+        results = [LoadResult.from_dict(d) for d in pool.map(_run_process, parts)]
+    merged = results[0]
+    for r in results[1:]:
+        merged.merge(r)
+    merged.concurrency = config.concurrency
+    merged.target_rps = config.rps
+    return merged
+
+
+# baseline
+@dataclass
+class Comparison:
+    metric: str
+    baseline: float
+    current: float
+    change: float       # relative change (error rate: absolute points)
+    regressed: bool
+
+
+def compare(current: LoadResult, baseline: LoadResult, tolerance: float = 0.10,
+            error_tolerance: float = 0.01) -> list:
+    """Throughput may drop and p50/p99 may grow by `tolerance`; the error rate by `error_tolerance` points."""
+    rows = []
+    for metric, base, cur, higher_is_worse in (
+        ("throughput_rps", baseline.throughput, current.throughput, False),
+        ("p50_ms", baseline.latency.percentile(50) * 1000, current.latency.percentile(50) * 1000, True),
+        ("p99_ms", baseline.latency.percentile(99) * 1000, current.latency.percentile(99) * 1000, True),
+    ):
+        change = (cur - base) / base if base else 0.0
+        worse = change if higher_is_worse else -change
+        rows.append(Comparison(metric, base, cur, change, worse > tolerance))
+    change = current.error_rate - baseline.error_rate
+    rows.append(Comparison("error_rate", baseline.error_rate, current.error_rate, change, change > error_tolerance))
+    return rows
+
+
+def comparison_lines(rows: list) -> list:
+    lines = []
+    for row in rows:
+        change = f"{row.change * 100:+.2f}pt" if row.metric == "error_rate" else f"{row.change * 100:+.1f}%"
+        flag = "  REGRESSION" if row.regressed else ""
+        lines.append(f"{row.metric:>15}: baseline={row.baseline:.3f} current={row.current:.3f} {change}{flag}")
+    return lines
+
+
+def save_result(result: LoadResult, path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result.to_dict(), indent=2), encoding="utf-8")
+    return path
+
+
+def load_result(path) -> LoadResult:
+    return LoadResult.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def _target(spec: str) -> tuple:
+    host, sep, url = spec.partition("=")
+    if not sep or not host or not url.startswith(("http://", "https://")):
+        raise ValueError(f"target must look like HOST=http(s)://stand-in, got {spec!r}")
+    return host.lower(), url
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Drive the API test cases as load against (stand-in) services")
+    parser.add_argument("--cases", default=DEFAULT_CASES, help=f"module:ATTR list of ApiCase (default {DEFAULT_CASES})")
+    parser.add_argument("--target", action="append", default=[], metavar="HOST=URL",
+                        help="send requests for HOST (and its subdomains) to URL instead (repeatable)")
+    parser.add_argument("--select", default=None, help="regex on case names")
+    parser.add_argument("--rps", type=float, default=None, help="fixed arrival rate (open model); omit for closed loop")
+    parser.add_argument("--concurrency", type=int, default=16, help="workers, or max in flight with --rps (default 16)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds (default 10)")
+    parser.add_argument("--processes", type=int, default=1, help="split the load across processes (default 1)")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--insecure", action="store_true", help="do not verify TLS certificates of the stand-ins")
+    parser.add_argument("--ca", default=None, help="CA bundle that signed the stand-ins' certificates")
+    parser.add_argument("--out", default=str(LOAD_DIR / "last.json"), help="where the result JSON is written")
+    parser.add_argument("--baseline", default=None, help="result JSON to compare against (exit 1 on regression)")
+    parser.add_argument("--save-baseline", default=None, help="also write the result here as the new baseline")
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="allowed %% drop in throughput / growth in p50, p99 vs the baseline (default 10)")
+    args = parser.parse_args(argv)
+
+    config = LoadConfig(cases=args.cases, targets=dict(_target(t) for t in args.target), rps=args.rps,
+                        concurrency=args.concurrency, duration=args.duration, processes=args.processes,
+                        timeout=args.timeout, select=args.select,
+                        verify=False if args.insecure else (args.ca or True))
+    result = run(config)
+    for line in result.report_lines():
+        print(line)
+    save_result(result, args.out)
+    if args.save_baseline:
+        save_result(result, args.save_baseline)
+    if args.baseline:
+        rows = compare(result, load_result(args.baseline), tolerance=args.max_regression / 100.0)
+        print(f"vs baseline {args.baseline}:")
+        for line in comparison_lines(rows):
+            print(line)
+        if any(row.regressed for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+# utils/locator_scripts.py
+from selenium.webdriver.common.by import By
+
+# Shared in-page helpers: resolve (By, value) locators against any document and filter by visibility.
+# Prepended to the in-page scripts (DOM_SNAPSHOT_JS below, pages/page_scripts.py) so each is one round-trip.
+LOCATOR_HELPERS_JS = """
+function __qaFindAll(doc, kind, value) {
+  try {
+    if (kind === 'xpath') {
+      var snap = doc.evaluate(value, doc, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+      var out = [];
+      for (var i = 0; i < snap.snapshotLength; i++) { out.push(snap.snapshotItem(i)); }
+      return out;
+    }
+    return Array.prototype.slice.call(doc.querySelectorAll(value));
+  } catch (e) { return []; }
+}
+function __qaVisible(el) {
+  if (!el || !el.getBoundingClientRect) { return false; }
+  var r = el.getBoundingClientRect();
+  if (r.width <= 0 || r.height <= 0) { return false; }
+  var view = (el.ownerDocument && el.ownerDocument.defaultView) || window;
+  var cs = view.getComputedStyle(el);
+  return cs.visibility !== 'hidden' && cs.display !== 'none' && parseFloat(cs.opacity || '1') > 0;
+}
+"""
+
+_KINDS = {
+    By.XPATH: "xpath",
+    By.CSS_SELECTOR: "css",
+    By.ID: "css",
+    By.CLASS_NAME: "css",
+    By.TAG_NAME: "css",
+    By.NAME: "css",
+}
+
+
+def js_locators(locators) -> list:
+    """[(By, value), ...] -> [[kind, value], ...] understood by __qaFindAll ('xpath' or 'css')."""
+    out = []
+    for by, value in locators:
+        kind = _KINDS.get(by)
+        if kind is None:
+            raise ValueError(f"locator strategy {by!r} cannot be evaluated in-page")
+        if by == By.ID:
+            value = f"#{value}"
+        elif by == By.CLASS_NAME:
+            value = f".{value}"
+        elif by == By.NAME:
+            value = f"[name='{value}']"
+        out.append([kind, value])
+    return out
+
+
+# arguments: [locators], maxChars, levelsUp
+# Failure DOM snapshot without transferring page_source: the first locator that matches anchors the
+# snapshot, which is taken `levelsUp` ancestors above it (document.body when nothing matches). The
+# clone drops scripts, styles, inline SVG and data: URLs, and is cut to maxChars before it is returned.
+DOM_SNAPSHOT_JS = LOCATOR_HELPERS_JS + """
+var locs = arguments[0] || [], maxChars = arguments[1], levelsUp = arguments[2];
+var root = document.documentElement, matched = null, anchor = null;
+for (var i = 0; i < locs.length && !anchor; i++) {
+  var els = __qaFindAll(document, locs[i][0], locs[i][1]);
+  if (els.length) { anchor = els[0]; matched = i; }
+}
+var node = anchor || document.body || root;
+for (var up = 0; anchor && up < levelsUp && node.parentElement && node.parentElement !== root; up++) {
+  node = node.parentElement;
+}
+var clone = node.cloneNode(true);
+var drop = clone.querySelectorAll('script, style, svg, noscript, link, meta, template, iframe');
+for (var d = 0; d < drop.length; d++) { drop[d].remove(); }
+var withSrc = clone.querySelectorAll('[src^="data:"], [srcset]');
+for (var s = 0; s < withSrc.length; s++) {
+  if ((withSrc[s].getAttribute('src') || '').indexOf('data:') === 0) { withSrc[s].setAttribute('src', 'data:...'); }
+  withSrc[s].removeAttribute('srcset');
+}
+var html = clone.outerHTML;
+return {matched: matched, tag: node.tagName.toLowerCase(), html: html.slice(0, maxChars),
+        truncated: html.length > maxChars, html_chars: html.length,
+        page_nodes: document.getElementsByTagName('*').length};
+"""
@@ -0,0 +1,488 @@
+# utils/perf_bench.py
+import base64
+import json
+import math
+import os
+import platform
+import re
+import statistics
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+BENCH_DIR = Path("reports") / "bench"
+HISTORY_FILE = BENCH_DIR / "history.jsonl"
+SAMPLES = 30
+THRESHOLD = 0.10   # relative slowdown of the mean that counts as a regression...
+ALPHA = 0.05       # ...when Welch's t-test also finds it significant
+
+
+# statistics
+def _betacf(a: float, b: float, x: float) -> float:
+    """continued fraction of the incomplete beta function (modified Lentz)"""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((qam + m2) * (a + m2)), -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))):
+            d = 1.0 + aa * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + aa / c
+            c = c if abs(c) > tiny else tiny
+            delta = d * c
+            h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    """regularized incomplete beta I_x(a, b)"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def welch_t_test(a: list, b: list) -> tuple:
+    """(t, degrees of freedom, two-sided p) for the difference of the means of two samples"""
+    na, nb = len(a), len(b)
+    if na < 2 or nb < 2:
+        return 0.0, 0.0, 1.0
+    va, vb = statistics.variance(a) / na, statistics.variance(b) / nb
+    if va + vb == 0.0:
+        same = statistics.fmean(a) == statistics.fmean(b)
+        return (0.0, float(na + nb - 2), 1.0) if same else (math.inf, float(na + nb - 2), 0.0)
+    t = (statistics.fmean(a) - statistics.fmean(b)) / math.sqrt(va + vb)
+    df = (va + vb) ** 2 / (va ** 2 / (na - 1) + vb ** 2 / (nb - 1))
+    return t, df, _betainc(df / 2.0, 0.5, df / (df + t * t))
+
+
+@dataclass
+class Metric:
+    name: str
+    samples: list            # seconds per operation, one value per sample batch
+    skipped: Optional[str] = None
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.samples) if self.samples else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0
+
+    def to_dict(self) -> dict:
+        if self.skipped:
+            return {"skipped": self.skipped}
+        return {"n": len(self.samples), "mean": self.mean, "stdev": self.stdev,
+                "median": statistics.median(self.samples), "samples": self.samples}
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline_mean: float
+    current_mean: float
+    change: float
+    p_value: float
+    regressed: bool
+
+
+def compare(current: dict, baseline: dict, threshold: float = THRESHOLD, alpha: float = ALPHA) -> list:
+    """Per metric present in both runs: slower by more than `threshold` AND significant at `alpha` = regressed."""
+    rows = []
+    for name, cur in sorted(current.items()):
+        base = baseline.get(name)
+        if not base or "samples" not in base or "samples" not in cur:
+            continue
+        b_mean, c_mean = statistics.fmean(base["samples"]), statistics.fmean(cur["samples"])
+        change = (c_mean - b_mean) / b_mean if b_mean else 0.0
+        _, _, p = welch_t_test(cur["samples"], base["samples"])
+        rows.append(Comparison(name, b_mean, c_mean, change, p, change > threshold and p < alpha))
+    return rows
+
+
+def comparison_lines(rows: list, unit_scale: float = 1e6) -> list:
+    lines = []
+    for r in rows:
+        verdict = "REGRESSION" if r.regressed else ("faster" if r.change < 0 and r.p_value < ALPHA else "")
+        lines.append(f"{r.name:>34}: {r.baseline_mean * unit_scale:10.1f} -> {r.current_mean * unit_scale:10.1f} us "
+                     f"{r.change * 100:+6.1f}% p={r.p_value:.3f} {verdict}".rstrip())
+    return lines
+
+
+# history
+def current_commit(cwd=None) -> str:
+    """short HEAD, '+dirty' when tracked files are modified; 'unknown' outside git"""
+    try:
+        head = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True, text=True,
+                              check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=cwd,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return head + ("+dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def read_history(path=HISTORY_FILE) -> list:
+    runs = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        runs.append(json.loads(line))
+                    except ValueError:
+                        pass
+    except OSError:
+        pass
+    return runs
+
+
+def append_history(run: dict, path=HISTORY_FILE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run) + "\n")
+
+
+def baseline_run(history: list, commit: str, against: Optional[str] = None) -> Optional[dict]:
+    """latest run of `against` (commit prefix), else the latest run of another commit"""
+    for run in reversed(history):
+        if against is not None:
+            if run.get("commit", "").startswith(against):
+                return run
+        elif run.get("commit") != commit:
+            return run
+    return None
+
+
+# benchmarks
+BENCHMARKS: dict = {}
+
+
+def benchmark(name: str):
+    """register `fn(samples, batch) -> list of seconds per operation` (or raise Skip)"""
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+class Skip(Exception):
+    """a benchmark whose environment is missing (e.g. no Chrome)"""
+
+
+def _sample(op: Callable, samples: int, batch: int, after_batch: Optional[Callable] = None) -> list:
+    op()  # warm-up: first-call imports / caches are not the steady state being tracked
+    if after_batch:
+        after_batch()
+    out = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        for _ in range(batch):
+            op()
+        out.append((time.perf_counter() - started) / batch)
+        if after_batch:
+            after_batch()
+    return out
+
+
+def _canned_response(url: str, body: bytes = b'{"status": "success", "message": {"hound": ["afghan"]}}'):
+    r = requests.Response()
+    r.status_code = 200
+    r.reason = "OK"
+    r.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+    r._content = body
+    r.url = url
+    r.encoding = "utf-8"
+    r.request = requests.Request("GET", url).prepare()
+    return r
+
+
+class _NullSession:
+    """session whose verbs answer at once: what is left of a request's time is harness overhead"""
+
+    def __init__(self):
+        self.headers = {}
+        self._responses: dict = {}
+
+    def request(self, method, url, **kwargs):
+        r = self._responses.get(url)
+        if r is None:
+            r = self._responses[url] = _canned_response(url)
+        return r
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        pass
+
+
+URL = "https://dog.ceo/api/breeds/list/all"
+
+
+@benchmark("client_wrapper_request")
+def bench_client_wrapper(samples: int, batch: int) -> list:
+    """conftest.ClientWrapper.get with the fixture's host scheduler + memory HTTP cache (no-store answers)"""
+    from conftest import DEFAULT_HOST_BUDGETS, ClientWrapper
+    from utils.host_scheduler import HostScheduler
+    from utils.http_cache import HttpCache
+    client = ClientWrapper(_NullSession(), scheduler=HostScheduler(DEFAULT_HOST_BUDGETS), http_cache=HttpCache())
+    return _sample(lambda: client.get(URL), samples, batch)
+
+
+@benchmark("simple_client_request")
+def bench_simple_client(samples: int, batch: int) -> list:
+    from utils.client import SimpleClient
+    client = SimpleClient("https://dog.ceo")
+    client.session = _NullSession()
+    return _sample(lambda: client.get("/api/breeds/list/all"), samples, batch)
+
+
+class _Options:
+    def __init__(self, **options):
+        self.options = options
+
+    def getoption(self, name):
+        return self.options[name]
+
+
+class _Item:
+    def __init__(self, funcargs, config):
+        self.funcargs = funcargs
+        self.config = config
+
+
+class _Outcome:
+    def __init__(self, report):
+        self.report = report
+
+    def get_result(self):
+        return self.report
+
+
+class _Report:
+    when = "call"
+    failed = True
+
+
+class _Call:
+    def __init__(self, exc):
+        self.excinfo = type("ExcInfo", (), {"value": exc})()
+
+
+class _DebugDriver:
+    """what _safe_save_debug and the failure hook read from a browser, with realistic sizes"""
+
+    def __init__(self, png_bytes: int = 250_000, html_bytes: int = 400_000, jpeg_bytes: int = 40_000):
+        self._png = os.urandom(png_bytes)
+        self._jpeg = os.urandom(jpeg_bytes)
+        self.page_source = ("<div class='card'>stream</div>" * (html_bytes // 30))[:html_bytes]
+        self._n = 0
+
+    def _capture(self, image: bytes) -> bytes:
+        self._n += 1  # a new capture per call, so content-addressed dedup does not hide the write
+        return self._n.to_bytes(8, "big") + image
+
+    def get_screenshot_as_png(self) -> bytes:
+        return self._capture(self._png)
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        return {"data": base64.b64encode(self._capture(self._jpeg)).decode("ascii")}
+
+    def execute_script(self, script: str, *args):
+        if "innerWidth" in script:
+            return [1280, 720, 0, 0]
+        limit = args[1]  # DOM_SNAPSHOT_JS: trimmed in the browser, so only `limit` chars come back
+        return {"matched": None, "tag": "body", "html": self.page_source[:limit],
+                "truncated": len(self.page_source) > limit, "html_chars": len(self.page_source), "page_nodes": 13_000}
+
+
+def _isolated_artifacts(tmp: Path):
+    """
+    point the process-wide artifact writer at a throwaway store and lift the failure-capture budget
+    (the default level is measured); returns the restore callable
+    """
+    from utils.artifact_store import ArtifactStore
+    from utils.artifacts import ARTIFACTS
+    from utils.capture import CAPTURE
+    previous = ARTIFACTS.store
+    ARTIFACTS.store = ArtifactStore(tmp / "artifacts")
+    budget, stats = CAPTURE.budget_bytes, CAPTURE.stats
+    CAPTURE.budget_bytes = None
+    CAPTURE.reset()
+
+    def restore():
+        ARTIFACTS.flush()
+        ARTIFACTS.store = previous
+        CAPTURE.budget_bytes, CAPTURE.stats = budget, stats
+    return ARTIFACTS, restore
+
+
+@benchmark("makereport_failure_hook")
+def bench_makereport(samples: int, batch: int) -> list:
+    """conftest.pytest_runtest_makereport on a failed API + UI test: body excerpt, page capture, exception"""
+    import conftest
+    from conftest import ClientWrapper
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, restore = _isolated_artifacts(Path(tmp))
+        try:
+            client = ClientWrapper(_NullSession())
+            client.get(URL)
+            client.last_response._content = b'{"moves": [' + b'{"move": {"name": "tackle"}},' * 4000 + b'{}]}'
+            item = _Item({"client": client, "driver": _DebugDriver()},
+                         _Options(**{"--attach-body-max-kb": 64.0}))
+            call = _Call(AssertionError("expected 200, got 503"))
+
+            def op():
+                hook = conftest.pytest_runtest_makereport(item, call)
+                next(hook)
+                try:
+                    hook.send(_Outcome(_Report()))
+                except StopIteration:
+                    pass
+            return _sample(op, samples, batch, after_batch=writer.flush)
+        finally:
+            restore()
+
+
+@benchmark("safe_save_debug")
+def bench_safe_save_debug(samples: int, batch: int) -> list:
+    """TwitchHomePage._safe_save_debug: screenshot + DOM snapshot (capture level) handed to the artifact writer"""
+    from pages.twitch_home_page import TwitchHomePage
+    from utils.artifact_store import ArtifactStore
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, restore = _isolated_artifacts(Path(tmp))
+        try:
+            home = TwitchHomePage(_DebugDriver(), artifacts=ArtifactStore(Path(tmp) / "page"))
+            return _sample(lambda: home._safe_save_debug("bench"), samples, batch, after_batch=writer.flush)
+        finally:
+            restore()
+
+
+TWITCH_STEPS = ("go_to_twitch", "handle_cookies", "search_for_game", "find_stream_candidates")
+
+
+def bench_twitch_steps(samples: int) -> dict:
+    """{step: seconds per run} of TwitchHomePage steps on the static stand-in site, headless Chrome"""
+    from selenium.common.exceptions import WebDriverException
+    from conftest import STAND_IN_DIR, _stand_in_search
+    from pages.twitch_home_page import TwitchHomePage
+    from utils.driver_factory import create_driver
+    from utils.stub_server import StubServer
+    try:
+        driver = create_driver(headless=True, profile="headless")
+    except WebDriverException as exc:
+        raise Skip(f"headless Chrome unavailable: {exc.msg or exc}") from None
+    server = StubServer(static_dir=STAND_IN_DIR).route("GET", "/api/search", _stand_in_search).start()
+    out = {step: [] for step in TWITCH_STEPS}
+    try:
+        home = TwitchHomePage(driver, base_url=server.base_url)
+        for i in range(samples + 1):
+            timings = {}
+            for step, run in (("go_to_twitch", lambda: home.go_to_twitch()),
+                              ("handle_cookies", lambda: home.handle_cookies()),
+                              ("search_for_game", lambda: home.search_for_game("StarCraft II")),
+                              ("find_stream_candidates", lambda: home.find_stream_candidates())):
+                started = time.perf_counter()
+                run()
+                timings[step] = time.perf_counter() - started
+            if i:  # first pass warms the browser cache
+                for step, seconds in timings.items():
+                    out[step].append(seconds)
+            driver.delete_all_cookies()
+    finally:
+        server.stop()
+        driver.quit()
+    return out
+
+
+def run_benchmarks(samples: int = SAMPLES, batch: int = 200, only: Optional[str] = None,
+                   chrome_samples: int = 10) -> dict:
+    """{metric name: Metric} for every registered benchmark (and the Chrome step latencies) matching `only`"""
+    pattern = re.compile(only) if only else None
+    metrics = {}
+    for name, fn in BENCHMARKS.items():
+        if pattern and not pattern.search(name):
+            continue
+        per_batch = max(1, batch // 20) if name in ("makereport_failure_hook", "safe_save_debug") else batch
+        try:
+            metrics[name] = Metric(name, fn(samples, per_batch))
+        except Skip as exc:
+            metrics[name] = Metric(name, [], skipped=str(exc))
+    step_names = [f"twitch_step_{s}" for s in TWITCH_STEPS]
+    if chrome_samples and (pattern is None or any(pattern.search(n) for n in step_names)):
+        try:
+            for step, values in bench_twitch_steps(chrome_samples).items():
+                name = f"twitch_step_{step}"
+                if pattern is None or pattern.search(name):
+                    metrics[name] = Metric(name, values)
+        except Skip as exc:
+            for name in step_names:
+                metrics[name] = Metric(name, [], skipped=str(exc))
+    return metrics
+
+
+def make_run(metrics: dict, commit: Optional[str] = None) -> dict:
+    return {"commit": commit or current_commit(), "ts": time.time(), "python": platform.python_version(),
+            "machine": platform.machine(), "metrics": {n: m.to_dict() for n, m in metrics.items()}}
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the test harness overhead, tracked per commit")
+    parser.add_argument("--only", default=None, help="regex on benchmark names")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help=f"samples per benchmark (default {SAMPLES})")
+    parser.add_argument("--batch", type=int, default=200, help="operations timed per sample (default 200)")
+    parser.add_argument("--chrome-samples", type=int, default=10, help="stand-in runs for Twitch step latency (0 = skip)")
+    parser.add_argument("--history", default=str(HISTORY_FILE), help=f"JSON lines history (default {HISTORY_FILE})")
+    parser.add_argument("--against", default=None, help="commit to compare with (default: latest other commit)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD * 100,
+                        help="%% slowdown of a mean that fails the run when significant (default 10)")
+    parser.add_argument("--no-save", action="store_true", help="compare only, do not append to the history")
+    args = parser.parse_args(argv)
+
+    metrics = run_benchmarks(args.samples, args.batch, args.only, args.chrome_samples)
+    run = make_run(metrics)
+    print(f"commit {run['commit']}")
+    for m in metrics.values():
+        if m.skipped:
+            print(f"{m.name:>34}: skipped ({m.skipped})")
+        else:
+            print(f"{m.name:>34}: mean={m.mean * 1e6:10.1f} us stdev={m.stdev * 1e6:8.1f} n={len(m.samples)}")
+
+    history = read_history(args.history)
+    base = baseline_run(history, run["commit"], args.against)
+    if not args.no_save:
+        append_history(run, args.history)
+    if base is None:
+        print("no baseline run in the history yet")
+        return 0
+    rows = compare(run["metrics"], base["metrics"], threshold=args.threshold / 100.0)
+    print(f"vs {base['commit']} (threshold {args.threshold:g}%, alpha {ALPHA}):")
+    for line in comparison_lines(rows):
+        print(line)
+    return 1 if any(r.regressed for r in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
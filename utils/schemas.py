@@ -0,0 +1,277 @@
+# utils/schemas.py
+import json
+import re
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Optional
+
+import jsonschema
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+
+URL_PATTERN = r"^https?://"
+NAMED_RESOURCE = {
+    "type": "object",
+    "required": ["name", "url"],
+    "properties": {"name": {"type": "string"}, "url": {"type": "string", "pattern": URL_PATTERN}},
+}
+
+DOG_BREEDS = {
+    "type": "object",
+    "required": ["status", "message"],
+    "properties": {
+        "status": {"const": "success"},
+        "message": {"type": "object", "minProperties": 1,
+                    "additionalProperties": {"type": "array", "items": {"type": "string"}}},
+    },
+}
+
+DOG_RANDOM_IMAGES = {
+    "type": "object",
+    "required": ["status", "message"],
+    "properties": {
+        "status": {"const": "success"},
+        "message": {"oneOf": [
+            {"type": "string", "pattern": URL_PATTERN},
+            {"type": "array", "items": {"type": "string", "pattern": URL_PATTERN}},
+        ]},
+    },
+}
+
+AGIFY = {
+    "type": "object",
+    "required": ["name", "age"],
+    "properties": {
+        "name": {"type": "string"},
+        "age": {"type": ["number", "null"], "minimum": 0},
+        "count": {"type": "integer", "minimum": 0},
+    },
+}
+
+REQRES_USER_CREATED = {
+    "type": "object",
+    "required": ["id", "createdAt"],
+    "properties": {
+        "id": {"type": "string"},
+        "createdAt": {"type": "string"},
+        "name": {"type": "string"},
+        "job": {"type": "string"},
+    },
+}
+
+POKEMON = {
+    "type": "object",
+    "required": ["id", "name", "types"],
+    "properties": {
+        "id": {"type": "integer", "minimum": 1},
+        "name": {"type": "string"},
+        "types": {"type": "array", "minItems": 1, "items": {
+            "type": "object", "required": ["slot", "type"],
+            "properties": {"slot": {"type": "integer"}, "type": NAMED_RESOURCE},
+        }},
+        "abilities": {"type": "array", "items": {
+            "type": "object", "required": ["ability"],
+            "properties": {"ability": NAMED_RESOURCE, "is_hidden": {"type": "boolean"}},
+        }},
+        "stats": {"type": "array", "items": {
+            "type": "object", "required": ["base_stat", "stat"],
+            "properties": {"base_stat": {"type": "integer"}, "effort": {"type": "integer"}, "stat": NAMED_RESOURCE},
+        }},
+        "moves": {"type": "array", "items": {
+            "type": "object", "required": ["move"],
+            "properties": {"move": NAMED_RESOURCE, "version_group_details": {"type": "array", "items": {
+                "type": "object",
+                "properties": {"level_learned_at": {"type": "integer"},
+                               "move_learn_method": NAMED_RESOURCE, "version_group": NAMED_RESOURCE},
+            }}},
+        }},
+    },
+}
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """`url` is matched against "host/path"; `fast_fields` are the top-level keys the tests rely on."""
+    name: str
+    method: str
+    url: str
+    schema: dict
+    fast_fields: tuple = ()
+
+
+ENDPOINTS = (
+    Endpoint("dog_breeds", "GET", r"^dog\.ceo/api/breeds/list/all$", DOG_BREEDS),
+    Endpoint("dog_random_images", "GET", r"^dog\.ceo/api/breeds/image/random(/\d+)?$", DOG_RANDOM_IMAGES),
+    Endpoint("agify", "GET", r"^api\.agify\.io/?$", AGIFY),
+    Endpoint("reqres_user_created", "POST", r"^reqres\.in/api/users$", REQRES_USER_CREATED),
+    Endpoint("pokemon", "GET", r"^pokeapi\.co/api/v2/pokemon/[^/]+/?$", POKEMON, fast_fields=("name", "types")),
+)
+
+
+class SchemaValidationError(AssertionError):
+    """A response body does not match its endpoint schema."""
+
+
+@dataclass
+class SchemaStats:
+    compiled: int = 0
+    validations: int = 0
+    fast_validations: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+
+
+def _json_path(error) -> str:
+    return "$" + "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in error.absolute_path)
+
+
+class SchemaRegistry:
+    """
+    Per-endpoint JSON schemas with validators compiled (check_schema + validator class) once and
+    cached for the session. `fast=True` validates only the endpoint's `fast_fields` subtree, so a
+    large document (the PokeAPI pokemon payload and its hundreds of moves) is not walked in full.
+    """
+
+    def __init__(self, endpoints=ENDPOINTS):
+        self.endpoints = {e.name: e for e in endpoints}
+        self._patterns = [(e, re.compile(e.url)) for e in endpoints]
+        self._validators: dict = {}
+        self._lock = threading.Lock()
+        self.stats = SchemaStats()
+
+    def endpoint_for(self, method: str, url: str) -> Optional[Endpoint]:
+        parts = urllib.parse.urlsplit(url)
+        target = f"{parts.netloc.lower()}{parts.path}"
+        for endpoint, pattern in self._patterns:
+            if endpoint.method == method.upper() and pattern.search(target):
+                return endpoint
+        return None
+
+    def _subtree_schema(self, endpoint: Endpoint, fields: tuple) -> dict:
+        schema = endpoint.schema
+        return {
+            "type": schema.get("type", "object"),
+            "required": [f for f in schema.get("required", ()) if f in fields],
+            "properties": {f: schema["properties"][f] for f in fields if f in schema.get("properties", {})},
+        }
+
+    def validator(self, name: str, fields: tuple = ()):
+        """compiled validator for endpoint `name` (or just its `fields` subtree), built on first use"""
+        key = (name, tuple(fields))
+        validator = self._validators.get(key)
+        if validator is not None:
+            return validator
+        with self._lock:
+            validator = self._validators.get(key)
+            if validator is None:
+                endpoint = self.endpoints[name]
+                schema = self._subtree_schema(endpoint, key[1]) if key[1] else endpoint.schema
+                cls = validator_for(schema)
+                cls.check_schema(schema)
+                validator = self._validators[key] = cls(schema)
+                self.stats.compiled += 1
+        return validator
+
+    def validate(self, payload, name: str, fast: bool = False, fields: tuple = ()):
+        """Raise SchemaValidationError naming the failing JSON path; returns `payload`."""
+        if fast and not fields:
+            fields = self.endpoints[name].fast_fields
+        validator = self.validator(name, fields)
+        started = time.perf_counter()
+        error = best_match(validator.iter_errors(payload))
+        with self._lock:
+            self.stats.seconds += time.perf_counter() - started
+            self.stats.validations += 1
+            self.stats.fast_validations += bool(fields)
+            self.stats.failures += error is not None
+        if error is not None:
+            raise SchemaValidationError(f"{name}: {_json_path(error)}: {error.message}")
+        return payload
+
+    def validate_response(self, response, name: Optional[str] = None, fast: bool = False):
+        """Parsed JSON body of `response`, validated against `name` or the endpoint its URL matches."""
+        if name is None:
+            endpoint = self.endpoint_for(response.request.method, response.url)
+            if endpoint is None:
+                raise LookupError(f"no schema registered for {response.request.method} {response.url}")
+            name = endpoint.name
+        try:
+            payload = response.json()
+        except ValueError as exc:
+            raise SchemaValidationError(f"{name}: body is not JSON ({exc})") from None
+        return self.validate(payload, name, fast=fast)
+
+    def report_lines(self) -> list:
+        s = self.stats
+        if not s.validations:
+            return []
+        return [f"schemas compiled={s.compiled} validations={s.validations} fast={s.fast_validations} "
+                f"failures={s.failures} time={s.seconds * 1000:.1f}ms"]
+
+
+SCHEMAS = SchemaRegistry()
+
+
+def synthetic_pokemon(moves: int = 400, details: int = 4) -> dict:
+    """pokemon/{name}-shaped document of realistic size (the live one is ~300 KB, mostly moves)"""
+    def ref(kind, i):
+        return {"name": f"{kind}-{i}", "url": f"https://pokeapi.co/api/v2/{kind}/{i}/"}
+    return {
+        "id": 25, "name": "pikachu",
+        "types": [{"slot": 1, "type": ref("type", 13)}],
+        "abilities": [{"ability": ref("ability", i), "is_hidden": i == 2} for i in range(1, 3)],
+        "stats": [{"base_stat": 50 + i, "effort": 0, "stat": ref("stat", i)} for i in range(1, 7)],
+        "moves": [{"move": ref("move", i), "version_group_details": [
+            {"level_learned_at": d, "move_learn_method": ref("move-learn-method", 1),
+             "version_group": ref("version-group", d)} for d in range(details)]} for i in range(moves)],
+    }
+
+
+def bench(iterations: int = 50, cases: Optional[dict] = None) -> dict:
+    """
+    Seconds per validation, per endpoint payload: jsonschema.validate() per call (schema checked and
+    a validator built every time) vs the cached compiled validator vs the fast subtree path.
+    """
+    registry = SchemaRegistry()
+    cases = cases if cases is not None else {"agify": {"name": "olga", "age": 55, "count": 1000},
+                                             "pokemon": synthetic_pokemon()}
+
+    def timed(fn):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return (time.perf_counter() - started) / iterations
+
+    results = {}
+    for name, payload in cases.items():
+        schema = registry.endpoints[name].schema
+        row = results[name] = {
+            "payload_bytes": len(json.dumps(payload)),
+            "per_call": timed(lambda: jsonschema.validate(payload, schema)),
+            "compiled": timed(lambda: registry.validate(payload, name)),
+        }
+        if registry.endpoints[name].fast_fields:
+            row["fast_subtree"] = timed(lambda: registry.validate(payload, name, fast=True))
+    return results
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Micro-benchmark: per-call vs compiled vs subtree schema validation")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--moves", type=int, default=400, help="moves in the synthetic pokemon document")
+    args = parser.parse_args(argv)
+    results = bench(args.iterations, {"agify": {"name": "olga", "age": 55, "count": 1000},
+                                      "pokemon": synthetic_pokemon(args.moves)})
+    for name, row in results.items():
+        print(f"{name}: payload {row['payload_bytes'] / 1024:.1f} KB, {args.iterations} iterations")
+        for key in ("per_call", "compiled", "fast_subtree"):
+            if key in row:
+                print(f"  {key:>13}: {row[key] * 1000:8.3f} ms/validation  x{row['per_call'] / row[key]:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+# utils/session_state.py
+import json
+import re
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+STATE_DIR = Path("reports") / "session_state"
+DEFAULT_TTL = 12 * 3600
+
+READ_STORAGE_JS = """
+function dump(s) { var o = {}; try { for (var i = 0; i < s.length; i++) { var k = s.key(i); o[k] = s.getItem(k); } } catch (e) {} return o; }
+return {origin: location.origin, local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# runs before any page script of every new document; seeds storage once per tab for the saved origin
+SEED_STORAGE_JS = """
+(function (state) {
+  if (location.origin !== state.origin) { return; }
+  try {
+    if (sessionStorage.getItem('__qaStateSeeded')) { return; }
+    Object.keys(state.local).forEach(function (k) { localStorage.setItem(k, state.local[k]); });
+    Object.keys(state.session).forEach(function (k) { sessionStorage.setItem(k, state.session[k]); });
+    sessionStorage.setItem('__qaStateSeeded', '1');
+  } catch (e) {}
+})(%s);
+"""
+
+
+@dataclass
+class SessionState:
+    origin: str
+    cookies: list = field(default_factory=list)
+    local_storage: dict = field(default_factory=dict)
+    session_storage: dict = field(default_factory=dict)
+    saved_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class StateStats:
+    saved: int = 0
+    restored: int = 0
+    misses: int = 0
+    expired: int = 0
+    invalidated: int = 0
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _cdp_cookie(cookie: dict, origin: str) -> dict:
+    """Selenium get_cookies() entry -> CDP Network.CookieParam"""
+    out = {"name": cookie["name"], "value": cookie["value"], "path": cookie.get("path", "/"),
+           "secure": bool(cookie.get("secure")), "httpOnly": bool(cookie.get("httpOnly"))}
+    if cookie.get("domain"):
+        out["domain"] = cookie["domain"]
+    else:
+        out["url"] = origin
+    if cookie.get("expiry"):
+        out["expires"] = cookie["expiry"]
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        out["sameSite"] = cookie["sameSite"]
+    return out
+
+
+class SessionStateCache:
+    """
+    Cookies + localStorage/sessionStorage captured once consent is handled, restored into fresh
+    browsers before their first navigation (CDP Network.setCookies + a new-document storage seed).
+    A snapshot older than `ttl` is ignored; one that fails to restore or verify is deleted.
+    """
+
+    def __init__(self, root: Path = STATE_DIR, ttl: float = DEFAULT_TTL):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.stats = StateStats()
+
+    def path_for(self, url: str) -> Path:
+        return self.root / (re.sub(r"[^a-z0-9]+", "_", _origin(url).lower()).strip("_") + ".json")
+
+    # snapshot
+    def save(self, driver, url: str) -> Optional[SessionState]:
+        try:
+            storage = driver.execute_script(READ_STORAGE_JS) or {}
+            state = SessionState(origin=_origin(url), cookies=driver.get_cookies() or [],
+                                 local_storage=storage.get("local") or {},
+                                 session_storage={k: v for k, v in (storage.get("session") or {}).items()
+                                                  if k != "__qaStateSeeded"})
+        except Exception:
+            return None
+        path = self.path_for(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(asdict(state), indent=2), encoding="utf-8")
+        tmp.replace(path)
+        self.stats.saved += 1
+        return state
+
+    def load(self, url: str, now: Optional[float] = None) -> Optional[SessionState]:
+        path = self.path_for(url)
+        try:
+            state = SessionState(**json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            self.stats.misses += 1
+            return None
+        if (now if now is not None else time.time()) - state.saved_at > self.ttl:
+            self.stats.expired += 1
+            self.invalidate(url)
+            return None
+        return state
+
+    def invalidate(self, url: str, driver=None):
+        """Drop the snapshot (and the storage seed registered in `driver`, if any)."""
+        try:
+            self.path_for(url).unlink()
+        except OSError:
+            pass
+        self.stats.invalidated += 1
+        if driver is not None:
+            self.forget(driver)
+
+    # browser side
+    def restore(self, driver, url: str) -> Optional[SessionState]:
+        """Before the first navigation: push the snapshot into `driver`. Returns it, or None."""
+        state = self.load(url)
+        if state is None:
+            return None
+        try:
+            if state.cookies:
+                driver.execute_cdp_cmd("Network.setCookies",
+                                       {"cookies": [_cdp_cookie(c, state.origin) for c in state.cookies]})
+            if state.local_storage or state.session_storage:
+                seed = json.dumps({"origin": state.origin, "local": state.local_storage,
+                                   "session": state.session_storage})
+                res = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                                             {"source": SEED_STORAGE_JS % seed})
+                driver._qa_state_script = (res or {}).get("identifier")
+        except Exception:
+            self.invalidate(url, driver)
+            return None
+        self.stats.restored += 1
+        return state
+
+    def verify(self, driver, state: SessionState, url: str, now: Optional[float] = None) -> bool:
+        """
+        After navigation: every restored cookie is present with its saved value and has not expired,
+        else the snapshot is invalidated.
+        """
+        now = now if now is not None else time.time()
+        try:
+            present = {c["name"]: c for c in driver.get_cookies()}
+        except Exception:
+            present = {}
+
+        def holds(cookie) -> bool:
+            live = present.get(cookie["name"])
+            expiry = (live or {}).get("expiry") or cookie.get("expiry")
+            return live is not None and live.get("value") == cookie.get("value") and not (expiry and expiry <= now)
+
+        if all(holds(c) for c in state.cookies):
+            return True
+        self.invalidate(url, driver)
+        return False
+
+    @staticmethod
+    def forget(driver):
+        """Unregister the storage seed so a pooled browser's next lease starts clean."""
+        identifier = getattr(driver, "_qa_state_script", None)
+        if not identifier:
+            return
+        try:
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": identifier})
+        except Exception:
+            pass
+        driver._qa_state_script = None
+
+    def report_lines(self) -> list:
+        s = self.stats
+        return [f"session state restored={s.restored} saved={s.saved} misses={s.misses} "
+                f"expired={s.expired} invalidated={s.invalidated} ttl={self.ttl:.0f}s"]
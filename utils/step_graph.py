@@ -0,0 +1,218 @@
+# utils/step_graph.py
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+# retry backoff: BACKOFF_BASE * 2**(attempt-1), capped
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 5.0
+
+
+class StepPreconditionFailed(AssertionError):
+    """A step's prerequisite state could not be re-established."""
+
+
+@dataclass
+class Step:
+    """
+    One node of a flow. `run` performs the step (falsy return = failure when `must`).
+    `check` probes whether the step's resulting state still holds in the browser;
+    `rebuild` re-establishes that state the cheap way (e.g. direct search URL instead of typing).
+    """
+    name: str
+    run: Callable[[], Any]
+    requires: tuple = ()
+    check: Optional[Callable[[], bool]] = None
+    rebuild: Optional[Callable[[], Any]] = None
+    retries: int = 2
+    must: bool = True
+
+
+@dataclass
+class StepOutcome:
+    name: str
+    ok: bool
+    value: Any = None
+    attempts: int = 1
+    seconds: float = 0.0
+    retry_seconds: float = 0.0
+    rebuilt: tuple = ()
+    error: Optional[str] = None
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+
+class RetryLedger:
+    """Per-step run / retry / recovery counts and the time retries cost."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = defaultdict(lambda: {"runs": 0, "first_try": 0, "recovered": 0, "failed": 0,
+                                          "retries": 0, "retry_seconds": 0.0, "rebuilt": 0})
+
+    def record(self, outcome: StepOutcome):
+        with self._lock:
+            row = self._rows[outcome.name]
+            row["runs"] += 1
+            row["retries"] += outcome.attempts - 1
+            row["retry_seconds"] += outcome.retry_seconds
+            if not outcome.ok:
+                row["failed"] += 1
+            elif outcome.attempts == 1:
+                row["first_try"] += 1
+            else:
+                row["recovered"] += 1
+
+    def rebuilt(self, name: str):
+        with self._lock:
+            self._rows[name]["rebuilt"] += 1
+
+    def rows(self) -> dict:
+        with self._lock:
+            return {k: dict(v) for k, v in self._rows.items()}
+
+    def report_lines(self) -> list:
+        lines = []
+        for name, r in sorted(self.rows().items()):
+            if not (r["retries"] or r["failed"] or r["rebuilt"]):
+                continue
+            rate = 100.0 * (r["first_try"] + r["recovered"]) / r["runs"] if r["runs"] else 0.0
+            lines.append(f"{name}: runs={r['runs']} first_try={r['first_try']} recovered={r['recovered']} "
+                         f"failed={r['failed']} retries={r['retries']} rebuilt={r['rebuilt']} "
+                         f"retry_cost={r['retry_seconds']:.2f}s success={rate:.0f}%")
+        return lines
+
+
+RETRIES = RetryLedger()
+
+
+class StepGraph:
+    """
+    A flow as dependent steps. run(name) runs one step; if it fails, only that step is retried
+    (with backoff) after its prerequisites are checked and, where gone, rebuilt — so a flaky step
+    does not fail every later step, and a later step whose prerequisite failed rebuilds it itself.
+    """
+
+    def __init__(self, steps, ledger: RetryLedger = RETRIES, backoff: float = BACKOFF_BASE,
+                 backoff_max: float = BACKOFF_MAX, sleep: Callable[[float], None] = time.sleep):
+        self.steps = {}
+        for step in steps:
+            missing = [r for r in step.requires if r not in self.steps]
+            if missing:
+                raise ValueError(f"step {step.name!r} requires undeclared {missing} (declare steps in order)")
+            self.steps[step.name] = step
+        self.ledger = ledger
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.outcomes: dict = {}  # last StepOutcome per step
+
+    def _delay(self, attempt: int) -> float:
+        return min(self.backoff_max, self.backoff * 2 ** (attempt - 1))
+
+    def _holds(self, step: Step) -> bool:
+        try:
+            return bool(step.check())
+        except Exception:
+            return False
+
+    def ensure(self, name: str, verify: bool = True, rebuilt: Optional[list] = None) -> bool:
+        """
+        Make the state produced by `name` hold: trusted if it last succeeded (and `check` passes
+        when `verify`), else rebuilt via `rebuild`, else its prerequisites are ensured and it runs once.
+        """
+        step = self.steps[name]
+        last = self.outcomes.get(name)
+        if last is not None and last.ok and (not verify or step.check is None):
+            return True
+        if step.check is not None and self._holds(step):
+            return True
+        rebuilt = rebuilt if rebuilt is not None else []
+        if step.rebuild is not None:
+            try:
+                if step.rebuild() and (step.check is None or self._holds(step)):
+                    self.outcomes[name] = StepOutcome(name, True, rebuilt=(name,))
+                    self.ledger.rebuilt(name)
+                    rebuilt.append(name)
+                    return True
+            except Exception:
+                pass
+        for dep in step.requires:
+            if not self.ensure(dep, verify, rebuilt):
+                return False
+        try:
+            value = step.run()
+        except Exception:
+            value = None
+        ok = bool(value) or not step.must
+        self.outcomes[name] = StepOutcome(name, ok, value)
+        if ok:
+            self.ledger.rebuilt(name)
+            rebuilt.append(name)
+        return ok
+
+    def run(self, name: str) -> StepOutcome:
+        """
+        Run step `name`. Prerequisites that never ran or failed are rebuilt first; on failure the
+        step alone is retried up to `retries` times, re-verifying its prerequisites before each retry.
+        """
+        step = self.steps[name]
+        started = time.perf_counter()
+        first_done = None
+        rebuilt, value, error, ok, attempt = [], None, None, False, 0
+        for attempt in range(1, step.retries + 2):
+            if attempt > 1:
+                self.sleep(self._delay(attempt - 1))
+            try:
+                for dep in step.requires:
+                    # first attempt trusts steps that passed; a retry re-checks what the failure may have undone
+                    if not self.ensure(dep, verify=attempt > 1, rebuilt=rebuilt):
+                        raise StepPreconditionFailed(f"{name}: prerequisite {dep!r} could not be re-established")
+                value = step.run()
+                ok = bool(value) or not step.must
+                error = None if ok else f"step {name} returned {value!r}"
+            except Exception as exc:
+                value, ok, error = None, False, f"{type(exc).__name__}: {exc}"
+            if first_done is None:
+                first_done = time.perf_counter()
+            if ok:
+                break
+        ended = time.perf_counter()
+        outcome = StepOutcome(name, ok, value, attempts=attempt, seconds=ended - started,
+                              retry_seconds=ended - first_done, rebuilt=tuple(rebuilt), error=error)
+        self.outcomes[name] = outcome
+        self.ledger.record(outcome)
+        return outcome
+
+
+def twitch_step_graph(home, streamer, query: str, playback_seconds: float = 5.0,
+                      playback_timeout: int = 60, **graph_kwargs) -> StepGraph:
+    """TwitchHomePage -> TwitchStreamerPage flow with its preconditions and cheap rebuilds."""
+
+    def on_search_results() -> bool:
+        return "/search" in home.driver.current_url
+
+    def on_stream_page() -> bool:
+        url = home.driver.current_url.split("?")[0].rstrip("/")
+        return "/search" not in url and url != home.base_url
+
+    return StepGraph([
+        Step("go_to_twitch", home.go_to_twitch, retries=1,
+             check=lambda: home.driver.current_url.startswith("http")),
+        Step("handle_cookies", home.handle_cookies, requires=("go_to_twitch",), retries=0, must=False),
+        Step("open_search", lambda: home.search_for_game(""), requires=("handle_cookies",), retries=0, must=False),
+        Step("search_for_game", lambda: home.search_for_game(query), requires=("handle_cookies",),
+             check=on_search_results, rebuild=lambda: home._direct_search_url(query)),
+        Step("scroll_fixed", lambda: home.scroll_fixed(times=2, pause=1.0), requires=("search_for_game",),
+             retries=0, must=False),
+        Step("click_first_streamer", lambda: home.click_first_streamer(wait_for_navigation=True),
+             requires=("search_for_game",), check=on_stream_page),
+        Step("wait_for_full_load", lambda: streamer.wait_for_full_load(timeout=20),
+             requires=("click_first_streamer",), retries=1),
+        Step("wait_for_video_playback",
+             lambda: streamer.wait_for_video_playback(seconds=playback_seconds, timeout=playback_timeout),
+             requires=("wait_for_full_load",), retries=1),
+    ], **graph_kwargs)
@@ -0,0 +1,246 @@
+# utils/step_timing.py
+import functools
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from utils.artifact_store import _current_test
+
+TIMINGS_DIR = Path("reports") / "timings"
+HISTORY_FILE = TIMINGS_DIR / "step_timings.json"
+PROMETHEUS_FILE = TIMINGS_DIR / "step_timings.prom"
+PROFILES_FILE = TIMINGS_DIR / "profiles.json"
+
+# samples kept per step/command in the cross-run history (oldest dropped first)
+HISTORY_LIMIT = 1000
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass
+class Sample:
+    kind: str  # "step" (page-object method) or "command" (WebDriver command)
+    name: str
+    seconds: float
+    test: Optional[str] = None
+    step: Optional[str] = None  # enclosing page-object step, for commands
+    path: tuple = ()  # every enclosing step, outermost first
+    thread: int = 0
+    profile: Optional[str] = None  # DriverProfile name of the browser, when known
+
+
+def percentile(values, q: float) -> float:
+    """nearest-rank percentile of `values` (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class StepTimer:
+    """
+    Collects the duration of every page-object step and every WebDriver command it issues.
+    Samples from this run are merged into a bounded per-name history on disk so the
+    p50/p95/p99 figures cover many runs, not just the current one.
+    """
+
+    def __init__(self, history_limit: int = HISTORY_LIMIT):
+        self.history_limit = history_limit
+        self._lock = threading.Lock()
+        self._samples: list = []
+        self._local = threading.local()
+
+    # recording
+    def current_step(self) -> Optional[str]:
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def record(self, kind: str, name: str, seconds: float, step: Optional[str] = None,
+               profile: Optional[str] = None):
+        """`step` defaults to the innermost step open on this thread"""
+        path = tuple(getattr(self._local, "stack", None) or ())
+        if step is None and path:
+            step = path[-1]
+        sample = Sample(kind, name, seconds, _current_test(), step, path, threading.get_ident(), profile)
+        with self._lock:
+            self._samples.append(sample)
+
+    def step(self, name: str, profile: Optional[str] = None):
+        """context manager timing one page-object step; commands inside are attributed to it"""
+        return _StepScope(self, name, profile)
+
+    def instrument(self, driver):
+        """Wrap driver.execute so every WebDriver command is timed (idempotent per driver)."""
+        if getattr(driver, "_qa_step_timer", None) is self:
+            return driver
+        original = driver.execute
+        profile = getattr(driver, "_qa_profile", None)
+
+        def execute(driver_command, params=None):
+            started = time.perf_counter()
+            try:
+                return original(driver_command, params)
+            finally:
+                self.record("command", driver_command, time.perf_counter() - started, profile=profile)
+
+        try:
+            driver.execute = execute
+            driver._qa_step_timer = self
+        except Exception:
+            pass
+        return driver
+
+    # reading
+    def samples(self, kind: Optional[str] = None, test: Optional[str] = None, since: int = 0) -> list:
+        with self._lock:
+            picked = self._samples[since:]
+        return [s for s in picked if (kind is None or s.kind == kind) and (test is None or s.test == test)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def grouped(self, kind: str, history: Optional[dict] = None) -> dict:
+        """name -> durations for `kind`, this run's samples appended to the loaded history"""
+        out = defaultdict(list)
+        for name, values in ((history or {}).get(kind) or {}).items():
+            out[name].extend(values)
+        for s in self.samples(kind):
+            out[s.name].append(s.seconds)
+        return {name: values[-self.history_limit:] for name, values in out.items()}
+
+    def breakdown(self, since: int = 0) -> dict:
+        """steps in call order plus per-command totals for the samples recorded after `since`"""
+        steps, commands = [], defaultdict(lambda: {"count": 0, "seconds": 0.0})
+        for s in self.samples(since=since):
+            if s.kind == "step":
+                steps.append({"step": s.name, "seconds": round(s.seconds, 4)})
+            else:
+                commands[s.name]["count"] += 1
+                commands[s.name]["seconds"] += s.seconds
+        return {"steps": steps, "commands": {k: {"count": v["count"], "seconds": round(v["seconds"], 4)}
+                                             for k, v in sorted(commands.items())}}
+
+    def by_profile(self, kind: str = "step") -> dict:
+        """this run only: profile -> summarize()d durations, for comparing driver profiles"""
+        out = defaultdict(lambda: defaultdict(list))
+        for s in self.samples(kind):
+            out[s.profile or "unknown"][s.name].append(s.seconds)
+        return {profile: self.summarize(durations) for profile, durations in sorted(out.items())}
+
+    @staticmethod
+    def summarize(durations: dict) -> dict:
+        return {
+            name: {
+                "count": len(v), "sum": sum(v),
+                **{f"p{int(q * 100)}": percentile(v, q) for q in QUANTILES},
+            }
+            for name, v in sorted(durations.items())
+        }
+
+    # persistence / export
+    @staticmethod
+    def load_history(path: Path = HISTORY_FILE) -> dict:
+        try:
+            return json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def export(self, history_path: Path = HISTORY_FILE, prometheus_path: Path = PROMETHEUS_FILE,
+               profiles_path: Optional[Path] = None) -> dict:
+        """
+        Merge this run into the history file and write step/command quantiles as Prometheus text;
+        `profiles_path` additionally gets this run's per-driver-profile step summary.
+        """
+        history = self.load_history(history_path)
+        merged = {kind: self.grouped(kind, history) for kind in ("step", "command")}
+        outputs = [(history_path, json.dumps(merged)), (prometheus_path, self.prometheus_text(merged))]
+        if profiles_path is not None:
+            outputs.append((profiles_path, json.dumps(self.by_profile(), indent=2)))
+        for path, text in outputs:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            tmp.replace(path)
+        return {kind: self.summarize(values) for kind, values in merged.items()}
+
+    def prometheus_text(self, merged: dict) -> str:
+        lines = []
+        for kind, metric, label in (("step", "qa_ui_step_duration_seconds", "step"),
+                                    ("command", "qa_webdriver_command_duration_seconds", "command")):
+            summary = self.summarize(merged.get(kind) or {})
+            if not summary:
+                continue
+            lines.append(f"# TYPE {metric} summary")
+            for name, row in summary.items():
+                for q in QUANTILES:
+                    lines.append(f'{metric}{{{label}="{name}",quantile="{q}"}} {row[f"p{int(q * 100)}"]:.6f}')
+                lines.append(f'{metric}_sum{{{label}="{name}"}} {row["sum"]:.6f}')
+                lines.append(f'{metric}_count{{{label}="{name}"}} {row["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def profile_report_lines(self) -> list:
+        lines = []
+        for profile, steps in self.by_profile().items():
+            for name, row in steps.items():
+                lines.append(f"[{profile}] {name}: n={row['count']} p50={row['p50']:.3f}s "
+                             f"p95={row['p95']:.3f}s total={row['sum']:.2f}s")
+        return lines
+
+    def report_lines(self, summary: Optional[dict] = None) -> list:
+        summary = summary or {"step": self.summarize(self.grouped("step"))}
+        lines = []
+        for name, row in (summary.get("step") or {}).items():
+            lines.append(f"{name}: n={row['count']} p50={row['p50']:.3f}s p95={row['p95']:.3f}s p99={row['p99']:.3f}s")
+        return lines
+
+
+class _StepScope:
+    def __init__(self, timer: StepTimer, name: str, profile: Optional[str] = None):
+        self.timer = timer
+        self.name = name
+        self.profile = profile
+        self.started = 0.0
+
+    def __enter__(self):
+        stack = getattr(self.timer._local, "stack", None)
+        if stack is None:
+            stack = self.timer._local.stack = []
+        stack.append(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        self.timer._local.stack.pop()
+        self.timer.record("step", self.name, seconds, profile=self.profile)
+        return False
+
+
+TIMINGS = StepTimer()
+
+
+def timed_steps(cls):
+    """Class decorator: time every public method of a page object and the WebDriver commands it issues."""
+    for attr, fn in list(vars(cls).items()):
+        if attr.startswith("_") or not callable(fn):
+            continue
+        setattr(cls, attr, _timed(fn))
+    return cls
+
+
+def _timed(fn):
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        driver = getattr(self, "driver", None)
+        if driver is not None:
+            TIMINGS.instrument(driver)
+        with TIMINGS.step(fn.__name__, profile=getattr(driver, "_qa_profile", None)):
+            return fn(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,193 @@
+# utils/stub_server.py
+import json
+import ssl
+import sys
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class StubRequest:
+    method: str
+    path: str
+    query: dict
+    headers: dict
+    body: bytes = b""
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8")) if self.body else None
+
+
+@dataclass
+class StubResponse:
+    status: int = 200
+    body: bytes = b""
+    headers: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_json(cls, payload, status: int = 200, headers: Optional[dict] = None):
+        h = {"Content-Type": "application/json"}
+        h.update(headers or {})
+        return cls(status=status, body=json.dumps(payload).encode("utf-8"), headers=h)
+
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        """a client that stops reading a streamed body mid-way (or drops a TLS handshake) is expected, not a server error"""
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError, ssl.SSLError)):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    """
+    Local stand-in HTTP server for offline tests.
+    Routes are (METHOD, path) -> StubResponse or callable(StubRequest) -> StubResponse.
+    `latency` is added to every request; `static_dir` serves files for unmatched GETs;
+    `ssl_context` (a server-side context with a cert loaded) makes it an https:// stand-in.
+    """
+
+    def __init__(self, latency: float = 0.0, static_dir: Optional[Path] = None, host: str = "127.0.0.1",
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.latency = latency
+        self.static_dir = Path(static_dir) if static_dir else None
+        self.host = host
+        self.ssl_context = ssl_context
+        self.routes: dict = {}
+        self.requests_served = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.log: list = []
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+        self._port = None
+
+    # routes
+    def route(self, method: str, path: str, response=None, **kwargs):
+        if response is None:
+            response = StubResponse.from_json(kwargs.pop("json", {}), **kwargs)
+        self.routes[(method.upper(), path)] = response
+        return self
+
+    # lifecycle
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def base_url(self) -> str:
+        return f"{'https' if self.ssl_context else 'http'}://{self.host}:{self.port}"
+
+    def url(self, path: str = "/") -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def start(self):
+        self._httpd = _QuietServer((self.host, 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        if self.ssl_context is not None:
+            # handshake in the per-connection thread, not in the accept loop
+            self._httpd.socket = self.ssl_context.wrap_socket(self._httpd.socket, server_side=True,
+                                                              do_handshake_on_connect=False)
+        self._port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # dispatch
+    def _dispatch(self, req: StubRequest) -> StubResponse:
+        handler = self.routes.get((req.method, req.path))
+        if handler is None and req.method in ("GET", "HEAD") and self.static_dir:
+            return self._serve_static(req.path)
+        if handler is None:
+            return StubResponse.from_json({"error": "not found", "path": req.path}, status=404)
+        if callable(handler):
+            return handler(req)
+        return handler
+
+    def _serve_static(self, path: str) -> StubResponse:
+        rel = path.lstrip("/") or "index.html"
+        target = (self.static_dir / rel).resolve()
+        if target.is_dir():
+            target = target / "index.html"
+        if not target.is_file() and not target.suffix:
+            target = target.with_suffix(".html")
+        if self.static_dir.resolve() not in target.parents or not target.is_file():
+            return StubResponse(status=404, body=b"not found", headers={"Content-Type": "text/plain"})
+        ctype = {
+            ".html": "text/html; charset=utf-8",
+            ".js": "application/javascript",
+            ".css": "text/css",
+            ".json": "application/json",
+        }.get(target.suffix, "application/octet-stream")
+        return StubResponse(status=200, body=target.read_bytes(), headers={"Content-Type": ctype})
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                parsed = urllib.parse.urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                req = StubRequest(
+                    method=self.command,
+                    path=parsed.path,
+                    query=dict(urllib.parse.parse_qsl(parsed.query)),
+                    headers=dict(self.headers.items()),
+                    body=body,
+                )
+                with server._lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    server.log.append(req)
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    resp = server._dispatch(req)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+                        server.requests_served += 1
+
+                self.send_response(resp.status)
+                for k, v in resp.headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(resp.body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(resp.body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _handle
+
+        return Handler
+
+
+def serve(routes: Optional[dict] = None, latency: float = 0.0, **kwargs) -> StubServer:
+    """Build and start a StubServer from {(method, path): response} in one call."""
+    server = StubServer(latency=latency, **kwargs)
+    for (method, path), response in (routes or {}).items():
+        server.route(method, path, response)
+    return server.start()
+
@@ -0,0 +1,492 @@
+# utils/transport.py
+import os
+import socket
+import ssl
+import threading
+import time
+import urllib.parse
+import weakref
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from urllib3.poolmanager import PoolManager
+from urllib3.util.ssl_ import is_ipaddress
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+except ImportError:  # optional: HTTP/2 is only offered when httpx[http2] is installed
+    httpx = None
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_CONNECTIONS = 20  # host pools kept per transport
+DNS_TTL = 60.0
+
+
+@dataclass
+class TransportStats:
+    requests: int = 0          # requests answered (each urllib3 retry attempt counts)
+    failed: int = 0            # attempts that got no response (DNS error, refused or dropped connection)
+    opened: int = 0            # TCP connections opened
+    reused: int = 0            # requests answered on a connection the pool already had open (keep-alive / multiplexed)
+    discarded: int = 0         # connections closed because the host pool was full (pool too small)
+    tls_handshakes: int = 0
+    tls_resumed: int = 0       # handshakes that resumed an earlier TLS session
+    dns_lookups: int = 0       # getaddrinfo calls
+    dns_cached: int = 0        # connections that reused a cached address
+    http2: int = 0             # requests answered over HTTP/2
+
+
+def parse_pool_size(spec: str) -> tuple:
+    """'pokeapi.co:4' -> ('pokeapi.co', 4)"""
+    host, _, size = spec.rpartition(":")
+    try:
+        if host and int(size) > 0:
+            return host.lower(), int(size)
+    except ValueError:
+        pass
+    raise ValueError(f"host pool size must look like HOST:N, got {spec!r}")
+
+
+class DnsCache:
+    """getaddrinfo results per (host, port) for `ttl` seconds; the address that last connected is tried first."""
+
+    def __init__(self, ttl: float = DNS_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int) -> tuple:
+        """(addresses, cached)"""
+        key = (host.lower(), port)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > self.clock():
+                return list(entry[0]), True
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self._entries[key] = (addresses, self.clock() + self.ttl)
+        return list(addresses), False
+
+    def prefer(self, host: str, port: int, address: str):
+        with self._lock:
+            entry = self._entries.get((host.lower(), port))
+            if entry is not None and address in entry[0] and entry[0][0] != address:
+                entry[0].remove(address)
+                entry[0].insert(0, address)
+
+    def forget(self, host: str, port: int):
+        with self._lock:
+            self._entries.pop((host.lower(), port), None)
+
+
+class _ResumingContext(ssl.SSLContext):
+    """client SSLContext that offers the last TLS session of a host on its next handshake"""
+
+    def __init__(self, protocol=ssl.PROTOCOL_TLS_CLIENT):
+        self._sessions: dict = {}
+        self._live: dict = {}
+        self._session_lock = threading.Lock()
+
+    def session_for(self, hostname: str):
+        with self._session_lock:
+            sock = self._live.get(hostname, lambda: None)()
+            # TLS 1.3 tickets arrive after the handshake: take the newest from a socket still open
+            session = getattr(sock, "session", None) if sock is not None else None
+            if session is not None:
+                self._sessions[hostname] = session
+            return self._sessions.get(hostname)
+
+    def remember(self, hostname: str, sock):
+        session = getattr(sock, "session", None)
+        if hostname and session is not None:
+            with self._session_lock:
+                self._sessions[hostname] = session
+
+    def wrap_socket(self, sock, server_side=False, do_handshake_on_connect=True, suppress_ragged_eofs=True,
+                    server_hostname=None, session=None):
+        if session is None and server_hostname and not server_side:
+            session = self.session_for(server_hostname)
+        try:
+            wrapped = super().wrap_socket(sock, server_side, do_handshake_on_connect, suppress_ragged_eofs,
+                                          server_hostname, session)
+        except ssl.SSLError:
+            if session is None:
+                raise
+            with self._session_lock:
+                self._sessions.pop(server_hostname, None)
+            raise
+        if server_hostname and not server_side:
+            with self._session_lock:
+                self._live[server_hostname] = weakref.ref(wrapped)
+        return wrapped
+
+
+class TlsContexts:
+    """
+    One client SSLContext per `verify` setting, shared by every pool: the CA bundle is loaded once
+    (not per connection) and TLS sessions are resumed across connections to the same host.
+    """
+
+    def __init__(self):
+        self._contexts: dict = {}
+        self._lock = threading.Lock()
+
+    def context_for(self, verify=True) -> ssl.SSLContext:
+        key = verify if isinstance(verify, (bool, str)) else bool(verify)
+        with self._lock:
+            ctx = self._contexts.get(key)
+            if ctx is None:
+                ctx = _ResumingContext(ssl.PROTOCOL_TLS_CLIENT)
+                ctx.minimum_version = ssl.TLSVersion.TLSv1_2
+                if key is False:
+                    ctx.check_hostname = False
+                    ctx.verify_mode = ssl.CERT_NONE
+                elif key is True:
+                    ctx.load_verify_locations(requests.certs.where())
+                elif os.path.isdir(key):
+                    ctx.load_verify_locations(capath=key)
+                else:
+                    ctx.load_verify_locations(cafile=key)
+                self._contexts[key] = ctx
+            return ctx
+
+
+class _CountingConnectionMixin:
+    """DNS cache + open/handshake counting for the pooled urllib3 connections of one Transport"""
+    transport = None  # set on the per-transport subclasses
+
+    def _new_conn(self):
+        host = self._dns_host  # urllib3's `host` property reads this too, so keep the name around
+        if is_ipaddress(host.strip("[]")):
+            sock = super()._new_conn()
+            self.transport._record(host, opened=1)
+            return sock
+        try:
+            addresses, cached = self.transport.dns.resolve(host, self.port)
+        except OSError:
+            return super()._new_conn()  # let urllib3 raise its NameResolutionError
+        self.transport._record(host, dns_cached=int(cached), dns_lookups=int(not cached))
+        error = None
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                except NewConnectionError as exc:
+                    error = exc
+                    continue
+                self.transport.dns.prefer(host, self.port, address)
+                self.transport._record(host, opened=1)
+                return sock
+        finally:
+            self._dns_host = host
+        self.transport.dns.forget(host, self.port)  # stale or unreachable: resolve again next time
+        if error is None:
+            return super()._new_conn()
+        raise error
+
+
+class _CountingHTTPSConnectionMixin(_CountingConnectionMixin):
+    def connect(self):
+        super().connect()
+        sock = self.sock
+        if isinstance(sock, ssl.SSLSocket):
+            self.transport._record(self.host, tls_handshakes=1, tls_resumed=int(sock.session_reused))
+
+    def close(self):
+        sock = self.sock
+        if isinstance(sock, ssl.SSLSocket) and isinstance(sock.context, _ResumingContext):
+            sock.context.remember(sock.server_hostname, sock)
+        super().close()
+
+
+class _CountingPoolMixin:
+    transport = None
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        # urllib3 has already closed a dropped connection, so an open socket here is a live keep-alive one
+        conn.qa_reused = conn.sock is not None
+        return conn
+
+    def _make_request(self, conn, *args, **kwargs):
+        try:
+            response = super()._make_request(conn, *args, **kwargs)
+        except Exception:
+            self.transport._record(self.host, failed=1)
+            raise
+        self.transport._record(self.host, requests=1, reused=int(getattr(conn, "qa_reused", False)))
+        return response
+
+    def _put_conn(self, conn):
+        pool = self.pool
+        if conn is not None and pool is not None and pool.full():
+            self.transport._record(self.host, discarded=1)
+        super()._put_conn(conn)
+
+
+class _SizedPoolManager(PoolManager):
+    """PoolManager whose pools take their maxsize from the transport's per-host sizes"""
+
+    def __init__(self, transport, **kwargs):
+        super().__init__(**kwargs)
+        self.transport = transport
+        self.pool_classes_by_scheme = transport.pool_classes
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        request_context = dict(request_context if request_context is not None else self.connection_pool_kw)
+        request_context["maxsize"] = self.transport.pool_size(host)
+        return super()._new_pool(scheme, host, port, request_context)
+
+
+class TransportAdapter(HTTPAdapter):
+    """
+    HTTPAdapter mounted (for http:// and https://) into every session of a Transport: one pool per
+    host sized per host, shared TLS contexts, request counting. close() is left to the Transport so
+    one client closing its session does not drop the connections of the others.
+    """
+
+    def __init__(self, transport, max_retries=0):
+        self.transport = transport
+        super().__init__(pool_connections=transport.pool_connections, pool_maxsize=transport.default_pool_size,
+                         max_retries=max_retries)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _SizedPoolManager(self.transport, num_pools=connections, maxsize=maxsize, block=block,
+                                             **pool_kwargs)
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        if host_params["scheme"] == "https" and cert is None:
+            pool_kwargs["ssl_context"] = self.transport.tls.context_for(verify)
+            pool_kwargs.pop("ca_certs", None)
+            pool_kwargs.pop("ca_cert_dir", None)
+        return host_params, pool_kwargs
+
+    def close(self):
+        pass
+
+    def shutdown(self):
+        super().close()
+
+
+class _HttpxBody:
+    """the bits of a urllib3 response that requests.Response uses to stream and close a body"""
+
+    def __init__(self, response):
+        self._response = response
+
+    def stream(self, chunk_size=None, decode_content=True):
+        yield from self._response.iter_bytes(chunk_size)
+
+    def read(self, amt=None, decode_content=True):
+        return self._response.read()
+
+    def close(self):
+        self._response.close()
+
+    release_conn = close
+
+
+class Http2Adapter(BaseAdapter):
+    """
+    https:// over httpx with HTTP/2: requests to one host are multiplexed as streams on a single
+    connection (HTTP/1.1 when the server does not offer h2 via ALPN). No urllib3 retries and no
+    cookie extraction on this backend; the API tests use neither.
+    """
+
+    def __init__(self, transport):
+        super().__init__()
+        if httpx is None:
+            raise ValueError("the HTTP/2 backend needs httpx with the h2 extra (pip install 'httpx[http2]')")
+        self.transport = transport
+        self._clients: dict = {}
+        self._lock = threading.Lock()
+
+    def _client(self, verify, cert):
+        key = (verify if isinstance(verify, (bool, str)) else True, tuple(cert) if isinstance(cert, list) else cert)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                limits = httpx.Limits(max_connections=None,
+                                      max_keepalive_connections=self.transport.default_pool_size)
+                client = self._clients[key] = httpx.Client(http2=True, verify=self.transport.tls.context_for(key[0]),
+                                                           cert=cert, limits=limits, trust_env=False)
+            return client
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        host = urllib.parse.urlsplit(request.url).hostname
+        opened = []
+
+        def trace(event, info):
+            if event == "connection.connect_tcp.complete":
+                opened.append(True)
+                self.transport._record(host, opened=1)
+            elif event == "connection.start_tls.complete" and info.get("return_value") is not None:
+                ssl_object = info["return_value"].get_extra_info("ssl_object")
+                self.transport._record(host, tls_handshakes=1,
+                                       tls_resumed=int(bool(ssl_object and ssl_object.session_reused)))
+
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        client = self._client(verify, cert)
+        try:
+            out = client.build_request(request.method, request.url, headers=dict(request.headers), content=body,
+                                       timeout=httpx.Timeout(timeout), extensions={"trace": trace})
+            resp = client.send(out, stream=True)
+        except httpx.TimeoutException as exc:
+            self.transport._record(host, failed=1)
+            raise requests.exceptions.Timeout(exc, request=request) from exc
+        except httpx.TransportError as exc:
+            self.transport._record(host, failed=1)
+            raise requests.exceptions.ConnectionError(exc, request=request) from exc
+        self.transport._record(host, requests=1, reused=int(not opened), http2=int(resp.http_version == "HTTP/2"))
+
+        r = requests.Response()
+        r.status_code = resp.status_code
+        r.reason = resp.reason_phrase
+        r.headers = CaseInsensitiveDict(resp.headers)
+        r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+        r.url = request.url
+        r.request = request
+        r.connection = self
+        r.raw = _HttpxBody(resp)
+        if not stream:
+            try:
+                r._content = resp.read()  # httpx has already undone Content-Encoding
+            finally:
+                resp.close()
+        return r
+
+    def close(self):
+        pass
+
+    def shutdown(self):
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+class Transport:
+    """
+    Connection layer shared by the API clients (conftest client / async_client, SimpleClient):
+    every session built or mounted here uses the same per-host connection pools, DNS cache and
+    TLS contexts, so keep-alive connections and TLS sessions are reused across clients and threads.
+    Pool size is `pool_size` per host, overridden by `host_pool_sizes` (a host entry covers its
+    subdomains). `http2=True` sends https:// through httpx over HTTP/2 (needs httpx[http2]).
+    Connections opened vs requests served are reported per host.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, host_pool_sizes: Optional[dict] = None,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS, max_retries=0, http2: bool = False,
+                 dns_ttl: float = DNS_TTL):
+        self.default_pool_size = max(1, int(pool_size))
+        self.host_pool_sizes = {h.lower(): int(n) for h, n in (host_pool_sizes or {}).items()}
+        self.pool_connections = pool_connections
+        self.dns = DnsCache(ttl=dns_ttl)
+        self.tls = TlsContexts()
+        self._stats: dict = {}
+        self._lock = threading.Lock()
+
+        conn = {"transport": self}
+        self.pool_classes = {
+            "http": type("HTTPConnectionPool", (_CountingPoolMixin, HTTPConnectionPool), {
+                "transport": self,
+                "ConnectionCls": type("HTTPConnection", (_CountingConnectionMixin, HTTPConnection), conn)}),
+            "https": type("HTTPSConnectionPool", (_CountingPoolMixin, HTTPSConnectionPool), {
+                "transport": self,
+                "ConnectionCls": type("HTTPSConnection", (_CountingHTTPSConnectionMixin, HTTPSConnection), conn)}),
+        }
+        self.adapter = TransportAdapter(self, max_retries=max_retries)
+        self.http2_adapter = Http2Adapter(self) if http2 else None
+
+    @staticmethod
+    def http2_available() -> bool:
+        return httpx is not None
+
+    def pool_size(self, host: str) -> int:
+        parts = (host or "").lower().split(".")
+        for i in range(len(parts)):
+            size = self.host_pool_sizes.get(".".join(parts[i:]))
+            if size is not None:
+                return size
+        return self.default_pool_size
+
+    # sessions
+    def mount(self, session: requests.Session) -> requests.Session:
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.http2_adapter or self.adapter)
+        return session
+
+    def session(self, headers: Optional[dict] = None) -> requests.Session:
+        s = self.mount(requests.Session())
+        if headers:
+            s.headers.update(headers)
+        return s
+
+    def close(self):
+        self.adapter.shutdown()
+        if self.http2_adapter is not None:
+            self.http2_adapter.shutdown()
+
+    # stats
+    def _record(self, host: Optional[str], **counts):
+        host = (host or "").lower()
+        with self._lock:
+            st = self._stats.get(host)
+            if st is None:
+                st = self._stats[host] = TransportStats()
+            for name, n in counts.items():
+                setattr(st, name, getattr(st, name) + n)
+
+    def stats(self, host: Optional[str] = None):
+        with self._lock:
+            if host is not None:
+                return TransportStats(**asdict(self._stats.get(host.lower(), TransportStats())))
+            return {h: TransportStats(**asdict(s)) for h, s in self._stats.items()}
+
+    def totals(self) -> TransportStats:
+        total = TransportStats()
+        for st in self.stats().values():
+            for name, n in asdict(st).items():
+                setattr(total, name, getattr(total, name) + n)
+        return total
+
+    def report_lines(self) -> list:
+        stats = self.stats()
+        if not any(s.requests or s.failed for s in stats.values()):
+            return []
+        lines = []
+        for host, s in sorted(stats.items()):
+            reuse = 100.0 * s.reused / s.requests if s.requests else 0.0
+            tls = f" tls={s.tls_handshakes} resumed={s.tls_resumed}" if s.tls_handshakes else ""
+            h2 = f" http2={s.http2}" if s.http2 else ""
+            failed = f" failed={s.failed}" if s.failed else ""
+            lines.append(f"{host}: requests={s.requests}{failed} connections={s.opened} reuse={reuse:.0f}% "
+                         f"discarded={s.discarded} pool={self.pool_size(host)}{tls}{h2} "
+                         f"dns lookups={s.dns_lookups} cached={s.dns_cached}")
+        t = self.totals()
+        lines.append(f"transport total: requests={t.requests} connections={t.opened} "
+                     f"({t.requests / max(1, t.opened):.1f} requests/connection) "
+                     f"backend={'http2' if self.http2_adapter else 'http/1.1'}")
+        return lines
+
+
+TRANSPORT = Transport()